@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Working days arithmetic: stepping through the days vs the compiled business calendar.
+
+Times calculate_business_date with working_days for the periods monitorings use,
+from dates spread over a year.
+
+    bin/python_interpreter benchmarks/business_days.py --repeat 10000
+"""
+from argparse import ArgumentParser
+from datetime import datetime, timedelta
+from time import time
+
+from openprocurement.api.constants import TZ, WORKING_DAYS
+from openprocurement.tender.core.utils import calculate_business_date as calculate_business_date_base
+
+from openprocurement.audit.api.business_calendar import BusinessCalendar, get_business_calendar
+from openprocurement.audit.api.constants import (
+    MONITORING_TIME,
+    ELIMINATION_PERIOD_TIME,
+    POST_OVERDUE_TIME,
+)
+from openprocurement.audit.api.utils import calculate_business_date
+
+
+def latency(calculate, dates, delta, repeat):
+    started = time()
+    for i in range(repeat):
+        calculate(dates[i % len(dates)], delta, working_days=True)
+    return (time() - started) / repeat * 10 ** 6
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10000)
+    args = parser.parse_args()
+
+    started = time()
+    BusinessCalendar(WORKING_DAYS)
+    print('calendar compiled in {:.1f} ms'.format((time() - started) * 1000))
+    get_business_calendar(WORKING_DAYS)
+
+    dates = [TZ.localize(datetime(2018, 1, 1, 12) + timedelta(days=i)) for i in range(365)]
+    print('{:>10} {:>14} {:>14}'.format('days', 'stepping us', 'calendar us'))
+    for delta in (POST_OVERDUE_TIME, ELIMINATION_PERIOD_TIME, MONITORING_TIME, timedelta(days=60)):
+        print('{:>10} {:>14.2f} {:>14.2f}'.format(
+            delta.days,
+            latency(calculate_business_date_base, dates, delta, args.repeat),
+            latency(calculate_business_date, dates, delta, args.repeat),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Documents per second of docservice signature checks of a request: serial check_document vs DocumentSignatures.
+
+    bin/python_interpreter benchmarks/document_checks.py --requests 200 --documents 20 --pool-size 4
+"""
+from argparse import ArgumentParser
+from base64 import b64encode
+from time import time
+from urllib import urlencode
+from uuid import uuid4
+
+from libnacl.sign import Signer, Verifier
+from openprocurement.api.utils import check_document
+from openprocurement.audit.api.models import Document
+from openprocurement.audit.api.utils import DocumentSignatures
+
+
+class Docservice(object):
+    """
+    Local stand-in for the document service, it signs the urls of the documents it stores as the service does
+    """
+
+    def __init__(self, url='http://localhost'):
+        self.url = url
+        self.key = Signer()
+        self.keyid = self.key.hex_vk()[:8]
+        self.keyring = {self.keyid: Verifier(self.key.hex_vk())}
+
+    def document(self):
+        uuid = uuid4().hex
+        signature = b64encode(self.key.signature('{}\0{}'.format(uuid, '0' * 32)))
+        return Document({
+            'title': 'lorem.doc',
+            'url': '{}/get/{}?{}'.format(self.url, uuid, urlencode({'Signature': signature, 'KeyID': self.keyid})),
+            'hash': 'md5:' + '0' * 32,
+            'format': 'application/msword',
+        })
+
+
+class Registry(object):
+
+    def __init__(self, docservice):
+        self.docservice_url = docservice.url
+        self.keyring = docservice.keyring
+
+
+class Request(object):
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.errors = []
+
+
+def serial(request, documents):
+    for document in documents:
+        check_document(request, document, 'body')
+
+
+def rate(check, request, payloads):
+    started = time()
+    for documents in payloads:
+        check(request, documents)
+    return sum(len(i) for i in payloads) / (time() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--documents', type=int, default=20, help='documents of a request')
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    docservice = Docservice()
+    request = Request(Registry(docservice))
+    payloads = [[docservice.document() for _ in range(args.documents)] for _ in range(args.requests)]
+    cache_size = args.requests * args.documents
+    signatures = DocumentSignatures(size=cache_size, pool_size=args.pool_size)
+    cases = [
+        ('serial', serial),
+        ('pool', DocumentSignatures(pool_size=args.pool_size).check),
+        ('pool, first', signatures.check),
+        ('pool, retried', signatures.check),
+    ]
+    print('{:<16} {:>10}'.format('check', 'docs/s'))
+    for name, check in cases:
+        print('{:<16} {:>10.0f}'.format(name, rate(check, request, payloads)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic raw monitoring documents for benchmarks
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from openprocurement.audit.api.models import Monitoring
+from openprocurement.audit.api.traversal import Root
+
+
+class Registry(object):
+    db = None
+    docservice_url = None
+
+
+class Request(object):
+    """
+    The part of a pyramid request the monitoring models use for serialization
+    """
+    registry = Registry()
+
+    def __init__(self, role='sas'):
+        self.authenticated_role = role
+        self.context = Root(self)
+
+    def monitoring_from_data(self, data):
+        return Monitoring(data)
+
+
+def iso(date):
+    return date.isoformat() + '+03:00'
+
+
+def document(date):
+    return {
+        'id': uuid4().hex,
+        'title': 'lorem.doc',
+        'url': 'http://localhost/get/{}'.format(uuid4().hex),
+        'hash': 'md5:' + '0' * 32,
+        'format': 'application/msword',
+        'author': 'monitoring_owner',
+        'datePublished': iso(date),
+        'dateModified': iso(date),
+    }
+
+
+def party(date):
+    return {
+        'id': uuid4().hex,
+        'name': 'The State Audit Service of Ukraine',
+        'identifier': {'scheme': 'UA-EDR', 'id': '40165856', 'uri': 'http://www.dkrs.gov.ua'},
+        'address': {'countryName': 'Ukraine', 'postalCode': '04070', 'region': 'Kyiv',
+                    'streetAddress': 'Petra Sahaidachnoho St, 4', 'locality': 'Kyiv'},
+        'contactPoint': {'name': 'Jane Doe', 'telephone': '0440000000'},
+        'roles': ['sas'],
+        'datePublished': iso(date),
+    }
+
+
+def report(date, documents=2):
+    return {
+        'description': 'text',
+        'documents': [document(date) for _ in range(documents)],
+        'dateCreated': iso(date),
+        'datePublished': iso(date),
+    }
+
+
+def post(date, related=None):
+    data = {
+        'id': uuid4().hex,
+        'title': 'Lorem ipsum',
+        'description': 'Lorem ipsum dolor sit amet',
+        'documents': [document(date)],
+        'author': 'tender_owner' if related else 'monitoring_owner',
+        'postOf': 'decision',
+        'datePublished': iso(date),
+    }
+    if related:
+        data['relatedPost'] = related['id']
+    return data
+
+
+def revision(date):
+    return {
+        'author': 'test_sas',
+        'date': iso(date),
+        'rev': None,
+        'changes': [{'op': 'replace', 'path': '/dateModified', 'value': iso(date)}],
+    }
+
+
+def monitoring(index=0, posts=20, documents=10, revisions=50):
+    """
+    An addressed monitoring with a dialogue of `posts` questions and answers
+    """
+    date = datetime(2018, 1, 1) + timedelta(minutes=index)
+    questions = [post(date) for _ in range(posts // 2)]
+    return {
+        '_id': uuid4().hex,
+        'doc_type': 'Monitoring',
+        'monitoring_id': 'UA-M-2018-01-01-{:06}'.format(index),
+        'tender_id': uuid4().hex,
+        'status': 'addressed',
+        'reasons': ['indicator', 'public'],
+        'procuringStages': ['planning', 'awarding'],
+        'riskIndicators': ['some_risk_indicator_id', 'some_other_id'],
+        'riskIndicatorsTotalImpact': 1.1,
+        'riskIndicatorsRegion': u'Київ',
+        'monitoringPeriod': {'startDate': iso(date), 'endDate': iso(date + timedelta(days=18))},
+        'eliminationPeriod': {'startDate': iso(date), 'endDate': iso(date + timedelta(days=10))},
+        'documents': [document(date) for _ in range(documents)],
+        'decision': report(date),
+        'conclusion': dict(report(date), violationOccurred=True, violationType=['documentsForm']),
+        'posts': questions + [post(date, related=i) for i in questions],
+        'parties': [party(date)],
+        'revisions': [revision(date) for _ in range(revisions)],
+        'tender_owner': 'broker',
+        'tender_owner_token': uuid4().hex,
+        'dateCreated': iso(date),
+        'dateModified': iso(date),
+    }
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Encode/decode speed of the installed JSON codecs on real-sized monitoring documents.
+
+    bin/python_interpreter benchmarks/json_codec.py --rows 200 --posts 20 --revisions 50
+"""
+from argparse import ArgumentParser
+from time import time
+
+from openprocurement.audit.api.codec import CODECS
+
+from fixtures import monitoring
+
+
+def rate(function, items):
+    started = time()
+    for item in items:
+        function(item)
+    return len(items) / (time() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--documents', type=int, default=10)
+    parser.add_argument('--revisions', type=int, default=50)
+    args = parser.parse_args()
+
+    docs = [monitoring(i, args.posts, args.documents, args.revisions) for i in range(args.rows)]
+    print('{:<12} {:>8} {:>14} {:>14} {:>14}'.format('codec', 'kB/doc', 'dumps docs/s', 'couch docs/s', 'loads docs/s'))
+    for name, factory in sorted(CODECS.items()):
+        try:
+            codec = factory()
+        except ImportError:
+            print('{:<12} not installed'.format(name))
+            continue
+        encoded = [codec.dumps(i) for i in docs]
+        print('{:<12} {:>8.1f} {:>14.0f} {:>14.0f} {:>14.0f}'.format(
+            name, sum(len(i) for i in encoded) / 1024.0 / len(encoded),
+            rate(codec.dumps, docs), rate(codec.encode_document, docs), rate(codec.loads, encoded)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Rendering of an opt_fields listing page: the JSON renderer vs the chunked JSONListing one.
+
+    bin/python_interpreter benchmarks/listing_render.py --limit 100
+"""
+from argparse import ArgumentParser
+from time import time
+
+from pyramid.renderers import JSON
+
+from openprocurement.audit.api.codec import JSONListing
+from openprocurement.audit.api.utils import monitoring_serialize
+
+from fixtures import Request, monitoring
+
+FIELDS = {'id', 'dateModified', 'status', 'decision', 'conclusion', 'documents', 'posts'}
+
+
+def measure(renderer, page, repeat):
+    render = renderer(None)
+    started = time()
+    for _ in range(repeat):
+        body = render(page, {})
+    chunks = [body] if isinstance(body, str) else body
+    return (time() - started) / repeat, max(len(i) for i in chunks), sum(len(i) for i in chunks)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    request = Request()
+    page = {
+        'data': [monitoring_serialize(request, monitoring(i), FIELDS) for i in range(args.limit)],
+        'next_page': {'offset': '', 'path': '/api/monitorings', 'uri': 'http://localhost/api/monitorings'},
+    }
+    print('{:<10} {:>10} {:>14} {:>12}'.format('renderer', 'time, ms', 'largest chunk', 'body'))
+    for name, renderer in (('json', JSON()), ('listing', JSONListing())):
+        took, largest, size = measure(renderer, page, args.repeat)
+        print('{:<10} {:>10.1f} {:>14} {:>12}'.format(name, took * 1000, largest, size))
+
+
+if __name__ == '__main__':
+    main()
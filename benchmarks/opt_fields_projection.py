@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Rows per second of opt_fields listing serialization: full Monitoring model vs monitoring_serialize.
+
+    bin/python_interpreter benchmarks/opt_fields_projection.py --rows 1000
+"""
+from argparse import ArgumentParser
+from time import time
+
+from openprocurement.audit.api.utils import monitoring_serialize
+
+from fixtures import Request, monitoring
+
+
+def model_serialize(request, monitoring_data, fields):
+    monitoring = request.monitoring_from_data(monitoring_data)
+    monitoring.__parent__ = request.context
+    return {i: j for i, j in monitoring.serialize('view').items() if i in fields}
+
+
+def rate(serialize, request, rows, fields):
+    started = time()
+    for row in rows:
+        serialize(request, row, fields)
+    return len(rows) / (time() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--role', default='sas')
+    args = parser.parse_args()
+
+    request = Request(args.role)
+    rows = [monitoring(i) for i in range(args.rows)]
+    cases = [
+        ('plain', {'id', 'dateModified', 'status', 'reasons', 'procuringStages', 'riskIndicators'}),
+        ('nested', {'id', 'dateModified', 'status', 'decision', 'conclusion'}),
+    ]
+    print('{:<8} {:>14} {:>16}'.format('fields', 'model rows/s', 'projected rows/s'))
+    for name, fields in cases:
+        assert model_serialize(request, rows[0], fields) == monitoring_serialize(request, rows[0], fields)
+        print('{:<8} {:>14.0f} {:>16.0f}'.format(
+            name, rate(model_serialize, request, rows, fields), rate(monitoring_serialize, request, rows, fields)))
+
+
+if __name__ == '__main__':
+    main()
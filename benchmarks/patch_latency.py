@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+PATCH latency against monitoring document size: 'plain' serializations vs the raw document snapshot.
+
+Times the model work of a write request, from the document read in traversal.factory
+to the dict stored by save_monitoring; the database round trips are left out.
+
+    bin/python_interpreter benchmarks/patch_latency.py --repeat 100
+"""
+from argparse import ArgumentParser
+from json import dumps
+from time import time
+
+from openprocurement.api.utils import apply_data_patch, get_revision_changes
+from openprocurement.audit.api.models import plain_data
+
+from fixtures import Request, monitoring
+
+
+def serialized_patch(request, doc, changes):
+    model = request.monitoring_from_data(doc)
+    model.__parent__ = request.context
+    src = model.serialize('plain')
+    model.import_data(apply_data_patch(src, changes))
+    patch = get_revision_changes(src, model.serialize('plain'))
+    model.validate()
+    return patch, model.to_primitive()
+
+
+def snapshot_patch(request, doc, changes):
+    model = request.monitoring_from_data(doc)
+    model.__parent__ = request.context
+    src = plain_data(doc)
+    model.import_data(apply_data_patch(src, changes))
+    model.validate()
+    data = model.to_primitive()
+    return get_revision_changes(src, plain_data(data)), data
+
+
+def latency(patch, request, doc, changes, repeat):
+    started = time()
+    for _ in range(repeat):
+        patch(request, doc, changes)
+    return (time() - started) / repeat * 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--role', default='sas')
+    args = parser.parse_args()
+
+    request = Request(args.role)
+    changes = {'reasons': ['public']}
+    print('{:>6} {:>10} {:>16} {:>16}'.format('posts', 'doc KiB', 'serialized ms', 'snapshot ms'))
+    for posts in (10, 50, 100, 500, 1000):
+        doc = monitoring(posts=posts, documents=posts // 10, revisions=0)
+        doc.pop('revisions')
+        doc['id'] = doc['_id']
+        assert serialized_patch(request, doc, changes)[0] == snapshot_patch(request, doc, changes)[0]
+        print('{:>6} {:>10.0f} {:>16.2f} {:>16.2f}'.format(
+            posts, len(dumps(doc)) / 1024.,
+            latency(serialized_patch, request, doc, changes, args.repeat),
+            latency(snapshot_patch, request, doc, changes, args.repeat),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Validation latency of a monitoring on save against the number of its posts.
+
+Compares the index of the dialogue built once per validation of the monitoring
+with an index built by the validators of every post, as the id lists used to be.
+
+    bin/python_interpreter benchmarks/post_validation.py --repeat 20
+"""
+from argparse import ArgumentParser
+from time import time
+
+from schematics.models import Model
+
+from openprocurement.audit.api.models import Monitoring
+
+from fixtures import monitoring
+
+
+def per_pass(model):
+    model.validate()
+
+
+def per_post(model):
+    # skips Monitoring.validate, so that every validator indexes the dialogue itself
+    Model.validate(model)
+
+
+def latency(validate, doc, repeat):
+    models = [Monitoring(doc) for _ in range(repeat)]
+    started = time()
+    for model in models:
+        validate(model)
+    return (time() - started) / repeat * 1000
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print('{:>6} {:>14} {:>14}'.format('posts', 'per post ms', 'per pass ms'))
+    for posts in (10, 50, 100, 250, 500, 1000):
+        doc = monitoring(posts=posts, documents=0, revisions=0)
+        doc.pop('revisions')
+        print('{:>6} {:>14.2f} {:>14.2f}'.format(
+            posts,
+            latency(per_post, doc, args.repeat),
+            latency(per_pass, doc, args.repeat),
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Documents per second of the view export of a monitoring: schematics model vs raw render,
+with render plans compiled once and on every render.
+
+    bin/python_interpreter benchmarks/serialization_plans.py --rows 200 --posts 20
+"""
+from argparse import ArgumentParser
+from time import time
+
+from openprocurement.audit.api.models import Monitoring
+from openprocurement.audit.api.raw import PLANS, render_model
+
+from fixtures import Request, monitoring
+
+
+def model_export(request, data):
+    model = request.monitoring_from_data(data)
+    model.__parent__ = request.context
+    return model.serialize('view')
+
+
+def cached_plans(request, data):
+    return render_model(Monitoring, data, 'view', request)
+
+
+def compiled_plans(request, data):
+    PLANS.clear()
+    return render_model(Monitoring, data, 'view', request)
+
+
+def rate(export, request, rows):
+    started = time()
+    for row in rows:
+        export(request, row)
+    return len(rows) / (time() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--documents', type=int, default=10)
+    parser.add_argument('--revisions', type=int, default=50)
+    parser.add_argument('--role', default='sas')
+    args = parser.parse_args()
+
+    request = Request(args.role)
+    rows = [monitoring(i, args.posts, args.documents, args.revisions) for i in range(args.rows)]
+    print('{:<16} {:>10}'.format('export', 'docs/s'))
+    for name, export in (('model', model_export), ('compiled plans', compiled_plans), ('cached plans', cached_plans)):
+        print('{:<16} {:>10.0f}'.format(name, rate(export, request, rows)))
+
+
+if __name__ == '__main__':
+    main()
@@ -152,7 +152,7 @@ class MonitoringsResourceTest(BaseDocWebTest, base_test.DSWebTestMixin):
             ]
         }
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_monitoring_life_cycle_with_violations(self, mock_api_client):
         tender_token = self._generate_test_uuid().hex
         mock_api_client.return_value.extract_credentials.return_value = {
@@ -1,7 +1,42 @@
 from openprocurement.api.auth import authenticated_role
-from pyramid.events import ContextFound
-from openprocurement.audit.api.design import add_design
-from openprocurement.audit.api.utils import monitoring_from_data, extract_monitoring, set_logging_context
+from openprocurement.api.constants import WORKING_DAYS
+from pyramid.events import ContextFound, ApplicationCreated
+from openprocurement.audit.api.constants import (
+    MONITORING_ID_BLOCK_SIZE,
+    MONITORING_CACHE_SIZE,
+    MONITORING_CACHE_TTL,
+    TENDERS_API_TIMEOUT,
+    TENDERS_API_POOL_SIZE,
+    TENDERS_API_FAILURE_THRESHOLD,
+    TENDERS_API_RESET_TIMEOUT,
+    TENDER_CREDENTIALS_CACHE_SIZE,
+    TENDER_CREDENTIALS_CACHE_TTL,
+    TENDER_CREDENTIALS_NEGATIVE_TTL,
+    DOCUMENT_SIGNATURES_CACHE_SIZE,
+    DOCUMENT_CHECK_POOL_SIZE,
+    DEADLINE_SCHEDULER_INTERVAL,
+    DEADLINE_SCHEDULER_BATCH_SIZE,
+    CHANGES_BUFFER_SIZE,
+    CHANGES_TIMEOUT,
+    CHANGES_HEARTBEAT,
+)
+from openprocurement.audit.api.changes import ChangesHub
+from openprocurement.audit.api.codec import get_codec, use_codec
+from openprocurement.audit.api.business_calendar import get_business_calendar
+from openprocurement.audit.api.design import add_design, cleanup_design, JS_INDEX_BACKEND
+from openprocurement.audit.api.scheduler import DeadlineScheduler, start_deadline_scheduler
+from openprocurement.audit.api.utils import (
+    monitoring_from_data,
+    extract_monitoring,
+    extract_monitoring_doc,
+    extract_monitoring_rev,
+    set_logging_context,
+    MonitoringIdAllocator,
+    MonitoringCache,
+    CircuitBreaker,
+    TenderCredentials,
+    DocumentSignatures,
+)
 from logging import getLogger
 from pkg_resources import get_distribution
 
@@ -10,14 +45,60 @@ PKG = get_distribution(__package__)
 LOGGER = getLogger(PKG.project_name)
 
 
+def remove_obsolete_design(event):
+    registry = event.app.registry
+    cleanup_design(registry.db, registry.settings.get('index_backend', JS_INDEX_BACKEND))
+
+
 def includeme(config):
     LOGGER.info('init audit plugin')
-    add_design()
+    settings = config.get_settings()
+    add_design(settings.get('index_backend', JS_INDEX_BACKEND))
+    use_codec(config, get_codec(settings.get('json_codec')))
+    get_business_calendar(WORKING_DAYS)
     config.add_subscriber(set_logging_context, ContextFound)
+    config.add_subscriber(remove_obsolete_design, ApplicationCreated)
+    config.add_subscriber(start_deadline_scheduler, ApplicationCreated)
     config.add_request_method(extract_monitoring, 'monitoring', reify=True)
+    config.add_request_method(extract_monitoring_doc, 'monitoring_doc', reify=True)
+    config.add_request_method(extract_monitoring_rev, 'monitoring_rev', reify=True)
     config.add_request_method(monitoring_from_data)
-    settings = config.get_settings()
     config.registry.api_token = settings.get('api_token')
     config.registry.api_server = settings.get('api_server')
     config.registry.api_version = settings.get('api_version')
+    config.registry.monitoring_id_allocator = MonitoringIdAllocator(
+        int(settings.get('monitoring_id_block_size', MONITORING_ID_BLOCK_SIZE)))
+    config.registry.monitoring_cache = MonitoringCache(
+        int(settings.get('monitoring_cache_size', MONITORING_CACHE_SIZE)),
+        float(settings.get('monitoring_cache_ttl', MONITORING_CACHE_TTL)))
+    config.registry.tender_credentials = TenderCredentials(
+        config.registry.api_token,
+        config.registry.api_server,
+        config.registry.api_version,
+        timeout=float(settings.get('tenders_api_timeout', TENDERS_API_TIMEOUT)),
+        pool_size=int(settings.get('tenders_api_pool_size', TENDERS_API_POOL_SIZE)),
+        size=int(settings.get('tender_credentials_cache_size', TENDER_CREDENTIALS_CACHE_SIZE)),
+        ttl=float(settings.get('tender_credentials_cache_ttl', TENDER_CREDENTIALS_CACHE_TTL)),
+        negative_ttl=float(settings.get('tender_credentials_negative_ttl', TENDER_CREDENTIALS_NEGATIVE_TTL)),
+        breaker=CircuitBreaker(
+            int(settings.get('tenders_api_failure_threshold', TENDERS_API_FAILURE_THRESHOLD)),
+            float(settings.get('tenders_api_reset_timeout', TENDERS_API_RESET_TIMEOUT))))
+    config.registry.document_signatures = DocumentSignatures(
+        int(settings.get('document_signatures_cache_size', DOCUMENT_SIGNATURES_CACHE_SIZE)),
+        int(settings.get('document_check_pool_size', DOCUMENT_CHECK_POOL_SIZE)))
+    # the scheduler is started by every worker, the ticks are made by the one holding its lease in the database
+    if settings.get('deadline_scheduler', '').lower() == 'true':
+        config.registry.deadline_scheduler = DeadlineScheduler(
+            config.registry,
+            float(settings.get('deadline_scheduler_interval', DEADLINE_SCHEDULER_INTERVAL)),
+            int(settings.get('deadline_scheduler_batch_size', DEADLINE_SCHEDULER_BATCH_SIZE)))
+    config.registry.changes_hub = ChangesHub(
+        config.registry,
+        int(settings.get('changes_buffer_size', CHANGES_BUFFER_SIZE)),
+        float(settings.get('changes_timeout', CHANGES_TIMEOUT)))
+    config.registry.changes_heartbeat = float(settings.get('changes_heartbeat', CHANGES_HEARTBEAT))
+    # routes are matched in the order they are added, venusian adds them by view module in alphabetical order
+    # and by class name within a module, so a /monitorings/<name> resource, as /monitorings/stats,
+    # is kept in a module named before "monitoring" or in a class named before MonitoringResource,
+    # for its route to be added before /monitorings/{monitoring_id} and <name> not to be taken for a monitoring id
     config.scan("openprocurement.audit.api.views")
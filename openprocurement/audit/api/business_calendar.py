@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Working days arithmetic on a calendar compiled from a WORKING_DAYS mapping:
+the ordinals of working days in a span of years and, for every day of the span,
+the number of working days up to it, so that moving a date by N working days
+is a couple of list lookups instead of stepping through the days.
+"""
+from datetime import date, timedelta
+
+CALENDAR_YEARS_AHEAD = 10
+
+
+def is_non_working_day(day, working_days):
+    return day.weekday() in (5, 6) and working_days.get(day.isoformat(), True) \
+        or working_days.get(day.isoformat(), False)
+
+
+def midnight(date_obj):
+    return date_obj.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class BusinessCalendar(object):
+    """
+    Working days of the years of a WORKING_DAYS mapping and the current year,
+    from the year before the first of them to CALENDAR_YEARS_AHEAD years after the last.
+    Methods return None for dates out of the span, callers fall back to stepping through the days then.
+    """
+
+    def __init__(self, working_days, today=None):
+        years = [int(i[:4]) for i in working_days] + [(today or date.today()).year]
+        self.first = date(min(years) - 1, 1, 1).toordinal()
+        self.last = date(max(years) + CALENDAR_YEARS_AHEAD, 12, 31).toordinal()
+        self.working = []
+        self.ordinals = []
+        self.counts = []
+        for ordinal in xrange(self.first, self.last + 1):
+            working = not is_non_working_day(date.fromordinal(ordinal), working_days)
+            self.working.append(working)
+            if working:
+                self.ordinals.append(ordinal)
+            self.counts.append(len(self.ordinals))
+
+    def is_non_working(self, day):
+        ordinal = day.toordinal()
+        if self.first <= ordinal <= self.last:
+            return not self.working[ordinal - self.first]
+
+    def add_working_days(self, date_obj, timedelta_obj):
+        """
+        The date timedelta_obj.days working days after (or before) date_obj,
+        exactly as openprocurement.tender.core.utils.calculate_business_date with working_days does:
+        a date on a non-working day is moved to midnight first
+        """
+        ordinal = date_obj.toordinal()
+        if not self.first <= ordinal <= self.last:
+            return None
+        working = self.working[ordinal - self.first]
+        # working days before the day of date_obj
+        before = self.counts[ordinal - self.first] - working
+        days = abs(timedelta_obj.days)
+        start = date_obj if working else midnight(date_obj)
+        if timedelta_obj > timedelta():
+            # a non-working day is moved to the next working day before counting
+            index = before + days
+        else:
+            if not days:
+                if working:
+                    return date_obj
+                # a non-working day is moved to the day after the previous working day
+                if not before:
+                    return None
+                return start + timedelta(days=self.ordinals[before - 1] + 1 - ordinal)
+            index = before - days
+        if not 0 <= index < len(self.ordinals):
+            return None
+        return start + timedelta(days=self.ordinals[index] - ordinal)
+
+
+CALENDARS = {}
+
+
+def get_business_calendar(working_days):
+    """
+    The calendar compiled from a WORKING_DAYS mapping, compiled on the first use of the mapping
+    """
+    key = id(working_days)
+    if key not in CALENDARS or CALENDARS[key][0] is not working_days:
+        if len(CALENDARS) > 4:
+            CALENDARS.clear()
+        CALENDARS[key] = (working_days, BusinessCalendar(working_days))
+    return CALENDARS[key][1]
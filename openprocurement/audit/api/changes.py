@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Change notifications of /monitorings/changes: a worker follows the couchdb _changes feed
+with a single long-poll subscription, keeps the recent changes in a buffer
+and wakes up every waiting client when new ones come.
+"""
+from collections import deque
+from logging import getLogger
+from time import time
+
+from gevent import spawn, sleep
+from gevent.event import Event
+
+from openprocurement.audit.api.design import feed_listings, changes_data
+
+LOGGER = getLogger(__name__)
+
+
+class ChangesHub(object):
+    """
+    The buffer holds (seq, listings, data) of every change after base_seq,
+    clients that resume from a seq that isn't there any more (or never was, as it comes from
+    another worker) catch up with a query of their own and continue from the buffer then
+    """
+
+    def __init__(self, registry, buffer_size=1000, timeout=60):
+        self.registry = registry
+        self.timeout = timeout
+        self.changes = deque(maxlen=buffer_size)
+        self.base_seq = self.last_seq = None
+        self.event = Event()
+        self.greenlet = None
+
+    def start(self):
+        if self.greenlet is None:
+            self.greenlet = spawn(self.run)
+
+    def stop(self):
+        if self.greenlet is not None:
+            self.greenlet.kill()
+            self.greenlet = None
+
+    def run(self):
+        while True:
+            try:
+                self.poll('longpoll')
+            except Exception:  # pragma: no cover
+                LOGGER.exception('Changes feed request failed', extra={'MESSAGE_ID': 'changes_feed_error'})
+                sleep(1)
+
+    def entries(self, results):
+        # changes of other documents, such as revisions of monitorings, only keep their seq
+        entries = []
+        for row in results:
+            listings = feed_listings(row['doc']) if row.get('doc') else frozenset()
+            entries.append((row['seq'], listings, changes_data(row['doc']) if listings else None))
+        return entries
+
+    def poll(self, feed='normal'):
+        """
+        Reads the changes after the last seen one and wakes up the clients waiting for them
+        """
+        db = self.registry.db
+        data = db.changes(feed=feed, since=self.current_seq(), include_docs=True,
+                          timeout=int(self.timeout * 1000), limit=self.changes.maxlen)
+        for entry in self.entries(data['results']):
+            if len(self.changes) == self.changes.maxlen:
+                self.base_seq = self.changes[0][0]
+            self.changes.append(entry)
+        self.last_seq = data['last_seq']
+        if data['results']:
+            event, self.event = self.event, Event()
+            event.set()
+
+    def current_seq(self):
+        if self.last_seq is None:
+            self.base_seq = self.last_seq = self.registry.db.info()['update_seq']
+        return self.last_seq
+
+    def changes_since(self, since):
+        """
+        :return: changes after since and the seq to continue from
+        """
+        last_seq = self.current_seq()
+        if since is None or str(since) == str(last_seq):
+            return [], last_seq
+        if str(since) == str(self.base_seq):
+            return list(self.changes), last_seq
+        for index in xrange(len(self.changes) - 1, -1, -1):
+            if str(self.changes[index][0]) == str(since):
+                return list(self.changes)[index + 1:], last_seq
+        data = self.registry.db.changes(since=since, include_docs=True, limit=self.changes.maxlen)
+        return self.entries(data['results']), data['last_seq']
+
+    def wait(self, since, listing, timeout):
+        """
+        Waits up to timeout seconds for changes of the listing after since
+        :return: (seq, data) of the changes and the seq to continue from
+        """
+        end = time() + timeout
+        while True:
+            event = self.event
+            entries, since = self.changes_since(since)
+            # a document changed again is sent once, at its last change
+            latest = {data['id']: seq for seq, _, data in entries if data}
+            items = [(seq, data) for seq, listings, data in entries
+                     if listing in listings and latest[data['id']] == seq]
+            remaining = end - time()
+            if items or remaining <= 0:
+                return items, since
+            self.start()
+            event.wait(remaining)
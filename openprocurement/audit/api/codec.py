@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+JSON codec of the plugin: it parses and encodes the couchdb documents and renders the responses
+of json_view views and listings. The json_codec setting names it, if it isn't set the fastest installed
+codec of JSON_CODECS is used. simplejson is preferred as its C speedups also encode the non-ascii strings
+of couchdb documents (ensure_ascii=False), which the stdlib json of python 2 encodes in python,
+see benchmarks/json_codec.py for the rates of the installed codecs.
+"""
+import json
+from logging import getLogger
+
+import couchdb.json
+from pyramid.renderers import JSON
+
+from openprocurement.audit.api.constants import JSON_CODECS, LISTING_CHUNK_SIZE
+
+LOGGER = getLogger(__name__)
+
+# the renderer of json_view
+JSON_RENDERER = 'audit_json'
+# the renderer of listing pages
+JSON_LISTING_RENDERER = 'audit_json_listing'
+
+STDLIB_CODEC = 'json'
+
+# the codec couchdb.json was last switched to (see use_codec)
+_document_codec = None
+
+
+class JSONCodec(object):
+    """
+    dumps and loads take the arguments of the stdlib ones,
+    and produce exactly what the stdlib ones do for the data of the API
+    """
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def encode_document(self, data):
+        # as couchdb.json encodes documents by default
+        return self.dumps(data, allow_nan=False, ensure_ascii=False)
+
+
+def stdlib_codec():
+    return JSONCodec(STDLIB_CODEC, json.dumps, json.loads)
+
+
+def simplejson_codec():
+    import simplejson
+    return JSONCodec('simplejson', simplejson.dumps, simplejson.loads)
+
+
+CODECS = {
+    STDLIB_CODEC: stdlib_codec,
+    'simplejson': simplejson_codec,
+}
+
+
+def get_codec(name=None):
+    if name is None:
+        # the last one is the stdlib json, that is always installed
+        for name in JSON_CODECS:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                pass
+    if name not in CODECS:
+        raise ValueError('Unknown json codec {}, expected one of: {}'.format(name, ', '.join(sorted(CODECS))))
+    try:
+        return CODECS[name]()
+    except ImportError:
+        LOGGER.warning('JSON codec {} is not installed, {} is used instead'.format(name, STDLIB_CODEC))
+        return CODECS[STDLIB_CODEC]()
+
+
+class JSONListing(JSON):
+    """
+    Renders a listing page, a dict with a data list, item by item into chunks of about chunk_size bytes
+    that make the response app_iter, so the body of a large page isn't joined into a single string.
+    The page is rendered whole before the response starts, so a failure is an error response, not a cut body.
+    Other values are rendered as JSON does.
+    """
+
+    def __init__(self, serializer=json.dumps, chunk_size=LISTING_CHUNK_SIZE, **kw):
+        super(JSONListing, self).__init__(serializer=serializer, **kw)
+        self.chunk_size = chunk_size
+
+    def __call__(self, info):
+        render = super(JSONListing, self).__call__(info)
+
+        def _render(value, system):
+            if not isinstance(value, dict) or not isinstance(value.get('data'), list):
+                return render(value, system)
+            members = {i: j for i, j in value.items() if i != 'data'}
+            dumps = lambda item: render(item, system)
+            return list(iter_json_listing(iter(value['data']), lambda: members, dumps, self.chunk_size))
+
+        return _render
+
+
+def iter_json_listing(items, page, dumps=json.dumps, chunk_size=LISTING_CHUNK_SIZE):
+    # the first item is a chunk of its own, the others go in chunks of chunk_size bytes
+    chunk = ['{"data": [']
+    size = 0
+    for index, item in enumerate(items):
+        value = dumps(item)
+        chunk.append(', ' + value if index else value)
+        size += len(value)
+        if size >= chunk_size or not index:
+            yield ''.join(chunk)
+            chunk = []
+            size = 0
+    chunk.append(']')
+    for name, value in page().items():
+        chunk.append(', {}: {}'.format(dumps(name), dumps(value)))
+    chunk.append('}')
+    yield ''.join(chunk)
+
+
+def use_codec(config, codec):
+    """
+    Makes the codec encode and parse couchdb documents and render json_view responses and listings.
+    The couchdb codec is process-wide, so of the apps of a process configured with different codecs
+    the documents of all of them are handled by the codec of the last one.
+    """
+    global _document_codec
+    if _document_codec is not None and _document_codec.name != codec.name:
+        LOGGER.warning('JSON codec of couchdb documents of the process is changed from {} to {}'.format(
+            _document_codec.name, codec.name))
+    _document_codec = codec
+    couchdb.json.use(decode=codec.loads, encode=codec.encode_document)
+    config.add_renderer(JSON_RENDERER, JSON(serializer=codec.dumps))
+    config.add_renderer(JSON_LISTING_RENDERER, JSONListing(serializer=codec.dumps))
+    config.registry.json_codec = codec
@@ -8,6 +8,68 @@ ELIMINATION_PERIOD_TIME = timedelta(days=10)
 ELIMINATION_PERIOD_NO_VIOLATIONS_TIME = timedelta(days=3)
 POST_OVERDUE_TIME = timedelta(days=3)
 
+# Monitoring sequence numbers leased by a worker at once
+MONITORING_ID_BLOCK_SIZE = 20
+# Attempts to lease them from the counter document and the first backoff between attempts (seconds),
+# doubled after every attempt
+MONITORING_ID_LEASE_ATTEMPTS = 10
+MONITORING_ID_LEASE_BACKOFF = 0.01
+
+# Raw monitoring documents cached by a worker (0 disables the cache)
+# and seconds a cached document is served without a revision check
+MONITORING_CACHE_SIZE = 0
+MONITORING_CACHE_TTL = 0
+
+# Monitorings created by a single POST /monitorings/batch at most
+MONITORING_BATCH_SIZE = 1000
+
+# Documents added by a single document POST at most and files of it uploaded to the docservice at once
+DOCUMENT_BATCH_SIZE = 100
+DOCUMENT_UPLOAD_CONCURRENCY = 10
+
+# Verified docservice signatures of documents kept by a worker (0 disables the cache)
+# and threads of a worker checking the documents of a request at once
+DOCUMENT_SIGNATURES_CACHE_SIZE = 10000
+DOCUMENT_CHECK_POOL_SIZE = 4
+
+# Seconds a tenders API call may take and connections to the tenders API kept by a worker
+TENDERS_API_TIMEOUT = 10
+TENDERS_API_POOL_SIZE = 10
+
+# Consecutive tenders API failures that open the circuit to it and seconds it stays open
+TENDERS_API_FAILURE_THRESHOLD = 5
+TENDERS_API_RESET_TIMEOUT = 30
+
+# Seconds between the ticks of the deadline scheduler and monitorings it reads at once
+DEADLINE_SCHEDULER_INTERVAL = 60
+DEADLINE_SCHEDULER_BATCH_SIZE = 100
+
+# tender_token hashes cached by a worker (0 disables the cache),
+# seconds they are cached and seconds unknown tenders are cached
+TENDER_CREDENTIALS_CACHE_SIZE = 10000
+TENDER_CREDENTIALS_CACHE_TTL = 3600
+TENDER_CREDENTIALS_NEGATIVE_TTL = 60
+
+# Changes of monitorings a worker keeps for /monitorings/changes clients,
+# the longest a request waits for changes (seconds) and the interval of event stream heartbeats
+CHANGES_BUFFER_SIZE = 1000
+CHANGES_TIMEOUT = 60
+CHANGES_HEARTBEAT = 15
+
+# Documents of an opt_fields tender listing read from couchdb at once
+# and bytes of a chunk of a rendered listing page
+LISTING_DOCS_BATCH_SIZE = 20
+LISTING_CHUNK_SIZE = 16384
+
+# Documents of a monitorings export read from couchdb at once
+# and bytes of the export compressed and flushed at once
+EXPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 262144
+
+# JSON codecs of couchdb documents and responses, fastest first (see codec.CODECS),
+# the first installed one is used unless the json_codec setting names one
+JSON_CODECS = ('simplejson', 'json')
+
 # Object type strings
 MONITORING_OBJECT_TYPE = 'monitoring'
 CANCELLATION_OBJECT_TYPE = 'cancellation'
@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+from couchdb import ResourceConflict
+from couchdb.client import Row
 from couchdb.design import ViewDefinition
 from openprocurement.api import design
 
@@ -11,92 +13,212 @@ CHANGES_FIELDS = FIELDS + [
 ]
 
 
-def add_design():
+JS_INDEX_BACKEND = 'javascript'
+NATIVE_INDEX_BACKEND = 'erlang'
+INDEX_BACKENDS = (JS_INDEX_BACKEND, NATIVE_INDEX_BACKEND)
+
+JS_DESIGN = 'monitorings'
+# native views live in a design document of their own, as CouchDB allows one language per design document
+NATIVE_DESIGN = 'monitorings_native'
+
+# the view definitions built for the index backend, by view name (see add_design)
+ACTIVE_VIEWS = {}
+
+
+def add_design(index_backend=JS_INDEX_BACKEND):
+    if index_backend not in INDEX_BACKENDS:
+        raise ValueError('Unknown index backend {}, expected one of: {}'.format(
+            index_backend, ', '.join(INDEX_BACKENDS)))
+    ACTIVE_VIEWS.clear()
     for i, j in globals().items():
-        if "_view" in i:
+        if "_view" in i and isinstance(j, ViewDefinition):
+            if index_backend == NATIVE_INDEX_BACKEND:
+                j = native_view(j)
+            ACTIVE_VIEWS[j.name] = j
             setattr(design, i, j)
 
 
+def native_view(view):
+    """
+    A copy of a view definition with its erlang map function, in the native design document.
+    The view name is kept, so active_view finds the copy by the javascript definition.
+    """
+    return ViewDefinition(NATIVE_DESIGN, view.name, NATIVE_MAP_FUNCTIONS[view.name],
+                          reduce_fun=view.reduce_fun, language=NATIVE_INDEX_BACKEND)
+
+
+def active_view(view):
+    """
+    The definition of a view built for the configured index backend
+    """
+    return ACTIVE_VIEWS.get(view.name, view)
+
+
+def view_path(view):
+    view = active_view(view)
+    return '{}/{}'.format(view.design, view.name)
+
+
+def native_fields(fields):
+    return '[{}]'.format(', '.join('<<"{}">>'.format(i) for i in fields))
+
+
 # the view below is used for an internal system monitoring
-monitorings_all_view = ViewDefinition('monitorings', 'all', '''function(doc) {
+monitorings_all_view = ViewDefinition(JS_DESIGN, 'all', '''function(doc) {
     if(doc.doc_type == 'Monitoring') {
         emit(doc.monitoring_id, null);
     }
 }''')
 
-monitorings_by_dateModified_view = ViewDefinition('monitorings', 'by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
-        }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
+# feed listings a monitoring can appear in (see FeedView)
+REAL_LISTING = 'real'
+TEST_LISTING = 'test'
+ALL_LISTING = 'all'
+REAL_DRAFT_LISTING = 'real_draft'
+ALL_DRAFT_LISTING = 'all_draft'
 
-monitorings_real_by_dateModified_view = ViewDefinition('monitorings', 'real_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && !doc.mode && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
+# the only view backing both dateModified and changes feeds of /monitorings
+# it emits [feed, listing, sort_key] for every listing the monitoring belongs to,
+# so the couchjs map runs once per document instead of once per feed/listing pair
+monitorings_feed_view = ViewDefinition(JS_DESIGN, 'feed', '''function(doc) {
+    if(doc.doc_type == 'Monitoring') {
+        var fields=%s, changes_fields=%s, data={}, changes_data={};
         for (var i in fields) {
             if (doc[fields[i]]) {
                 data[fields[i]] = doc[fields[i]]
             }
         }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
-
-monitorings_test_by_dateModified_view = ViewDefinition('monitorings', 'test_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && doc.mode == 'test' && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
+        for (var i in changes_fields) {
+            if (doc[changes_fields[i]]) {
+                changes_data[changes_fields[i]] = doc[changes_fields[i]]
             }
         }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
-
-monitorings_real_draft_by_dateModified_view = ViewDefinition('monitorings', 'real_draft_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && !doc.mode) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
+        var listings = ['%s'];
+        if (!doc.mode) {
+            listings.push('%s');
         }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
-
-monitorings_all_draft_by_dateModified_view = ViewDefinition('monitorings', 'draft_by_dateModified', '''function(doc) {
-    if(doc.doc_type == 'Monitoring') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
+        if (['draft', 'cancelled'].indexOf(doc.status) == -1) {
+            listings.push('%s');
+            if (!doc.mode) {
+                listings.push('%s');
+            } else if (doc.mode == 'test') {
+                listings.push('%s');
             }
         }
-        emit(doc.dateModified, data);
-    }
-}''' % FIELDS)
-
-monitorings_by_local_seq_view = ViewDefinition('monitorings', 'by_local_seq', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
-            }
+        for (var i in listings) {
+            emit(['dateModified', listings[i], doc.dateModified], data);
+            emit(['changes', listings[i], doc._local_seq], changes_data);
         }
-        emit(doc._local_seq, data);
     }
-}''' % CHANGES_FIELDS)
+}''' % (FIELDS, CHANGES_FIELDS, ALL_DRAFT_LISTING, REAL_DRAFT_LISTING, ALL_LISTING, REAL_LISTING, TEST_LISTING))
+
+
+def feed_listings(doc):
+    """
+    Listings monitorings_feed_view puts a document in, for filtering couchdb changes the same way
+    """
+    if doc.get('doc_type') != 'Monitoring':
+        return frozenset()
+    listings = [ALL_DRAFT_LISTING]
+    if not doc.get('mode'):
+        listings.append(REAL_DRAFT_LISTING)
+    if doc.get('status') not in ('draft', 'cancelled'):
+        listings.append(ALL_LISTING)
+        if not doc.get('mode'):
+            listings.append(REAL_LISTING)
+        elif doc.get('mode') == 'test':
+            listings.append(TEST_LISTING)
+    return frozenset(listings)
+
+
+def changes_data(doc):
+    """
+    Value of the changes feed rows of monitorings_feed_view for a document, with its id
+    """
+    data = {i: doc[i] for i in CHANGES_FIELDS if doc.get(i)}
+    data['id'] = doc['_id']
+    return data
+
+
+# views replaced by monitorings_feed_view, dropped from the design document on startup
+OBSOLETE_VIEWS = [
+    'by_dateModified',
+    'real_by_dateModified',
+    'test_by_dateModified',
+    'real_draft_by_dateModified',
+    'draft_by_dateModified',
+    'by_local_seq',
+    'real_by_local_seq',
+    'test_by_local_seq',
+    'real_draft_by_local_seq',
+    'draft_by_local_seq',
+]
+
+
+def cleanup_design(db, index_backend=JS_INDEX_BACKEND):
+    """
+    Deletes the design document of the other index backend, so CouchDB doesn't keep its indexes up to date,
+    and drops the obsolete views from the javascript one
+    """
+    unused_doc = db.get('_design/{}'.format(JS_DESIGN if index_backend == NATIVE_INDEX_BACKEND else NATIVE_DESIGN))
+    if unused_doc:
+        try:
+            db.delete(unused_doc)
+        except ResourceConflict:  # pragma: no cover
+            pass  # another worker has already deleted the design document
+        else:
+            db.cleanup()  # index files of a deleted design document are only removed by _view_cleanup
+    if index_backend == NATIVE_INDEX_BACKEND:
+        return
+    design_doc = db.get('_design/{}'.format(JS_DESIGN))
+    if design_doc and any(name in design_doc.get('views', {}) for name in OBSOLETE_VIEWS):
+        for name in OBSOLETE_VIEWS:
+            design_doc['views'].pop(name, None)
+        try:
+            db.save(design_doc)
+        except ResourceConflict:  # pragma: no cover
+            pass  # another worker has already updated the design document
+
 
-monitorings_real_by_local_seq_view = ViewDefinition('monitorings', 'real_by_local_seq', '''function(doc) {
+class FeedView(object):
+    """
+    A slice of a composite-key view that looks like a plain ViewDefinition:
+    it is queried with bare sort keys and yields rows keyed by them,
+    so it can be used in VIEW_MAP/CHANGES_VIEW_MAP of APIResourceListing
+    """
+
+    def __init__(self, view, *prefix):
+        self.view = view
+        self.prefix = list(prefix)
+
+    def __call__(self, db, startkey=None, endkey=None, descending=False, **options):
+        low, high = self.prefix, self.prefix + [{}]
+        if startkey is None:
+            startkey = high if descending else low
+        else:
+            startkey = self.prefix + [startkey]
+        if endkey is None:
+            endkey = low if descending else high
+        else:
+            endkey = self.prefix + [endkey]
+        rows = active_view(self.view)(db, startkey=startkey, endkey=endkey, descending=descending, **options)
+        for row in rows:
+            yield Row(row, key=row.key[len(self.prefix)])
+
+
+def view_batches(view, db, batch, **options):
+    """
+    Rows of a view queried batch rows at a time, so that include_docs listings
+    don't hold all the documents of a page in memory at once
+    """
+    return db.iterview(view_path(view), batch, **options)
+
+
+MONITORINGS_BY_TENDER_FIELDS = [
+    'status',
+]
+
+monitorings_by_tender_id_view = ViewDefinition(JS_DESIGN, 'by_tender_id', '''function(doc) {
     if(doc.doc_type == 'Monitoring' && !doc.mode && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
         var fields=%s, data={};
         for (var i in fields) {
@@ -104,11 +226,11 @@ monitorings_real_by_local_seq_view = ViewDefinition('monitorings', 'real_by_loca
                 data[fields[i]] = doc[fields[i]]
             }
         }
-        emit(doc._local_seq, data);
+        emit([doc.tender_id, doc.dateCreated], data);
     }
-}''' % CHANGES_FIELDS)
+}''' % MONITORINGS_BY_TENDER_FIELDS)
 
-monitorings_test_by_local_seq_view = ViewDefinition('monitorings', 'test_by_local_seq', '''function(doc) {
+test_monitorings_by_tender_id_view = ViewDefinition(JS_DESIGN, 'test_by_tender_id', '''function(doc) {
     if(doc.doc_type == 'Monitoring' && doc.mode == 'test' && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
         var fields=%s, data={};
         for (var i in fields) {
@@ -116,11 +238,11 @@ monitorings_test_by_local_seq_view = ViewDefinition('monitorings', 'test_by_loca
                 data[fields[i]] = doc[fields[i]]
             }
         }
-        emit(doc._local_seq, data);
+        emit([doc.tender_id, doc.dateCreated], data);
     }
-}''' % CHANGES_FIELDS)
+}''' % MONITORINGS_BY_TENDER_FIELDS)
 
-monitorings_real_draft_by_local_seq_view = ViewDefinition('monitorings', 'real_draft_by_local_seq', '''function(doc) {
+draft_monitorings_by_tender_id_view = ViewDefinition(JS_DESIGN, 'draft_by_tender_id', '''function(doc) {
     if(doc.doc_type == 'Monitoring' && !doc.mode) {
         var fields=%s, data={};
         for (var i in fields) {
@@ -128,59 +250,304 @@ monitorings_real_draft_by_local_seq_view = ViewDefinition('monitorings', 'real_d
                 data[fields[i]] = doc[fields[i]]
             }
         }
-        emit(doc._local_seq, data);
+        emit([doc.tender_id, doc.dateCreated], data);
     }
-}''' % CHANGES_FIELDS)
+}''' % MONITORINGS_BY_TENDER_FIELDS)
+
 
-monitorings_all_draft_by_local_seq_view = ViewDefinition('monitorings', 'draft_by_local_seq', '''function(doc) {
+# deadlines of monitorings that have not come yet or have not been acted on (see scheduler.DeadlineScheduler)
+# keyed by [group, deadline]: 'transition' deadlines allow an automatic status change once they have come,
+# 'event' ones are only notified about
+DEADLINE_TRANSITION = 'transition'
+DEADLINE_EVENT = 'event'
+
+monitorings_deadlines_view = ViewDefinition(JS_DESIGN, 'deadlines', '''function(doc) {
     if(doc.doc_type == 'Monitoring') {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
+        if (doc.status == 'active' && doc.monitoringPeriod && doc.monitoringPeriod.endDate) {
+            emit(['%(event)s', doc.monitoringPeriod.endDate], {'type': 'monitoringPeriod', 'status': doc.status});
+        }
+        if (['addressed', 'declined'].indexOf(doc.status) != -1 && doc.eliminationPeriod && doc.eliminationPeriod.endDate) {
+            var group = doc.status == 'declined' || doc.eliminationResolution ? '%(transition)s' : '%(event)s';
+            emit([group, doc.eliminationPeriod.endDate], {'type': 'eliminationPeriod', 'status': doc.status});
+        }
+        if (['draft', 'active', 'addressed', 'declined'].indexOf(doc.status) != -1 && doc.posts) {
+            var answered = {};
+            for (var i in doc.posts) {
+                if (doc.posts[i].relatedPost) {
+                    answered[doc.posts[i].relatedPost] = true;
+                }
+            }
+            for (var i in doc.posts) {
+                if (doc.posts[i].dateOverdue && !answered[doc.posts[i].id]) {
+                    emit(['%(event)s', doc.posts[i].dateOverdue], {'type': 'post', 'status': doc.status, 'post_id': doc.posts[i].id});
+                }
             }
         }
-        emit(doc._local_seq, data);
     }
-}''' % CHANGES_FIELDS)
+}''' % {'event': DEADLINE_EVENT, 'transition': DEADLINE_TRANSITION})
 
+# dimensions of monitorings_stats_view: the monitoring fields counted by their values
+STATS_DIMENSIONS = ('status', 'reasons', 'procuringStages', 'riskIndicatorsRegion', 'violationType')
 
-MONITORINGS_BY_TENDER_FIELDS = [
-    'status',
-]
-
-monitorings_by_tender_id_view = ViewDefinition('monitorings', 'by_tender_id', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && !doc.mode && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
+# monitorings by [listing, dimension, value, year, month, day of dateCreated] for every value of every dimension,
+# the built-in _stats reduce gives both the number of monitorings and the sum of their riskIndicatorsTotalImpact
+# of any prefix of the key, so a group_level query answers counts by value overall, by year, month or day.
+# violationType comes from the published conclusion only, as it is published
+monitorings_stats_view = ViewDefinition(JS_DESIGN, 'stats', '''function(doc) {
+    if(doc.doc_type == 'Monitoring') {
+        var listings = ['%s'];
+        if (!doc.mode) {
+            listings.push('%s');
+        }
+        if (['draft', 'cancelled'].indexOf(doc.status) == -1) {
+            listings.push('%s');
+            if (!doc.mode) {
+                listings.push('%s');
+            } else if (doc.mode == 'test') {
+                listings.push('%s');
             }
         }
-        emit([doc.tender_id, doc.dateCreated], data);
-    }
-}''' % MONITORINGS_BY_TENDER_FIELDS)
-
-test_monitorings_by_tender_id_view = ViewDefinition('monitorings', 'test_by_tender_id', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && doc.mode == 'test' && ['draft', 'cancelled'].indexOf(doc.status) == -1) {
-        var fields=%s, data={};
-        for (var i in fields) {
-            if (doc[fields[i]]) {
-                data[fields[i]] = doc[fields[i]]
+        var date = (doc.dateCreated || '').slice(0, 10).split('-');
+        var impact = typeof doc.riskIndicatorsTotalImpact == 'number' ? doc.riskIndicatorsTotalImpact : 0;
+        var conclusion = doc.conclusion && doc.conclusion.datePublished ? doc.conclusion : {};
+        var dimensions = {
+            'status': doc.status ? [doc.status] : [],
+            'reasons': doc.reasons || [],
+            'procuringStages': doc.procuringStages || [],
+            'riskIndicatorsRegion': doc.riskIndicatorsRegion ? [doc.riskIndicatorsRegion] : [],
+            'violationType': conclusion.violationType || []
+        };
+        for (var i in listings) {
+            for (var dimension in dimensions) {
+                for (var j in dimensions[dimension]) {
+                    emit([listings[i], dimension, dimensions[dimension][j]].concat(date), impact);
+                }
             }
         }
-        emit([doc.tender_id, doc.dateCreated], data);
     }
-}''' % MONITORINGS_BY_TENDER_FIELDS)
+}''' % (ALL_DRAFT_LISTING, REAL_DRAFT_LISTING, ALL_LISTING, REAL_LISTING, TEST_LISTING), reduce_fun='_stats')
 
-draft_monitorings_by_tender_id_view = ViewDefinition('monitorings', 'draft_by_tender_id', '''function(doc) {
-    if(doc.doc_type == 'Monitoring' && !doc.mode) {
+RISK_RANKING_FIELDS = [
+    'monitoring_id',
+    'tender_id',
+    'status',
+    'riskIndicators',
+    'riskIndicatorsTotalImpact',
+    'riskIndicatorsRegion',
+    'dateCreated',
+]
+
+# real and test monitorings by [listing, status, riskIndicatorsRegion, -riskIndicatorsTotalImpact, dateCreated],
+# so the highest-impact monitorings of a status in a region are the first rows of a [listing, status, region] range
+monitorings_risk_ranking_view = ViewDefinition(JS_DESIGN, 'risk_ranking', '''function(doc) {
+    if(doc.doc_type == 'Monitoring' && (!doc.mode || doc.mode == 'test')) {
         var fields=%s, data={};
         for (var i in fields) {
             if (doc[fields[i]]) {
                 data[fields[i]] = doc[fields[i]]
             }
         }
-        emit([doc.tender_id, doc.dateCreated], data);
+        var impact = typeof doc.riskIndicatorsTotalImpact == 'number' ? doc.riskIndicatorsTotalImpact : 0;
+        var listing = doc.mode ? '%s' : '%s';
+        emit([listing, doc.status || null, doc.riskIndicatorsRegion || null, -impact, doc.dateCreated || null], data);
     }
-}''' % MONITORINGS_BY_TENDER_FIELDS)
+}''' % (RISK_RANKING_FIELDS, TEST_LISTING, REAL_LISTING))
+
+# erlang map functions for couch_native_process, they emit the same rows as the javascript ones above
+# native_query_servers must have erlang = {couch_native_process, start_link, []} in the CouchDB config,
+# which lets any design document author run code in the CouchDB VM (see templates/couchdb.ini)
+NATIVE_FEED_MAP = '''fun({Doc}) ->
+    case proplists:get_value(<<"doc_type">>, Doc) of
+    <<"Monitoring">> ->
+        Pick = fun(Fields) ->
+            {[{F, V} || F <- Fields, V <- [proplists:get_value(F, Doc)], not lists:member(V, [undefined, null, false, <<>>])]}
+        end,
+        Data = Pick(%s),
+        ChangesData = Pick(%s),
+        Mode = proplists:get_value(<<"mode">>, Doc),
+        Real = lists:member(Mode, [undefined, null, <<>>]),
+        Test = Mode =:= <<"test">>,
+        Public = not lists:member(proplists:get_value(<<"status">>, Doc), [<<"draft">>, <<"cancelled">>]),
+        Listings = [<<"%s">>]
+            ++ [<<"%s">> || Real]
+            ++ [<<"%s">> || Public]
+            ++ [<<"%s">> || Public, Real]
+            ++ [<<"%s">> || Public, Test],
+        DateModified = proplists:get_value(<<"dateModified">>, Doc, null),
+        LocalSeq = proplists:get_value(<<"_local_seq">>, Doc, null),
+        lists:foreach(fun(Listing) ->
+            Emit([<<"dateModified">>, Listing, DateModified], Data),
+            Emit([<<"changes">>, Listing, LocalSeq], ChangesData)
+        end, Listings);
+    _ ->
+        ok
+    end
+end.''' % (
+    native_fields(FIELDS), native_fields(CHANGES_FIELDS),
+    ALL_DRAFT_LISTING, REAL_DRAFT_LISTING, ALL_LISTING, REAL_LISTING, TEST_LISTING,
+)
+
+NATIVE_BY_TENDER_MAP = '''fun({Doc}) ->
+    Mode = proplists:get_value(<<"mode">>, Doc),
+    Real = lists:member(Mode, [undefined, null, <<>>]),
+    Test = Mode =:= <<"test">>,
+    Public = not lists:member(proplists:get_value(<<"status">>, Doc), [<<"draft">>, <<"cancelled">>]),
+    case proplists:get_value(<<"doc_type">>, Doc) =:= <<"Monitoring">> andalso (%s) of
+    true ->
+        Data = {[{F, V} || F <- %s, V <- [proplists:get_value(F, Doc)], not lists:member(V, [undefined, null, false, <<>>])]},
+        Emit([proplists:get_value(<<"tender_id">>, Doc, null), proplists:get_value(<<"dateCreated">>, Doc, null)], Data);
+    false ->
+        ok
+    end
+end.'''
+
+NATIVE_DEADLINES_MAP = '''fun({Doc}) ->
+    case proplists:get_value(<<"doc_type">>, Doc) of
+    <<"Monitoring">> ->
+        Present = fun(Value) -> not lists:member(Value, [undefined, null, false, <<>>]) end,
+        EndDate = fun(Name) ->
+            case proplists:get_value(Name, Doc) of
+            {Period} -> proplists:get_value(<<"endDate">>, Period);
+            _ -> undefined
+            end
+        end,
+        Status = proplists:get_value(<<"status">>, Doc),
+        MonitoringEnd = EndDate(<<"monitoringPeriod">>),
+        case Status =:= <<"active">> andalso Present(MonitoringEnd) of
+        true ->
+            Emit([<<"%(event)s">>, MonitoringEnd], {[{<<"type">>, <<"monitoringPeriod">>}, {<<"status">>, Status}]});
+        false ->
+            ok
+        end,
+        EliminationEnd = EndDate(<<"eliminationPeriod">>),
+        case lists:member(Status, [<<"addressed">>, <<"declined">>]) andalso Present(EliminationEnd) of
+        true ->
+            Group = case Status =:= <<"declined">> orelse Present(proplists:get_value(<<"eliminationResolution">>, Doc)) of
+                true -> <<"%(transition)s">>;
+                false -> <<"%(event)s">>
+            end,
+            Emit([Group, EliminationEnd], {[{<<"type">>, <<"eliminationPeriod">>}, {<<"status">>, Status}]});
+        false ->
+            ok
+        end,
+        Posts = case proplists:get_value(<<"posts">>, Doc) of
+            List when is_list(List) -> [P || {P} <- List];
+            _ -> []
+        end,
+        case lists:member(Status, [<<"draft">>, <<"active">>, <<"addressed">>, <<"declined">>]) of
+        true ->
+            Answered = [proplists:get_value(<<"relatedPost">>, P) || P <- Posts],
+            lists:foreach(fun(Post) ->
+                PostId = proplists:get_value(<<"id">>, Post),
+                DateOverdue = proplists:get_value(<<"dateOverdue">>, Post),
+                case Present(DateOverdue) andalso not lists:member(PostId, Answered) of
+                true ->
+                    Emit([<<"%(event)s">>, DateOverdue],
+                         {[{<<"type">>, <<"post">>}, {<<"status">>, Status}, {<<"post_id">>, PostId}]});
+                false ->
+                    ok
+                end
+            end, Posts);
+        false ->
+            ok
+        end;
+    _ ->
+        ok
+    end
+end.''' % {'event': DEADLINE_EVENT, 'transition': DEADLINE_TRANSITION}
+
+NATIVE_STATS_MAP = '''fun({Doc}) ->
+    case proplists:get_value(<<"doc_type">>, Doc) of
+    <<"Monitoring">> ->
+        Present = fun(Value) -> not lists:member(Value, [undefined, null, false, <<>>]) end,
+        Values = fun(Value) when is_list(Value) -> Value; (_) -> [] end,
+        Value = fun(Name) -> V = proplists:get_value(Name, Doc), [V || Present(V)] end,
+        Mode = proplists:get_value(<<"mode">>, Doc),
+        Real = lists:member(Mode, [undefined, null, <<>>]),
+        Test = Mode =:= <<"test">>,
+        Public = not lists:member(proplists:get_value(<<"status">>, Doc), [<<"draft">>, <<"cancelled">>]),
+        Listings = [<<"%s">>]
+            ++ [<<"%s">> || Real]
+            ++ [<<"%s">> || Public]
+            ++ [<<"%s">> || Public, Real]
+            ++ [<<"%s">> || Public, Test],
+        Date = case proplists:get_value(<<"dateCreated">>, Doc) of
+            <<Year:4/binary, "-", Month:2/binary, "-", Day:2/binary, _/binary>> -> [Year, Month, Day];
+            _ -> [<<>>]
+        end,
+        Impact = case proplists:get_value(<<"riskIndicatorsTotalImpact">>, Doc) of
+            Number when is_number(Number) -> Number;
+            _ -> 0
+        end,
+        Violations = case proplists:get_value(<<"conclusion">>, Doc) of
+            {Conclusion} ->
+                case Present(proplists:get_value(<<"datePublished">>, Conclusion)) of
+                true -> Values(proplists:get_value(<<"violationType">>, Conclusion));
+                false -> []
+                end;
+            _ -> []
+        end,
+        Dimensions = [
+            {<<"status">>, Value(<<"status">>)},
+            {<<"reasons">>, Values(proplists:get_value(<<"reasons">>, Doc))},
+            {<<"procuringStages">>, Values(proplists:get_value(<<"procuringStages">>, Doc))},
+            {<<"riskIndicatorsRegion">>, Value(<<"riskIndicatorsRegion">>)},
+            {<<"violationType">>, Violations}
+        ],
+        lists:foreach(fun(Listing) ->
+            lists:foreach(fun({Dimension, DimensionValues}) ->
+                lists:foreach(fun(DimensionValue) ->
+                    Emit([Listing, Dimension, DimensionValue | Date], Impact)
+                end, DimensionValues)
+            end, Dimensions)
+        end, Listings);
+    _ ->
+        ok
+    end
+end.''' % (ALL_DRAFT_LISTING, REAL_DRAFT_LISTING, ALL_LISTING, REAL_LISTING, TEST_LISTING)
+
+NATIVE_RISK_RANKING_MAP = '''fun({Doc}) ->
+    Mode = proplists:get_value(<<"mode">>, Doc),
+    Real = lists:member(Mode, [undefined, null, <<>>]),
+    case proplists:get_value(<<"doc_type">>, Doc) =:= <<"Monitoring">> andalso (Real orelse Mode =:= <<"test">>) of
+    true ->
+        Present = fun(Value) -> not lists:member(Value, [undefined, null, false, <<>>]) end,
+        Field = fun(Name) ->
+            Value = proplists:get_value(Name, Doc),
+            case Present(Value) of
+                true -> Value;
+                false -> null
+            end
+        end,
+        Data = {[{F, V} || F <- %s, V <- [proplists:get_value(F, Doc)], Present(V)]},
+        Listing = case Real of
+            true -> <<"%s">>;
+            false -> <<"%s">>
+        end,
+        Impact = case proplists:get_value(<<"riskIndicatorsTotalImpact">>, Doc) of
+            Number when is_number(Number) -> Number;
+            _ -> 0
+        end,
+        Emit([Listing, Field(<<"status">>), Field(<<"riskIndicatorsRegion">>), 0 - Impact, Field(<<"dateCreated">>)], Data);
+    false ->
+        ok
+    end
+end.''' % (native_fields(RISK_RANKING_FIELDS), REAL_LISTING, TEST_LISTING)
+
+NATIVE_MAP_FUNCTIONS = {
+    'all': '''fun({Doc}) ->
+    case proplists:get_value(<<"doc_type">>, Doc) of
+    <<"Monitoring">> ->
+        Emit(proplists:get_value(<<"monitoring_id">>, Doc, null), null);
+    _ ->
+        ok
+    end
+end.''',
+    'feed': NATIVE_FEED_MAP,
+    'by_tender_id': NATIVE_BY_TENDER_MAP % ('Real andalso Public', native_fields(MONITORINGS_BY_TENDER_FIELDS)),
+    'test_by_tender_id': NATIVE_BY_TENDER_MAP % ('Test andalso Public', native_fields(MONITORINGS_BY_TENDER_FIELDS)),
+    'draft_by_tender_id': NATIVE_BY_TENDER_MAP % ('Real', native_fields(MONITORINGS_BY_TENDER_FIELDS)),
+    'deadlines': NATIVE_DEADLINES_MAP,
+    'stats': NATIVE_STATS_MAP,
+    'risk_ranking': NATIVE_RISK_RANKING_MAP,
+}
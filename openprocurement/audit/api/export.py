@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk export of monitorings: the monitorings of a listing in their public 'view' form,
+one JSON object a line, gzip-compressed.
+Documents are read from monitorings_all_view in batches, ordered by monitoring_id,
+and an export is resumed after the monitoring_id of the last exported monitoring.
+
+    bin/audit_export etc/openprocurement.api.ini monitorings.ndjson.gz
+
+resumes the export into monitorings.ndjson.gz from its monitorings.ndjson.gz.checkpoint, if there is one.
+"""
+import json
+import os
+import zlib
+from argparse import ArgumentParser
+from logging import getLogger
+
+from pyramid.paster import bootstrap
+
+from openprocurement.audit.api.constants import EXPORT_BATCH_SIZE, EXPORT_CHUNK_SIZE
+from openprocurement.audit.api.design import monitorings_all_view, view_path, feed_listings, REAL_LISTING
+from openprocurement.audit.api.models import Monitoring
+from openprocurement.audit.api.raw import render_model
+from openprocurement.audit.api.views.monitoring import MODE_LISTINGS
+
+LOGGER = getLogger(__name__)
+
+NDJSON = 'application/x-ndjson'
+
+# gzip header and trailer around a deflate stream
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def export_rows(db, since=None, batch=EXPORT_BATCH_SIZE):
+    options = {'include_docs': True}
+    if since:
+        options['startkey'] = since
+    rows = db.iterview(view_path(monitorings_all_view), batch, **options)
+    for row in rows:
+        if row.key != since:
+            yield row
+
+
+def iter_export(request, db, since=None, listing=REAL_LISTING, batch=EXPORT_BATCH_SIZE, dumps=json.dumps):
+    """
+    monitoring_id and the NDJSON line of every monitoring of the listing after since
+    """
+    for row in export_rows(db, since, batch):
+        if listing in feed_listings(row.doc):
+            yield row.key, dumps(render_model(Monitoring, row.doc, 'view', request)) + '\n'
+
+
+def iter_chunks(lines, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lines joined into chunks of about chunk_size bytes, with the monitoring_id of the last line of a chunk
+    """
+    chunk = []
+    size = 0
+    key = None
+    for key, line in lines:
+        chunk.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield key, ''.join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield key, ''.join(chunk)
+
+
+def iter_gzip(chunks):
+    """
+    A gzip stream of the chunks, flushed after every one of them,
+    so a client decompresses all the lines it has received if the stream breaks
+    """
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, GZIP_WBITS)
+    for _, chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def gzip_member(chunk):
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress(chunk) + compressor.flush()
+
+
+def read_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except IOError:
+        return {}
+
+
+def write_checkpoint(path, checkpoint):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.rename(path + '.tmp', path)
+
+
+def export_to_file(request, db, path, listing=REAL_LISTING, batch=EXPORT_BATCH_SIZE, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Export into a file of concatenated gzip members, a member a chunk.
+    The file size and the last monitoring_id are checkpointed after every member,
+    an export is resumed from the checkpoint, dropping whatever has been written after it.
+    :return: the number of exported monitorings
+    """
+    checkpoint_path = path + '.checkpoint'
+    checkpoint = read_checkpoint(checkpoint_path) if os.path.exists(path) else {}
+    count = 0
+    with open(path, 'ab') as f:
+        f.truncate(checkpoint.get('size', 0))
+        f.seek(0, os.SEEK_END)
+        lines = iter_export(request, db, checkpoint.get('since'), listing, batch, request.registry.json_codec.dumps)
+        for key, chunk in iter_chunks(lines, chunk_size):
+            f.write(gzip_member(chunk))
+            f.flush()
+            os.fsync(f.fileno())
+            count += chunk.count('\n')
+            write_checkpoint(checkpoint_path, {'since': key, 'size': f.tell()})
+            LOGGER.info('Exported {} monitorings up to {}'.format(count, key),
+                        extra={'MESSAGE_ID': 'monitorings_export'})
+    return count
+
+
+def main():
+    parser = ArgumentParser(description='Export monitorings into a gzip-compressed NDJSON file')
+    parser.add_argument('config', help='ini file of the api')
+    parser.add_argument('output', help='the export, resumed if there is a checkpoint file next to it')
+    parser.add_argument('--mode', default='', choices=sorted(MODE_LISTINGS), help='mode of the /monitorings listing')
+    parser.add_argument('--batch', type=int, default=EXPORT_BATCH_SIZE, help='documents read at once')
+    args = parser.parse_args()
+
+    env = bootstrap(args.config)
+    try:
+        count = export_to_file(env['request'], env['registry'].db, args.output, MODE_LISTINGS[args.mode], args.batch)
+    finally:
+        env['closer']()
+    print('Exported {} monitorings'.format(count))
+
+
+if __name__ == '__main__':
+    main()
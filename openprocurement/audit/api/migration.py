@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from logging import getLogger
+
+from openprocurement.api.models import Revision
+from openprocurement.audit.api.design import monitorings_all_view, view_path
+from openprocurement.audit.api.utils import store_revisions
+
+LOGGER = getLogger(__name__)
+SCHEMA_VERSION = 1
+SCHEMA_DOC = 'openprocurement_monitorings_schema'
+
+
+def get_db_schema_version(db):
+    schema_doc = db.get(SCHEMA_DOC, {"_id": SCHEMA_DOC})
+    return schema_doc.get("version", SCHEMA_VERSION - 1)
+
+
+def set_db_schema_version(db, version):
+    schema_doc = db.get(SCHEMA_DOC, {"_id": SCHEMA_DOC})
+    schema_doc["version"] = version
+    db.save(schema_doc)
+
+
+def migrate_data(registry, destination=None):
+    if registry.settings.get('plugins') and 'audit' not in registry.settings['plugins'].split(','):
+        return
+    cur_version = get_db_schema_version(registry.db)
+    if cur_version == SCHEMA_VERSION:
+        return cur_version
+    for step in xrange(cur_version, destination or SCHEMA_VERSION):
+        LOGGER.info("Migrate openprocurement monitorings schema from {} to {}".format(step, step + 1),
+                    extra={'MESSAGE_ID': 'migrate_data'})
+        migration_func = globals().get('from{}to{}'.format(step, step + 1))
+        if migration_func:
+            migration_func(registry)
+        set_db_schema_version(registry.db, step + 1)
+
+
+def update_docs(db, docs):
+    """
+    Save documents with a bulk request
+    :return: the number of documents that are not saved, they keep their revisions for the migration to be run again
+    """
+    failed = 0
+    for success, doc_id, error in db.update(docs):
+        if not success:
+            failed += 1
+            LOGGER.error('Failed to save monitoring {}: {!r}'.format(doc_id, error),
+                         extra={'MESSAGE_ID': 'migrate_data_failed'})
+    return failed
+
+
+def from0to1(registry):
+    """
+    Move revisions out of monitoring documents into separate revision documents
+    """
+    db = registry.db
+    docs = []
+    failed = 0
+    for row in db.iterview(view_path(monitorings_all_view), 2 ** 10, include_docs=True):
+        doc = row.doc
+        if not doc.get('revisions'):
+            continue
+        # revisions that failed to be stored are left in the document for the migration to be run again
+        if not store_revisions(db, doc['_id'], [Revision(i) for i in doc['revisions']]):
+            failed += 1
+            continue
+        del doc['revisions']
+        docs.append(doc)
+        if len(docs) >= 2 ** 7:
+            failed += update_docs(db, docs)
+            docs = []
+    if docs:
+        failed += update_docs(db, docs)
+    if failed:
+        raise RuntimeError('Revisions of {} monitorings are not stored, the migration is to be run again'.format(failed))
@@ -41,6 +41,28 @@ class Report(Model):
     datePublished = IsoDateTimeType()
 
 
+class DialogueIndex(object):
+    """
+    Posts of a monitoring by id, numbers of answers by relatedPost and ids of parties
+    """
+
+    def __init__(self, monitoring):
+        self.posts = {}
+        self.answers = {}
+        for post in monitoring.posts:
+            self.posts.setdefault(post.id, []).append(post)
+            if post.relatedPost:
+                self.answers[post.relatedPost] = self.answers.get(post.relatedPost, 0) + 1
+        self.parties = set(i.id for i in monitoring.parties)
+
+
+def dialogue_index(monitoring):
+    """
+    The index built for the validation of the whole monitoring, or a new one out of it
+    """
+    return vars(monitoring).get('_dialogue_index') or DialogueIndex(monitoring)
+
+
 class Post(Model):
     class Options:
         roles = {
@@ -64,24 +86,26 @@ class Post(Model):
 
     def validate_relatedParty(self, data, value):
         parent = data['__parent__']
-        if value and isinstance(parent, Model) and value not in [i.id for i in parent.parties]:
+        if value and isinstance(parent, Model) and value not in dialogue_index(parent).parties:
             raise ValidationError(u"relatedParty should be one of parties.")
 
     def validate_relatedPost(self, data, value):
         parent = data['__parent__']
         if value and isinstance(parent, Model):
 
+            index = dialogue_index(parent)
+
             # check that another post with 'id'
             # that equals 'relatedPost' of current post exists
-            if value not in [i.id for i in parent.posts]:
+            if value not in index.posts:
                 raise ValidationError(u"relatedPost should be one of posts of current monitoring.")
 
             # check that another posts with `relatedPost`
             # that equals `relatedPost` of current post does not exist
-            if len([i for i in parent.posts if i.relatedPost == value]) > 1:
+            if index.answers.get(value, 0) > 1:
                 raise ValidationError(u"relatedPost must be unique.")
 
-            related_posts = [i for i in parent.posts if i.id == value]
+            related_posts = index.posts[value]
 
             # check that there are no multiple related posts,
             # that should never happen coz `id` is unique
@@ -89,11 +113,11 @@ class Post(Model):
                 raise ValidationError(u"relatedPost can't be a link to more than one post.")
 
             # check that related post have another author
-            if len(related_posts) == 1 and data['author'] == related_posts[0]['author']:
+            if data['author'] == related_posts[0]['author']:
                 raise ValidationError(u"relatedPost can't have the same author.")
 
             # check that related post is not an answer to another post
-            if len(related_posts) == 1 and related_posts[0]['relatedPost']:
+            if related_posts[0]['relatedPost']:
                 raise ValidationError(u"relatedPost can't be have relatedPost defined.")
 
 
@@ -103,7 +127,7 @@ class Decision(Report):
 
     def validate_relatedParty(self, data, value):
         parent = data['__parent__']
-        if value and isinstance(parent, Model) and value not in [i.id for i in parent.parties]:
+        if value and isinstance(parent, Model) and value not in dialogue_index(parent).parties:
             raise ValidationError(u"relatedParty should be one of parties.")
 
 
@@ -119,7 +143,7 @@ class Conclusion(Report):
 
     def validate_relatedParty(self, data, value):
         parent = data['__parent__']
-        if value and isinstance(parent, Model) and value not in [i.id for i in parent.parties]:
+        if value and isinstance(parent, Model) and value not in dialogue_index(parent).parties:
             raise ValidationError(u"relatedParty should be one of parties.")
 
     def validate_violationType(self, data, value):
@@ -144,7 +168,7 @@ class Cancellation(Report):
 
     def validate_relatedParty(self, data, value):
         parent = data['__parent__']
-        if value and isinstance(parent, Model) and value not in [i.id for i in parent.parties]:
+        if value and isinstance(parent, Model) and value not in dialogue_index(parent).parties:
             raise ValidationError(u"relatedParty should be one of parties.")
 
 
@@ -161,7 +185,7 @@ class EliminationResolution(Report):
 
     def validate_relatedParty(self, data, value):
         parent = data['__parent__']
-        if value and isinstance(parent, Model) and value not in [i.id for i in parent.parties]:
+        if value and isinstance(parent, Model) and value not in dialogue_index(parent).parties:
             raise ValidationError(u"relatedParty should be one of parties.")
 
     def validate_resultByType(self, data, value):
@@ -300,6 +324,14 @@ class Monitoring(SchematicsDocument, Model):
         if self.cancellation and self.cancellation.datePublished or role == 'sas':
             return self.cancellation
 
+    def validate(self, *args, **kwargs):
+        # validators of every post and report look the dialogue up in a single index
+        self._dialogue_index = DialogueIndex(self)
+        try:
+            return super(Monitoring, self).validate(*args, **kwargs)
+        finally:
+            del self._dialogue_index
+
     def validate_eliminationResolution(self, data, value):
         if value is not None and data['eliminationReport'] is None:
             raise ValidationError(u"Elimination report hasn't been provided.")
@@ -344,3 +376,11 @@ class Monitoring(SchematicsDocument, Model):
 
         self._data.update(data)
         return self
+
+
+def plain_data(data):
+    """
+    Top-level items of a raw monitoring document that are exported with the 'plain' role
+    """
+    role = Monitoring._options.roles['plain']
+    return {i: j for i, j in data.items() if not role(i, j)}
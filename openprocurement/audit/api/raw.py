@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Read requests under /monitorings/{monitoring_id} are served from the raw couchdb document:
+RawItem stands in for a model in traversal and views, and renders the document
+the way the schematics export of the model does, without converting it.
+"""
+from urlparse import urlparse, parse_qs
+
+from couchdb_schematics.document import Document as SchematicsDocument
+from openprocurement.api.utils import generate_docservice_url
+from schematics.transforms import wholelist, Role
+from schematics.types.compound import ModelType, ListType, DictType
+
+
+def published_report(name):
+    def report(request, data):
+        value = data.get(name)
+        if value and value.get('datePublished') or request.authenticated_role == 'sas':
+            return value
+    return report
+
+
+def document_url(request, data):
+    url = data.get('url')
+    if not url or '?download=' not in url or not request.registry.docservice_url:
+        return url
+    return generate_docservice_url(request, parse_qs(urlparse(url).query)['download'][-1], False)
+
+
+# raw counterparts of the serializables of the models, by their attribute names
+RAW_SERIALIZABLES = {
+    'doc_id': lambda request, data: data.get('_id'),
+    'monitoring_decision': published_report('decision'),
+    'monitoring_conclusion': published_report('conclusion'),
+    'monitoring_cancellation': published_report('cancellation'),
+    'download_url': document_url,
+}
+
+# attributes of couchdb documents that are backed by fields with other names
+DOCUMENT_ATTRIBUTES = {
+    'id': '_id',
+    'rev': '_rev',
+}
+
+
+def get_role(model_class, role):
+    roles = model_class._options.roles
+    return roles[role] if role in roles else roles.get('default', wholelist())
+
+
+# role functions that don't look at values, so the fields a role exports are known beforehand
+STATIC_ROLE_FUNCTIONS = tuple(
+    getattr(Role, i) for i in ('wholelist', 'whitelist', 'blacklist') if hasattr(Role, i)
+)
+
+FIELD, MODEL, LIST, DICT = range(4)
+
+FIELD_KINDS = {}
+
+
+def field_kind(field):
+    kind = FIELD_KINDS.get(field)
+    if kind is None:
+        if isinstance(field, ModelType):
+            kind = MODEL
+        elif isinstance(field, ListType):
+            kind = LIST
+        elif isinstance(field, DictType):
+            kind = DICT
+        else:
+            kind = FIELD
+        FIELD_KINDS[field] = kind
+    return kind
+
+
+def default_value(field):
+    value = field.default
+    if value is not None and field_kind(field) == FIELD:
+        value = field.to_primitive(value)
+    return value
+
+
+# defaults that are computed on every use, like dateCreated=get_now
+DYNAMIC_DEFAULT = object()
+
+
+class RenderPlan(object):
+    """
+    What render_model does for a model class and a role, worked out once:
+    the fields and serializables the role exports with their serialized names, kinds and defaults.
+    Roles of other functions than those of whitelist/blacklist are still called with every value.
+    """
+
+    def __init__(self, model_class, role):
+        gottago = get_role(model_class, role)
+        static = getattr(gottago, 'function', None) in STATIC_ROLE_FUNCTIONS
+        self.gottago = None if static else gottago
+        self.fields = []
+        for name, field in model_class.fields.items():
+            if static and gottago(name, None):
+                continue
+            default = DYNAMIC_DEFAULT if callable(getattr(field, '_default', None)) else default_value(field)
+            self.fields.append((name, field.serialized_name or name, field, default))
+        self.serializables = [
+            (name, field.serialized_name or name, field.type, RAW_SERIALIZABLES[name])
+            for name, field in model_class._serializables.items()
+            if not static or not gottago(name, None)
+        ]
+
+
+PLANS = {}
+
+
+def get_plan(model_class, role):
+    """
+    The render plan of a model class and a role, that of Monitoring depends on its status
+    through edit_<status> roles, compiled on the first use
+    """
+    key = (model_class, role)
+    plan = PLANS.get(key)
+    if plan is None:
+        plan = PLANS[key] = RenderPlan(model_class, role)
+    return plan
+
+
+def render_field(field, value, role, request):
+    kind = field_kind(field)
+    if kind == MODEL:
+        return render_model(field.model_class, value, role, request) or None
+    elif kind == LIST:
+        items = (render_field(field.field, i, role, request) for i in value)
+        return [i for i in items if i is not None] or None
+    elif kind == DICT:
+        items = ((i, render_field(field.field, j, role, request)) for i, j in value.items())
+        return {i: j for i, j in items if j is not None} or None
+    return value
+
+
+def render_model(model_class, data, role, request):
+    """
+    Export of raw model data with a role, as model_class(data).serialize(role) would do
+    """
+    plan = get_plan(model_class, role)
+    gottago = plan.gottago
+    result = {}
+    for name, serialized_name, field, default in plan.fields:
+        value = data.get(name)
+        if value is None:
+            value = default_value(field) if default is DYNAMIC_DEFAULT else default
+        if value is None or gottago is not None and gottago(name, value):
+            continue
+        value = render_field(field, value, role, request)
+        if value is not None:
+            result[serialized_name] = value
+    for name, serialized_name, field_type, raw_value in plan.serializables:
+        value = raw_value(request, data)
+        if value is None or gottago is not None and gottago(name, value):
+            continue
+        value = render_field(field_type, value, role, request) if field_type else value
+        if value is not None:
+            result[serialized_name] = value
+    return result
+
+
+class RawItem(object):
+    """
+    A raw (sub)document of a monitoring that looks like its model to traversal and read views:
+    fields are available as attributes, converted on access, and serialize renders the raw data
+    """
+
+    def __init__(self, model_class, data, request, parent=None):
+        self.model_class = model_class
+        self.data = data
+        self.request = request
+        self.__parent__ = parent
+
+    def __getattr__(self, name):
+        if name.startswith('__') or 'model_class' not in self.__dict__:
+            raise AttributeError(name)
+        if issubclass(self.model_class, SchematicsDocument):
+            name = DOCUMENT_ATTRIBUTES.get(name, name)
+        field = self.model_class.fields.get(name)
+        if field is None:
+            raise AttributeError(name)
+        value = self.data.get(name)
+        if value is None:
+            return field.default
+        kind = field_kind(field)
+        if kind == MODEL:
+            return RawItem(field.model_class, value, self.request, self)
+        elif kind == LIST and field_kind(field.field) == MODEL:
+            return [RawItem(field.field.model_class, i, self.request, self) for i in value]
+        return field.to_native(value)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __repr__(self):
+        return '<Raw{}:{!r}>'.format(self.model_class.__name__, self.data.get('id', self.data.get('_id')))
+
+    def serialize(self, role=None):
+        return render_model(self.model_class, self.data, role, self.request)
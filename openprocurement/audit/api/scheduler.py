@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Deadlines of monitorings acted on in the background: a cooperative greenlet of a worker
+reads the deadlines view up to the current time once per tick, applies the status changes
+the API allows once a deadline has come and notifies subscribers about the other deadlines.
+The scheduler runs in every worker, the one holding the lease document ticks
+and keeps the cursor of the notified deadlines in it.
+"""
+from datetime import timedelta
+from logging import getLogger
+from math import ceil
+
+from couchdb import ResourceConflict
+from gevent import spawn, sleep
+from iso8601 import parse_date
+from openprocurement.api.utils import generate_id, get_now
+from pytz import utc
+from schematics.exceptions import ModelValidationError
+
+from openprocurement.audit.api.constants import (
+    ADDRESSED_STATUS,
+    DECLINED_STATUS,
+    COMPLETED_STATUS,
+    CLOSED_STATUS,
+)
+from openprocurement.audit.api.design import (
+    DEADLINE_EVENT, DEADLINE_TRANSITION, monitorings_deadlines_view, view_path,
+)
+from openprocurement.audit.api.models import plain_data
+from openprocurement.audit.api.traversal import Root
+from openprocurement.audit.api.utils import (
+    monitoring_from_data, prepare_monitoring, revision_docs, store_revision_docs
+)
+
+LOGGER = getLogger(__name__)
+
+# author of the revisions of the changes made by the scheduler
+SCHEDULER_USERID = 'deadline_scheduler'
+
+# document of the scheduler lease and the cursor of the notified deadlines
+SCHEDULER_DOC = 'deadline_scheduler'
+
+# the largest UTC offset: dates in the keys of the deadlines view keep the offset they were set with
+# and sort as strings only within one offset, so the view is read this much around a range of dates
+KEY_MARGIN = timedelta(hours=14)
+
+# status a monitoring goes to once its elimination period ends
+AUTOMATIC_TRANSITIONS = {
+    ADDRESSED_STATUS: COMPLETED_STATUS,
+    DECLINED_STATUS: CLOSED_STATUS,
+}
+
+
+def to_utc(value):
+    return parse_date(value).astimezone(utc)
+
+
+class MonitoringDeadline(object):
+    """
+    Notified through the registry when a deadline of a monitoring has come,
+    transition is the status the monitoring has been moved to, if any
+    """
+
+    def __init__(self, monitoring_id, deadline, type, status, post_id=None, transition=None):
+        self.monitoring_id = monitoring_id
+        self.deadline = deadline
+        self.type = type
+        self.status = status
+        self.post_id = post_id
+        self.transition = transition
+
+
+class SchedulerRequest(object):
+    """
+    The part of a request that monitoring models and prepare_monitoring use,
+    for the changes the scheduler makes on its own
+    """
+    authenticated_role = 'sas'
+    authenticated_userid = SCHEDULER_USERID
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.context = Root(self)
+
+
+class DeadlineScheduler(object):
+    """
+    A tick is made only by the worker holding the lease, which it renews on every tick,
+    another worker takes the lease over when the revision of the lease document doesn't change
+    for as many of its own ticks as make lease seconds, so the clocks of the workers don't have to agree.
+
+    Transitions are applied to every monitoring in the view that allows one,
+    as they leave the view once applied. Conflicting updates are retried on the next tick.
+    Events are notified for deadlines after the cursor, which starts at the first tick ever made
+    and is saved in UTC in the lease document after the events of a tick are notified.
+    Deadlines that come while no worker is running are notified on the next tick,
+    but events notified by a worker that doesn't save the cursor, as it stops or loses the lease,
+    are notified again by the next holder of the lease: delivery is at least once,
+    so subscribers are expected to tell repeated events by monitoring_id, type, deadline and post_id.
+    """
+
+    def __init__(self, registry, interval=60, batch_size=100, lease=None):
+        self.registry = registry
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lease = lease or 3 * interval
+        self.lease_ticks = int(ceil(float(self.lease) / interval))
+        self.owner = generate_id()
+        # revision of the lease document of another worker and the number of ticks it has been seen for
+        self.observed = None
+        self.greenlet = None
+
+    def start(self):
+        self.greenlet = spawn(self.run)
+
+    def stop(self):
+        if self.greenlet is not None:
+            self.greenlet.kill()
+            self.greenlet = None
+
+    def run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception:  # pragma: no cover
+                LOGGER.exception('Deadline scheduler tick failed', extra={'MESSAGE_ID': 'deadline_scheduler_error'})
+            sleep(self.interval)
+
+    def tick(self, now=None):
+        """
+        :return: numbers of monitorings moved to another status and of events notified,
+                 None if the lease is held by another worker
+        """
+        now = now or get_now()
+        lease = self.acquire(now)
+        if lease is None:
+            return
+        cursor = to_utc(lease['cursor'])
+        transitions = self.apply_transitions(now)
+        events = self.notify_events(cursor, now)
+        lease['cursor'] = max(cursor, now.astimezone(utc)).isoformat()
+        try:
+            self.registry.db.save(lease)
+        except ResourceConflict:
+            LOGGER.warning('Deadline scheduler lease is lost, {} events will be notified again'.format(events),
+                           extra={'MESSAGE_ID': 'deadline_scheduler_lease_lost'})
+        return transitions, events
+
+    def acquire(self, now):
+        """
+        The lease document renewed for the worker, None if another worker holds the lease
+        """
+        db = self.registry.db
+        lease = db.get(SCHEDULER_DOC) or {'_id': SCHEDULER_DOC, 'cursor': now.astimezone(utc).isoformat()}
+        if lease.get('owner') not in (None, self.owner):
+            rev, ticks = self.observed or (None, 0)
+            self.observed = (lease['_rev'], ticks + 1 if rev == lease['_rev'] else 1)
+            if self.observed[1] <= self.lease_ticks:
+                return
+        if lease.get('owner') != self.owner:
+            LOGGER.info('Deadline scheduler lease is taken by {}'.format(self.owner),
+                        extra={'MESSAGE_ID': 'deadline_scheduler_lease'})
+        lease['owner'] = self.owner
+        lease.pop('expires', None)
+        try:
+            db.save(lease)
+        except ResourceConflict:
+            return
+        self.observed = None
+        return lease
+
+    def rows(self, group, after, now, **options):
+        """
+        Rows of the deadlines after the date, if any, up to now, compared in UTC
+        """
+        rows = self.registry.db.iterview(
+            view_path(monitorings_deadlines_view), self.batch_size,
+            startkey=[group, (after - KEY_MARGIN).isoformat() if after else ''],
+            endkey=[group, (now + KEY_MARGIN).isoformat()], **options
+        )
+        for row in rows:
+            deadline = to_utc(row.key[1])
+            if (after is None or deadline > after) and deadline <= now:
+                yield row
+
+    def apply_transitions(self, now):
+        applied = 0
+        batch = []
+        for row in self.rows(DEADLINE_TRANSITION, None, now, include_docs=True):
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                applied += self.transit(batch, now)
+                batch = []
+        if batch:
+            applied += self.transit(batch, now)
+        return applied
+
+    def transit(self, rows, now):
+        request = SchedulerRequest(self.registry)
+        prepared = []
+        for row in rows:
+            monitoring = monitoring_from_data(request, row.doc)
+            monitoring.__parent__ = request.context
+            period = monitoring.eliminationPeriod
+            if monitoring.status not in AUTOMATIC_TRANSITIONS or not period or not now > period.endDate:
+                continue
+            if monitoring.status == ADDRESSED_STATUS and not monitoring.eliminationResolution:
+                continue
+            status = monitoring.status
+            monitoring.status = AUTOMATIC_TRANSITIONS[status]
+            try:
+                data, revisions = prepare_monitoring(request, monitoring, plain_data(row.doc), now)
+            except ModelValidationError, e:  # pragma: no cover
+                LOGGER.warning('Monitoring {} can\'t be moved to {}: {}'.format(row.id, monitoring.status, e.message),
+                               extra={'MESSAGE_ID': 'deadline_scheduler_invalid'})
+                continue
+            prepared.append((row, status, data, revisions))
+        if not prepared:
+            return 0
+
+        db = self.registry.db
+        docs = []
+        applied = 0
+        results = db.update([data for _, _, data, _ in prepared])
+        for (row, status, data, revisions), (success, doc_id, rev) in zip(prepared, results):
+            if not success:
+                LOGGER.info('Monitoring {} will be moved to {} on the next tick: {}'.format(
+                    doc_id, data['status'], rev), extra={'MESSAGE_ID': 'deadline_scheduler_conflict'})
+                continue
+            applied += 1
+            self.registry.monitoring_cache.invalidate(doc_id)
+            docs.extend(revision_docs(doc_id, revisions))
+            LOGGER.info('Moved monitoring {} from {} to {} at the end of the elimination period'.format(
+                doc_id, status, data['status']), extra={'MESSAGE_ID': 'deadline_scheduler_transition'})
+            self.registry.notify(MonitoringDeadline(
+                doc_id, row.key[1], row.value['type'], status, transition=data['status']))
+        if docs:
+            store_revision_docs(db, docs)
+        return applied
+
+    def notify_events(self, cursor, now):
+        notified = 0
+        for row in self.rows(DEADLINE_EVENT, cursor, now):
+            notified += 1
+            LOGGER.info('Deadline {} of monitoring {} has come at {}'.format(row.value['type'], row.id, row.key[1]),
+                        extra={'MESSAGE_ID': 'deadline_scheduler_event'})
+            self.registry.notify(MonitoringDeadline(
+                row.id, row.key[1], row.value['type'], row.value['status'], post_id=row.value.get('post_id')))
+        return notified
+
+
+def start_deadline_scheduler(event):
+    scheduler = getattr(event.app.registry, 'deadline_scheduler', None)
+    if scheduler is not None:
+        scheduler.start()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from openprocurement.api.utils import get_now
+
+from openprocurement.audit.api.tests.base import BaseWebTest
+
+
+class MonitoringsStatsResourceTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringsStatsResourceTest, self).setUp()
+        self.create_monitoring(reasons=['media'], riskIndicatorsRegion=u'Київ')
+        self.create_active_monitoring(reasons=['indicator', 'public'], riskIndicatorsTotalImpact=0.5,
+                                      riskIndicatorsRegion=u'Київ')
+        self.create_active_monitoring(reasons=['indicator'], riskIndicatorsTotalImpact=1.25,
+                                      riskIndicatorsRegion=u'Львів')
+        self.create_active_monitoring(reasons=['indicator'], mode='test')
+        self.app.authorization = None
+
+    def get_stats(self, query):
+        data = self.app.get('/monitorings/stats?{}'.format(query)).json['data']
+        return {i['value']: (i['count'], i['riskIndicatorsTotalImpact']) for i in data}
+
+    def test_dimensions(self):
+        self.assertEqual(self.get_stats('dimension=status'), {'active': (2, 1.75)})
+        self.assertEqual(self.get_stats('dimension=reasons'), {'indicator': (2, 1.75), 'public': (1, 0.5)})
+        self.assertEqual(self.get_stats('dimension=procuringStages'), {'planning': (2, 1.75)})
+        self.assertEqual(self.get_stats('dimension=riskIndicatorsRegion'), {u'Київ': (1, 0.5), u'Львів': (1, 1.25)})
+        self.assertEqual(self.get_stats('dimension=violationType'), {})
+
+    def test_modes(self):
+        self.assertEqual(self.get_stats('dimension=status&mode=test'), {'active': (1, 0)})
+        self.assertEqual(self.get_stats('dimension=status&mode=_all_'), {'active': (3, 1.75)})
+        self.app.get('/monitorings/stats?dimension=status&mode=real_draft', status=403)
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.assertEqual(self.get_stats('dimension=status&mode=real_draft'), {'active': (2, 1.75), 'draft': (1, 0)})
+
+    def test_periods(self):
+        today = get_now().date()
+        data = self.app.get('/monitorings/stats?dimension=status&period=month').json['data']
+        self.assertEqual(data, [{
+            'value': 'active', 'count': 2, 'riskIndicatorsTotalImpact': 1.75, 'period': today.strftime('%Y-%m'),
+        }])
+        data = self.app.get('/monitorings/stats?dimension=status&period=day').json['data']
+        self.assertEqual([i['period'] for i in data], [today.isoformat()])
+
+    def test_violation_type(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {'data': {
+            'conclusion': {'description': 'text', 'violationOccurred': True,
+                           'violationType': ['documentsForm', 'corruptionAwarded']},
+        }})
+        # the conclusion isn't counted until it is published
+        self.assertEqual(self.get_stats('dimension=violationType&mode=test'), {})
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {'data': {'status': 'addressed'}})
+        self.assertEqual(self.get_stats('dimension=violationType&mode=test'),
+                         {'documentsForm': (1, 0), 'corruptionAwarded': (1, 0)})
+
+    def test_invalid(self):
+        self.app.get('/monitorings/stats', status=422)
+        self.app.get('/monitorings/stats?dimension=tender_id', status=422)
+        self.app.get('/monitorings/stats?dimension=status&period=week', status=422)
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(MonitoringsStatsResourceTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import mock
+
+from openprocurement.audit.api.tests.base import BaseWebTest
+
+
+class MonitoringsChangesResourceTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringsChangesResourceTest, self).setUp()
+        self.hub = self.app.app.registry.changes_hub
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.offset = self.app.get('/monitorings/changes?timeout=0').json['next_page']['offset']
+
+        self.create_monitoring()
+        self.draft_id = self.monitoring_id
+        self.create_active_monitoring()
+        self.active_id = self.monitoring_id
+        self.create_active_monitoring(mode='test')
+        self.test_active_id = self.monitoring_id
+        self.hub.poll()
+
+    def get_ids(self, url):
+        return set(i['id'] for i in self.app.get(url).json['data'])
+
+    def test_empty(self):
+        response = self.app.get('/monitorings/changes?timeout=0')
+        self.assertEqual(response.json['data'], [])
+        self.assertEqual(response.json['next_page']['offset'], self.hub.last_seq)
+
+    def test_modes(self):
+        url = '/monitorings/changes?timeout=0&offset={}'.format(self.offset)
+        self.assertEqual(self.get_ids(url), {self.active_id})
+        self.assertEqual(self.get_ids(url + '&mode=test'), {self.test_active_id})
+        self.assertEqual(self.get_ids(url + '&mode=_all_'), {self.active_id, self.test_active_id})
+        self.assertEqual(self.get_ids(url + '&mode=real_draft'), {self.active_id, self.draft_id})
+        self.assertEqual(self.get_ids(url + '&mode=all_draft'),
+                         {self.active_id, self.draft_id, self.test_active_id})
+
+    def test_draft_forbidden(self):
+        self.app.authorization = None
+        self.app.get('/monitorings/changes?timeout=0&mode=real_draft', status=403)
+
+    def test_payload(self):
+        response = self.app.get('/monitorings/changes?timeout=0&offset={}'.format(self.offset))
+        feed = self.app.get('/monitorings?feed=changes&opt_fields=tender_id')
+        self.assertEqual(response.json['data'][-1], feed.json['data'][-1])
+        self.assertEqual(set(response.json['data'][-1]), {'id', 'dateModified', 'tender_id'})
+
+    def test_next_page(self):
+        response = self.app.get('/monitorings/changes?timeout=0&offset={}'.format(self.offset))
+        self.assertEqual(response.json['next_page']['offset'], self.hub.last_seq)
+        response = self.app.get(response.json['next_page']['path'] + '&timeout=0')
+        self.assertEqual(response.json['data'], [])
+
+    def test_clients_share_feed(self):
+        with mock.patch.object(self.db, 'changes', wraps=self.db.changes) as changes:
+            for _ in range(10):
+                self.assertEqual(
+                    self.get_ids('/monitorings/changes?timeout=0&offset={}'.format(self.offset)), {self.active_id})
+            self.create_active_monitoring()
+            self.hub.poll()
+            for _ in range(10):
+                self.assertEqual(
+                    self.get_ids('/monitorings/changes?timeout=0&offset={}'.format(self.hub.changes[0][0])),
+                    {self.active_id, self.monitoring_id})
+        self.assertEqual(changes.call_count, 1)
+
+    def test_catch_up(self):
+        # as if the changes after the offset were evicted from the buffer of the worker
+        self.hub.changes.clear()
+        self.hub.base_seq = self.hub.last_seq
+        self.assertEqual(self.get_ids('/monitorings/changes?timeout=0&offset={}'.format(self.offset)),
+                         {self.active_id})
+
+    def test_revisions_skipped(self):
+        results = self.db.changes(since=self.offset, include_docs=True)['results']
+        revision_seqs = set(i['seq'] for i in results if i['doc'].get('doc_type') == 'MonitoringRevision')
+        self.assertTrue(revision_seqs)
+        entries, _ = self.hub.changes_since(self.offset)
+        self.assertEqual(
+            [(listings, data) for seq, listings, data in entries if seq in revision_seqs],
+            [(frozenset(), None)] * len(revision_seqs)
+        )
+        self.assertEqual(self.get_ids('/monitorings/changes?timeout=0&mode=all_draft&offset={}'.format(self.offset)),
+                         {self.active_id, self.draft_id, self.test_active_id})
+
+    def test_invalid_offset(self):
+        self.app.get('/monitorings/changes?timeout=0&offset=invalid', status=404)
+
+    def test_event_stream(self):
+        response = self.app.get('/monitorings/changes?timeout=0&offset={}'.format(self.offset),
+                                headers={'Accept': 'text/event-stream'})
+        self.assertEqual(response.content_type, 'text/event-stream')
+        events = [i for i in response.body.split('\n\n') if i]
+        self.assertEqual(len(events), 1)
+        event_id, data = events[0].split('\n')
+        self.assertTrue(event_id.startswith('id: '))
+        self.assertIn(self.active_id, data)
+
+        response = self.app.get('/monitorings/changes?feed=eventsource&timeout=0',
+                                headers={'Last-Event-ID': event_id[4:]})
+        self.assertEqual(response.body, ':\n\n')
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(MonitoringsChangesResourceTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+
+import mock
+
+from openprocurement.audit.api import codec as codec_module
+from openprocurement.audit.api.codec import (
+    CODECS, STDLIB_CODEC, JSONListing, get_codec, iter_json_listing, stdlib_codec, use_codec,
+)
+from openprocurement.audit.api.tests.base import BaseWebTest, DSWebTestMixin
+
+
+def installed_codecs():
+    codecs = []
+    for factory in CODECS.values():
+        try:
+            codecs.append(factory())
+        except ImportError:
+            pass
+    return codecs
+
+
+class GetCodecTest(unittest.TestCase):
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_codec('unknown')
+
+    def test_not_installed(self):
+        def not_installed():
+            raise ImportError
+
+        with mock.patch.dict(CODECS, {'fast': not_installed}):
+            self.assertEqual(get_codec('fast').name, STDLIB_CODEC)
+
+    def test_fastest_installed(self):
+        def not_installed():
+            raise ImportError
+
+        with mock.patch.object(codec_module, 'JSON_CODECS', ('fast', 'faster', STDLIB_CODEC)), \
+                mock.patch.dict(CODECS, {'fast': not_installed,
+                                         'faster': lambda: codec_module.JSONCodec('faster', json.dumps, json.loads)}):
+            self.assertEqual(get_codec().name, 'faster')
+        with mock.patch.object(codec_module, 'JSON_CODECS', ('fast', STDLIB_CODEC)), \
+                mock.patch.dict(CODECS, {'fast': not_installed}):
+            self.assertEqual(get_codec().name, STDLIB_CODEC)
+
+
+class UseCodecTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(codec_module, '_document_codec', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('couchdb.json.use')
+        self.use = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_codec(self):
+        with mock.patch.object(codec_module, 'LOGGER') as logger:
+            use_codec(mock.Mock(), stdlib_codec())
+            use_codec(mock.Mock(), stdlib_codec())
+        self.assertEqual(self.use.call_count, 2)
+        self.assertFalse(logger.warning.called)
+
+    def test_other_codec(self):
+        other = codec_module.JSONCodec('other', json.dumps, json.loads)
+        with mock.patch.object(codec_module, 'LOGGER') as logger:
+            use_codec(mock.Mock(), stdlib_codec())
+            use_codec(mock.Mock(), other)
+        self.assertEqual(logger.warning.call_count, 1)
+        self.assertIs(codec_module._document_codec, other)
+
+
+class CodecConformanceTest(BaseWebTest, DSWebTestMixin):
+    """
+    Every installed codec encodes and parses documents and responses exactly as the stdlib json does
+    """
+
+    def setUp(self):
+        super(CodecConformanceTest, self).setUp()
+        self.create_active_monitoring(riskIndicators=['some_risk_indicator_id'])
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.post_json('/monitorings/{}/documents'.format(self.monitoring_id), {'data': {
+            'title': u'Рішення.doc',
+            'url': self.generate_docservice_url(),
+            'hash': 'md5:' + '0' * 32,
+            'format': 'application/msword',
+        }})
+        self.app.post_json('/monitorings/{}/posts'.format(self.monitoring_id), {'data': {
+            'title': u'Запитання',
+            'description': u'Lorem ipsum "dolor" sit amet </script> \\  ',
+        }})
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {'data': {
+            'conclusion': {'violationOccurred': True, 'violationType': ['documentsForm'], 'description': u'Висновок'},
+        }})
+        self.codecs = installed_codecs()
+
+    def test_documents(self):
+        doc = json.loads(json.dumps(self.db.get(self.monitoring_id)))
+        encoded = json.dumps(doc)
+        for codec in self.codecs:
+            self.assertEqual(codec.loads(encoded), doc, codec.name)
+            self.assertEqual(codec.dumps(doc), encoded, codec.name)
+            self.assertEqual(codec.encode_document(doc), json.dumps(doc, allow_nan=False, ensure_ascii=False),
+                             codec.name)
+
+    def test_responses(self):
+        urls = [
+            '/monitorings/{}'.format(self.monitoring_id),
+            '/monitorings/{}/posts'.format(self.monitoring_id),
+            '/monitorings?opt_fields=status,riskIndicators,posts,conclusion',
+        ]
+        for url in urls:
+            body = self.app.get(url).body
+            data = json.loads(body)
+            for codec in self.codecs:
+                self.assertEqual(codec.loads(body), data, codec.name)
+                self.assertEqual(codec.dumps(data), json.dumps(data), codec.name)
+
+    def test_configured_codec(self):
+        codec = self.app.app.registry.json_codec
+        self.assertIn(codec.name, CODECS)
+        self.assertEqual(self.db.get(self.monitoring_id), codec.loads(json.dumps(self.db.get(self.monitoring_id))))
+
+
+class IterJsonListingTest(unittest.TestCase):
+
+    def test_json(self):
+        items = [{'id': str(i), 'title': u'\u0422\u0435\u043a\u0441\u0442'} for i in range(100)]
+        page = {'next_page': {'offset': '99'}, 'prev_page': {'offset': '0'}}
+        for chunk_size in (1, 100, 100000):
+            body = ''.join(iter_json_listing(iter(items), lambda: page, chunk_size=chunk_size))
+            self.assertEqual(json.loads(body), dict(page, data=items))
+
+    def test_empty(self):
+        body = ''.join(iter_json_listing(iter([]), lambda: {'next_page': {}}))
+        self.assertEqual(json.loads(body), {'data': [], 'next_page': {}})
+
+    def test_first_item_sent_right_away(self):
+        def items():
+            yield {'id': '0'}
+            raise AssertionError('read before the first chunk is sent')
+
+        chunks = iter_json_listing(items(), lambda: {})
+        self.assertEqual(next(chunks), '{"data": [{"id": "0"}')
+
+    def test_chunks(self):
+        items = [{'id': '{:04}'.format(i)} for i in range(1000)]
+        chunks = list(iter_json_listing(iter(items), lambda: {}, chunk_size=1000))
+        self.assertLess(max(len(i) for i in chunks), 1300)
+        self.assertLess(len(chunks), 30)
+
+
+class JSONListingTest(unittest.TestCase):
+
+    def render(self, value, chunk_size=100):
+        return JSONListing(chunk_size=chunk_size)(None)(value, {})
+
+    def test_page(self):
+        value = {'data': [{'id': str(i)} for i in range(100)], 'next_page': {'offset': '99'}}
+        body = self.render(value)
+        self.assertIsInstance(body, list)
+        self.assertGreater(len(body), 1)
+        self.assertEqual(json.loads(''.join(body)), value)
+
+    def test_not_a_page(self):
+        self.assertEqual(json.loads(self.render({'data': {'id': '0'}})), {'data': {'id': '0'}})
+
+    def test_failure(self):
+        value = {'data': [{'id': '0'}, {'id': object()}], 'next_page': {}}
+        with self.assertRaises(TypeError):
+            self.render(value, chunk_size=1)
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(GetCodecTest))
+    suite.addTest(unittest.makeSuite(UseCodecTest))
+    suite.addTest(unittest.makeSuite(IterJsonListingTest))
+    suite.addTest(unittest.makeSuite(JSONListingTest))
+    suite.addTest(unittest.makeSuite(CodecConformanceTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
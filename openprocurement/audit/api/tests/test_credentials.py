@@ -5,7 +5,8 @@ from hashlib import sha512
 from openprocurement.audit.api.tests.base import BaseWebTest
 import unittest
 
-from openprocurement.audit.api.tests.utils import get_errors_field_names
+from openprocurement.audit.api.tests.utils import get_errors_field_names, TendersServer
+from openprocurement.audit.api.utils import CircuitBreaker, TenderCredentials
 
 
 class MonitoringCredentialsResourceTest(BaseWebTest):
@@ -142,9 +143,60 @@ class MonitoringCredentialsResourceTest(BaseWebTest):
         self.assertEqual(response.status_code, 403)
         self.assertEqual(response.content_type, 'application/json')
 
+class MonitoringCredentialsTendersServerTest(BaseWebTest):
+    """
+    Credentials extracted from the local stand-in tenders API, without mocks
+    """
+
+    def setUp(self):
+        super(MonitoringCredentialsTendersServerTest, self).setUp()
+        self.create_monitoring()
+        self.server = TendersServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.server.add_tender(self.initial_data['tender_id'], 'tender_token')
+        self.credentials = self.app.app.registry.tender_credentials = TenderCredentials(
+            '111111', self.server.url, '2.0', timeout=1, size=10, ttl=60, negative_ttl=60,
+            breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+        )
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+
+    def test_credentials_cached(self):
+        for _ in range(3):
+            response = self.app.patch_json(
+                '/monitorings/{}/credentials?acc_token={}'.format(self.monitoring_id, 'tender_token'))
+            self.assertIn('access', response.json)
+        self.app.patch_json(
+            '/monitorings/{}/credentials?acc_token={}'.format(self.monitoring_id, 'wrong_token'), status=403)
+        self.assertEqual(len(self.server.upstream_requests()), 1)
+        self.assertEqual(self.credentials.stats()['hits'], 3)
+
+    def test_credentials_no_tender(self):
+        self.server.tenders.clear()
+        for _ in range(2):
+            response = self.app.patch_json(
+                '/monitorings/{}/credentials?acc_token={}'.format(self.monitoring_id, 'tender_token'), status=403)
+            self.assertEqual(
+                ('body', 'data'),
+                next(get_errors_field_names(response, 'Tender {} not found'.format(self.initial_data['tender_id']))))
+        self.assertEqual(len(self.server.upstream_requests()), 1)
+
+    def test_credentials_tenders_api_unavailable(self):
+        self.server.status = '503 Service Unavailable'
+        for _ in range(2):
+            response = self.app.patch_json(
+                '/monitorings/{}/credentials?acc_token={}'.format(self.monitoring_id, 'tender_token'), status=503)
+            self.assertEqual(
+                ('body', 'data'),
+                next(get_errors_field_names(response, 'Tenders API is unavailable.')))
+        # the circuit is open after the first failure
+        self.assertEqual(len(self.server.upstream_requests()), 1)
+
+
 def suite():
     s = unittest.TestSuite()
     s.addTest(unittest.makeSuite(MonitoringCredentialsResourceTest))
+    s.addTest(unittest.makeSuite(MonitoringCredentialsTendersServerTest))
     return s
 
 
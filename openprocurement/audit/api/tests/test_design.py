@@ -0,0 +1,108 @@
+import unittest
+
+import mock
+from couchdb.client import Row
+from couchdb.design import ViewDefinition
+from openprocurement.api import design as api_design
+
+from openprocurement.audit.api import design
+from openprocurement.audit.api.design import (
+    FeedView,
+    add_design,
+    cleanup_design,
+    native_view,
+    view_path,
+    monitorings_feed_view,
+    JS_DESIGN,
+    JS_INDEX_BACKEND,
+    NATIVE_DESIGN,
+    NATIVE_INDEX_BACKEND,
+    NATIVE_MAP_FUNCTIONS,
+)
+
+
+class FeedViewTests(unittest.TestCase):
+
+    def setUp(self):
+        self.view = mock.Mock(return_value=[
+            Row(id='a' * 32, key=['dateModified', 'real', '2018-01-01'], value={'tender_id': 'f' * 32}),
+        ])
+        self.feed_view = FeedView(self.view, 'dateModified', 'real')
+
+    def test_ascending_key_range(self):
+        rows = list(self.feed_view('db', startkey='', limit=10))
+        self.view.assert_called_once_with(
+            'db', startkey=['dateModified', 'real', ''], endkey=['dateModified', 'real', {}],
+            descending=False, limit=10,
+        )
+        self.assertEqual(rows[0].key, '2018-01-01')
+        self.assertEqual(rows[0].id, 'a' * 32)
+        self.assertEqual(rows[0].value, {'tender_id': 'f' * 32})
+
+    def test_descending_key_range(self):
+        list(self.feed_view('db', startkey='9', descending=True))
+        self.view.assert_called_once_with(
+            'db', startkey=['dateModified', 'real', '9'], endkey=['dateModified', 'real'],
+            descending=True,
+        )
+
+    def test_default_key_range(self):
+        list(self.feed_view('db', descending=True))
+        self.view.assert_called_once_with(
+            'db', startkey=['dateModified', 'real', {}], endkey=['dateModified', 'real'],
+            descending=True,
+        )
+
+
+class NativeIndexBackendTests(unittest.TestCase):
+
+    def tearDown(self):
+        add_design(JS_INDEX_BACKEND)
+
+    def test_native_view(self):
+        view = native_view(monitorings_feed_view)
+        self.assertEqual(view.design, NATIVE_DESIGN)
+        self.assertEqual(view.name, monitorings_feed_view.name)
+        self.assertEqual(view.language, NATIVE_INDEX_BACKEND)
+        self.assertTrue(view.map_fun.startswith('fun({Doc}) ->'))
+
+    def test_add_design(self):
+        add_design(NATIVE_INDEX_BACKEND)
+        self.assertEqual(view_path(monitorings_feed_view), '{}/feed'.format(NATIVE_DESIGN))
+        self.assertEqual(api_design.monitorings_feed_view.design, NATIVE_DESIGN)
+        self.assertEqual(monitorings_feed_view.design, JS_DESIGN)
+        self.assertEqual(monitorings_feed_view.language, 'javascript')
+
+        add_design(JS_INDEX_BACKEND)
+        self.assertEqual(view_path(monitorings_feed_view), '{}/feed'.format(JS_DESIGN))
+        self.assertIs(api_design.monitorings_feed_view, monitorings_feed_view)
+
+    def test_every_view_native(self):
+        for name, view in vars(design).items():
+            if '_view' in name and isinstance(view, ViewDefinition):
+                self.assertIn(view.name, NATIVE_MAP_FUNCTIONS, name)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            add_design('mango')
+
+    def test_cleanup_javascript_design(self):
+        db = mock.MagicMock()
+        db.get.side_effect = {'_design/{}'.format(JS_DESIGN): {'_id': '_design/{}'.format(JS_DESIGN)}}.get
+        cleanup_design(db, NATIVE_INDEX_BACKEND)
+        db.delete.assert_called_once_with({'_id': '_design/{}'.format(JS_DESIGN)})
+        db.cleanup.assert_called_once_with()
+
+    def test_cleanup_native_design(self):
+        db = mock.MagicMock()
+        db.get.side_effect = {'_design/{}'.format(NATIVE_DESIGN): {'_id': '_design/{}'.format(NATIVE_DESIGN)}}.get
+        cleanup_design(db, JS_INDEX_BACKEND)
+        db.delete.assert_called_once_with({'_id': '_design/{}'.format(NATIVE_DESIGN)})
+        db.cleanup.assert_called_once_with()
+
+    def test_cleanup_nothing(self):
+        db = mock.MagicMock()
+        db.get.return_value = None
+        cleanup_design(db, JS_INDEX_BACKEND)
+        self.assertFalse(db.delete.called)
+        self.assertFalse(db.cleanup.called)
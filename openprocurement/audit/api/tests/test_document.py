@@ -3,7 +3,12 @@ import unittest
 from hashlib import sha512
 
 import mock
+from gevent import sleep
 
+from openprocurement.audit.api.models import Monitoring, Document
+from openprocurement.audit.api.raw import RawItem
+from openprocurement.audit.api.traversal import versions_index
+from openprocurement.audit.api.utils import DocumentSignatures, verify_document_signature
 from openprocurement.audit.api.tests.base import BaseWebTest, DSWebTestMixin
 from openprocurement.audit.api.tests.test_elimination import MonitoringEliminationBaseTest
 from openprocurement.audit.api.tests.utils import get_errors_field_names
@@ -111,6 +116,125 @@ class MonitoringDecisionDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.content_type, 'application/json')
 
+    def test_document_upload_batch(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'decision': self.test_monitoring_activation_data['decision']}})
+        rev = self.db.get(self.monitoring_id)['_rev']
+
+        titles = ['{}.doc'.format(i) for i in range(3)]
+        response = self.app.post_json('/monitorings/{}/decision/documents'.format(self.monitoring_id), {
+            'data': [dict(self.test_docservice_document_data, title=i, url=self.generate_docservice_url())
+                     for i in titles]
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([i['title'] for i in response.json['data']], titles)
+        self.assertEqual({i['author'] for i in response.json['data']}, {'monitoring_owner'})
+        self.assertNotIn('Location', response.headers)
+
+        # one save for the whole batch
+        self.assertEqual(int(self.db.get(self.monitoring_id)['_rev'].split('-')[0]), int(rev.split('-')[0]) + 1)
+        response = self.app.get('/monitorings/{}/decision/documents'.format(self.monitoring_id))
+        self.assertEqual([i['title'] for i in response.json['data']][-3:], titles)
+
+    def test_document_upload_batch_invalid(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'decision': self.test_monitoring_activation_data['decision']}})
+        rev = self.db.get(self.monitoring_id)['_rev']
+
+        response = self.app.post_json('/monitorings/{}/decision/documents'.format(self.monitoring_id), {
+            'data': [
+                dict(self.test_docservice_document_data, url=self.generate_docservice_url()),
+                dict(self.test_docservice_document_data, url=self.generate_docservice_url(), title=None),
+                'lorem.doc',
+            ]
+        }, status=422)
+        self.assertEqual([(i['index'], i['name']) for i in response.json['errors']], [(1, 'title'), (2, 'data')])
+        self.assertEqual(self.db.get(self.monitoring_id)['_rev'], rev)
+
+        response = self.app.post_json('/monitorings/{}/decision/documents'.format(self.monitoring_id),
+                                      {'data': []}, status=422)
+        self.assertEqual(
+            ('body', 'data'),
+            next(get_errors_field_names(response, 'Expected a list of 1 to 100 documents.')))
+
+    def docservice_upload(self, failed=()):
+        """
+        Uploads of files to the docservice, the ones with a filename from failed fail
+        """
+        def post(url, files=None, **kwargs):
+            # uploads switch to each other as they do waiting for the docservice
+            sleep(0.01)
+            filename = files['file'][0]
+            if filename in failed:
+                return mock.Mock(status_code=500, json=mock.Mock(return_value={}), text='error')
+            return mock.Mock(status_code=200, json=mock.Mock(return_value={'data': {
+                'url': self.generate_docservice_url(), 'hash': 'md5:' + '0' * 32,
+                'format': 'application/msword', 'title': filename,
+            }}))
+
+        return mock.patch('openprocurement.api.utils.SESSION', **{'post.side_effect': post})
+
+    def test_document_upload_batch_files(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'decision': self.test_monitoring_activation_data['decision']}})
+        rev = self.db.get(self.monitoring_id)['_rev']
+
+        titles = ['{}.doc'.format(i) for i in range(5)]
+        with self.docservice_upload() as session:
+            response = self.app.post('/monitorings/{}/decision/documents'.format(self.monitoring_id),
+                                     upload_files=[('file', i, 'content of {}'.format(i)) for i in titles])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(session.post.call_count, 5)
+        self.assertEqual([i['title'] for i in response.json['data']], titles)
+        self.assertEqual(len({i['id'] for i in response.json['data']}), 5)
+        self.assertEqual(len({i['url'] for i in response.json['data']}), 5)
+        # one save for the whole batch
+        self.assertEqual(int(self.db.get(self.monitoring_id)['_rev'].split('-')[0]), int(rev.split('-')[0]) + 1)
+
+        response = self.app.get('/monitorings/{}/decision/documents'.format(self.monitoring_id))
+        self.assertEqual([i['title'] for i in response.json['data']][-5:], titles)
+
+    def test_document_upload_batch_files_failed(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'decision': self.test_monitoring_activation_data['decision']}})
+        rev = self.db.get(self.monitoring_id)['_rev']
+
+        titles = ['{}.doc'.format(i) for i in range(3)]
+        with self.docservice_upload(failed=['1.doc']):
+            response = self.app.post('/monitorings/{}/decision/documents'.format(self.monitoring_id),
+                                     upload_files=[('file', i, 'content') for i in titles], status=422)
+        self.assertEqual(response.json['errors'], [{
+            'location': 'body', 'name': 'data', 'description': "Can't upload document to document service.",
+            'index': 1,
+        }])
+        self.assertEqual(self.db.get(self.monitoring_id)['_rev'], rev)
+        response = self.app.get('/monitorings/{}/decision/documents'.format(self.monitoring_id))
+        self.assertNotIn('0.doc', [i['title'] for i in response.json['data']])
+
+    def test_document_upload_batch_attachments(self):
+        self.app.app.registry.docservice_url = None
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'decision': self.test_monitoring_activation_data['decision']}})
+        attachments = len(self.db.get(self.monitoring_id).get('_attachments', {}))
+
+        titles = ['{}.doc'.format(i) for i in range(3)]
+        response = self.app.post('/monitorings/{}/decision/documents'.format(self.monitoring_id),
+                                 upload_files=[('file', i, 'content of {}'.format(i)) for i in titles])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([i['title'] for i in response.json['data']], titles)
+        self.assertEqual(len({i['url'] for i in response.json['data']}), 3)
+        self.assertEqual(len(self.db.get(self.monitoring_id)['_attachments']), attachments + 3)
+
     def test_document_upload_forbidden(self):
         self.app.authorization = ('Basic', (self.sas_token, ''))
         response = self.app.patch_json(
@@ -318,7 +442,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
             'documents': [self.test_docservice_document_data]
         }
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_get_single(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -350,7 +474,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertIn('KeyID=', document_data["url"])
         self.assertNotIn('Expires=', document_data["url"])
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_get_list(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -379,7 +503,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         document_data = response.json['data'][-1]
         self.assertEqual(document_data['title'], 'lorem.doc')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_download(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -419,7 +543,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertIn('KeyID=', response.location)
         self.assertNotIn('Expires=', response.location)
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_upload_no_token(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -445,7 +569,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.status_code, 403)
         self.assertEqual(response.content_type, 'application/json')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_upload(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -471,7 +595,7 @@ class MonitoringPostAddressedDocumentResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.content_type, 'application/json')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_document_upload_author_forbidden(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -938,8 +1062,106 @@ class MonitoringConclusionDocumentResourceTest(BaseWebTest, DSWebTestMixin):
             next(get_errors_field_names(response, 'Can\'t add document in current addressed monitoring status.')))
 
 
+class VersionsIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {'documents': [
+            {'id': 'a' * 32, 'title': 'first.doc'},
+            {'id': 'b' * 32, 'title': 'other.doc'},
+            {'id': 'a' * 32, 'title': 'second.doc'},
+        ]}
+
+    def assert_index(self, parent):
+        index = versions_index(parent, 'documents')
+        self.assertEqual(sorted(index), ['a' * 32, 'b' * 32])
+        self.assertEqual([i.title for i in index['a' * 32]], ['first.doc', 'second.doc'])
+        self.assertIs(versions_index(parent, 'documents'), index)
+        self.assertEqual(versions_index(parent, 'posts'), {})
+
+    def test_model(self):
+        monitoring = Monitoring(self.data)
+        self.assert_index(monitoring)
+        monitoring.documents.append(Document({'id': 'a' * 32, 'title': 'third.doc'}))
+        self.assertEqual(len(versions_index(monitoring, 'documents')['a' * 32]), 3)
+
+    def test_replaced_list(self):
+        monitoring = Monitoring(self.data)
+        self.assert_index(monitoring)
+        # a list of the same length, built where the previous one may have been
+        monitoring.documents = [Document({'id': 'c' * 32, 'title': 'new.doc'}) for _ in range(3)]
+        self.assertEqual(sorted(versions_index(monitoring, 'documents')), ['c' * 32])
+
+    def test_raw(self):
+        monitoring = RawItem(Monitoring, self.data, mock.Mock())
+        self.assert_index(monitoring)
+        self.assertIs(versions_index(monitoring, 'documents')['b' * 32][0].__parent__, monitoring)
+
+
+class DocumentSignaturesTest(BaseWebTest, DSWebTestMixin):
+
+    def setUp(self):
+        super(DocumentSignaturesTest, self).setUp()
+        self.signatures = DocumentSignatures(size=2, pool_size=4)
+        self.app.app.registry.document_signatures = self.signatures
+        self.request = mock.Mock(registry=self.app.app.registry)
+
+    def document_data(self, **kwargs):
+        return dict({
+            'title': 'lorem.doc',
+            'url': self.generate_docservice_url(),
+            'hash': 'md5:' + '0' * 32,
+            'format': 'application/msword',
+        }, **kwargs)
+
+    def test_verified_cached(self):
+        documents = [Document(self.document_data()) for _ in range(3)]
+        self.signatures.check(self.request, documents)
+        with mock.patch('openprocurement.audit.api.utils.check_document') as check_document:
+            self.signatures.check(self.request, documents[1:])
+            self.signatures.check(self.request, documents[:1])
+        self.assertEqual([i[0][1] for i in check_document.call_args_list], documents[:1])
+        self.assertEqual(self.signatures.stats(), {'size': 2, 'hits': 2, 'misses': 4, 'evictions': 2})
+
+    def test_verify_document_signature(self):
+        registry = self.app.app.registry
+        url = self.generate_docservice_url()
+        self.assertTrue(verify_document_signature(url, 'md5:' + '0' * 32, registry.docservice_url, registry.keyring))
+        self.assertFalse(verify_document_signature(url, 'md5:' + '1' * 32, registry.docservice_url, registry.keyring))
+        self.assertFalse(verify_document_signature(url, None, registry.docservice_url, registry.keyring))
+        self.assertFalse(verify_document_signature(url, 'md5:' + '0' * 32, 'http://example.com', registry.keyring))
+        self.assertFalse(verify_document_signature(url, 'md5:' + '0' * 32, registry.docservice_url, {}))
+        self.assertFalse(verify_document_signature(url.replace('Signature=', 'Signature=AA'), 'md5:' + '0' * 32,
+                                                   registry.docservice_url, registry.keyring))
+
+    def test_failed_checked_in_calling_greenlet(self):
+        documents = [Document(self.document_data()) for _ in range(2)]
+        documents.insert(1, Document(self.document_data(hash='md5:' + '1' * 32)))
+        with mock.patch('openprocurement.audit.api.utils.check_document') as check_document:
+            self.signatures.check(self.request, documents)
+        check_document.assert_called_once_with(self.request, documents[1], 'body')
+
+    def test_invalid_signature(self):
+        self.create_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        documents = [self.document_data(), self.document_data(hash='md5:' + '1' * 32), self.document_data()]
+        response = self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {'data': {
+            'decision': {'description': 'text', 'documents': documents}
+        }}, status=422)
+        self.assertEqual(response.json['errors'], [
+            {'location': 'decision', 'name': 'url', 'description': 'Document url invalid.'}
+        ])
+
+        documents[1] = self.document_data()
+        response = self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {'data': {
+            'decision': {'description': 'text', 'documents': documents}
+        }})
+        self.assertEqual(len(response.json['data']['decision']['documents']), 3)
+
+
 def suite():
     suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(VersionsIndexTest))
+    suite.addTest(unittest.makeSuite(DocumentSignaturesTest))
     suite.addTest(unittest.makeSuite(MonitoringDecisionDocumentResourceTest))
     suite.addTest(unittest.makeSuite(MonitoringPostActiveDocumentResourceTest))
     suite.addTest(unittest.makeSuite(MonitoringPostAddressedDocumentResourceTest))
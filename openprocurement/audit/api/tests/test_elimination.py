@@ -32,7 +32,7 @@ class MonitoringEliminationBaseTest(BaseWebTest, DSWebTestMixin):
 
         # get credentials for tha monitoring owner
         self.app.authorization = ('Basic', (self.broker_token, ''))
-        with mock.patch('openprocurement.audit.api.validation.TendersClient') as mock_api_client:
+        with mock.patch('openprocurement.audit.api.utils.TendersClient') as mock_api_client:
             mock_api_client.return_value.extract_credentials.return_value = {
                 'data': {'tender_token': sha512('tender_token').hexdigest()}
             }
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+import mock
+
+from openprocurement.audit.api.design import REAL_LISTING
+from openprocurement.audit.api.export import GZIP_WBITS, export_to_file, iter_chunks, iter_gzip
+from openprocurement.audit.api.tests.base import BaseWebTest
+
+
+def ndjson(body):
+    return [json.loads(i) for i in zlib.decompress(body, GZIP_WBITS).splitlines()]
+
+
+class IterGzipTest(unittest.TestCase):
+
+    def test_lines(self):
+        lines = [(str(i), '{}\n'.format(json.dumps({'id': i}))) for i in range(1000)]
+        for chunk_size in (1, 1000, 100000):
+            body = ''.join(iter_gzip(iter_chunks(iter(lines), chunk_size)))
+            self.assertEqual(ndjson(body), [{'id': i} for i in range(1000)])
+
+    def test_broken_stream(self):
+        lines = [(str(i), '{}\n'.format(json.dumps({'id': i}))) for i in range(1000)]
+        chunks = list(iter_chunks(iter(lines), 1000))
+        stream = iter_gzip(iter(chunks))
+        received = next(stream) + next(stream)
+        self.assertEqual(zlib.decompressobj(GZIP_WBITS).decompress(received), chunks[0][1] + chunks[1][1])
+
+
+class MonitoringsExportResourceTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringsExportResourceTest, self).setUp()
+        self.create_monitoring()
+        self.draft_id = self.monitoring_id
+        self.active_ids = []
+        for _ in range(3):
+            self.create_active_monitoring()
+            self.active_ids.append(self.monitoring_id)
+        self.app.authorization = None
+
+    def test_export(self):
+        response = self.app.get('/monitorings/export')
+        self.assertEqual(response.content_type, 'application/x-ndjson')
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        data = ndjson(response.body)
+        self.assertEqual([i['id'] for i in data], self.active_ids)
+        for item in data:
+            self.assertEqual(item, self.app.get('/monitorings/{}'.format(item['id'])).json['data'])
+
+    def test_resume(self):
+        data = ndjson(self.app.get('/monitorings/export').body)
+        response = self.app.get('/monitorings/export?since={}'.format(data[0]['monitoring_id']))
+        self.assertEqual(ndjson(response.body), data[1:])
+
+    def test_modes(self):
+        self.app.get('/monitorings/export?mode=real_draft', status=403)
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        data = ndjson(self.app.get('/monitorings/export?mode=real_draft').body)
+        self.assertEqual([i['id'] for i in data], [self.draft_id] + self.active_ids)
+
+
+class ExportToFileTest(BaseWebTest):
+
+    def setUp(self):
+        super(ExportToFileTest, self).setUp()
+        self.path = os.path.join(tempfile.mkdtemp(), 'monitorings.ndjson.gz')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.path))
+        self.request = mock.Mock(authenticated_role='anonymous', registry=self.app.app.registry)
+        self.ids = []
+        for _ in range(3):
+            self.create_active_monitoring()
+            self.ids.append(self.monitoring_id)
+
+    def read(self):
+        with gzip.open(self.path) as f:
+            return [json.loads(i)['id'] for i in f]
+
+    def export(self):
+        return export_to_file(self.request, self.db, self.path, REAL_LISTING, batch=2, chunk_size=1)
+
+    def test_resumed(self):
+        self.assertEqual(self.export(), 3)
+        self.create_active_monitoring()
+        self.ids.append(self.monitoring_id)
+        self.assertEqual(self.export(), 1)
+        self.assertEqual(self.export(), 0)
+        self.assertEqual(self.read(), self.ids)
+
+    def test_interrupted(self):
+        self.export()
+        with open(self.path, 'ab') as f:
+            f.write('partly written member')
+        self.create_active_monitoring()
+        self.ids.append(self.monitoring_id)
+        self.export()
+        self.assertEqual(self.read(), self.ids)
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(IterGzipTest))
+    suite.addTest(unittest.makeSuite(MonitoringsExportResourceTest))
+    suite.addTest(unittest.makeSuite(ExportToFileTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
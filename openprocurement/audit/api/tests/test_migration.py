@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import mock
+from couchdb import ServerError
+
+from openprocurement.audit.api.design import ACTIVE_VIEWS, monitorings_all_view, native_view, NATIVE_DESIGN
+from openprocurement.audit.api.migration import from0to1, migrate_data, get_db_schema_version, SCHEMA_VERSION
+from openprocurement.audit.api.tests.base import BaseWebTest
+from openprocurement.audit.api.utils import revision_doc_prefix
+
+
+class MigrateTest(BaseWebTest):
+
+    def setUp(self):
+        super(MigrateTest, self).setUp()
+        migrate_data(self.app.app.registry)
+
+    def revision_docs(self, monitoring_id):
+        prefix = revision_doc_prefix(monitoring_id)
+        return [i.doc for i in self.db.view('_all_docs', startkey=prefix, endkey=prefix + u'\ufff0', include_docs=True)]
+
+    def test_schema_version(self):
+        self.assertEqual(get_db_schema_version(self.db), SCHEMA_VERSION)
+
+    def test_revisions_are_stored_apart(self):
+        self.create_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {"reasons": ["public"]}})
+
+        self.assertNotIn('revisions', self.db.get(self.monitoring_id))
+        revisions = self.revision_docs(self.monitoring_id)
+        self.assertEqual(len(revisions), 2)
+        self.assertEqual(revisions[0]['rev'], None)
+        self.assertTrue(revisions[1]['rev'].startswith('1-'))
+        self.assertTrue(revisions[1]['changes'][0]['path'].startswith('/reasons'))
+
+    def test_from0to1(self):
+        self.create_monitoring()
+        monitoring = self.db.get(self.monitoring_id)
+        monitoring['revisions'] = [
+            {'author': 'test_sas', 'date': '2018-01-01T00:00:00+02:00', 'rev': monitoring['_rev'],
+             'changes': [{'op': 'remove', 'path': '/status'}]},
+        ]
+        self.db.save(monitoring)
+
+        from0to1(self.app.app.registry)
+
+        self.assertNotIn('revisions', self.db.get(self.monitoring_id))
+        revisions = self.revision_docs(self.monitoring_id)
+        self.assertEqual(len(revisions), 2)
+        self.assertEqual(revisions[1]['changes'], [{'op': 'remove', 'path': '/status'}])
+
+    def test_revisions_not_stored(self):
+        self.create_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        with mock.patch.object(self.db, 'update', side_effect=ServerError('unavailable')), \
+                mock.patch('openprocurement.audit.api.utils.LOGGER') as logger:
+            self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {"reasons": ["public"]}})
+        self.assertEqual(self.db.get(self.monitoring_id)['reasons'], ['public'])
+        self.assertEqual(len(self.revision_docs(self.monitoring_id)), 1)
+        self.assertEqual(logger.error.call_args[1]['extra'], {'MESSAGE_ID': 'store_revisions_failed'})
+
+    def test_revision_failed(self):
+        self.create_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        with mock.patch.object(self.db, 'update', side_effect=lambda docs: [
+            (False, i['_id'], ServerError('unavailable')) for i in docs
+        ]), mock.patch('openprocurement.audit.api.utils.LOGGER') as logger:
+            self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {"reasons": ["public"]}})
+        self.assertEqual(logger.error.call_count, 1)
+        self.assertIn(revision_doc_prefix(self.monitoring_id) + '000001', logger.error.call_args[0][0])
+
+    def test_from0to1_revisions_not_stored(self):
+        self.create_monitoring()
+        monitoring = self.db.get(self.monitoring_id)
+        monitoring['revisions'] = [
+            {'author': 'test_sas', 'date': '2018-01-01T00:00:00+02:00', 'rev': monitoring['_rev'], 'changes': []},
+        ]
+        self.db.save(monitoring)
+
+        with mock.patch('openprocurement.audit.api.migration.store_revisions', return_value=False):
+            with self.assertRaises(RuntimeError):
+                from0to1(self.app.app.registry)
+        self.assertIn('revisions', self.db.get(self.monitoring_id))
+
+        from0to1(self.app.app.registry)
+        self.assertNotIn('revisions', self.db.get(self.monitoring_id))
+
+    def test_from0to1_monitorings_not_saved(self):
+        self.create_monitoring()
+        monitoring = self.db.get(self.monitoring_id)
+        monitoring['revisions'] = [
+            {'author': 'test_sas', 'date': '2018-01-01T00:00:00+02:00', 'rev': monitoring['_rev'], 'changes': []},
+        ]
+        self.db.save(monitoring)
+
+        update = self.db.update
+        with mock.patch.object(self.db, 'update', side_effect=lambda docs: update(docs) if docs[0]['_id'].startswith(
+                revision_doc_prefix(self.monitoring_id)) else [(False, i['_id'], ServerError('unavailable')) for i in docs]):
+            with self.assertRaises(RuntimeError):
+                from0to1(self.app.app.registry)
+        self.assertIn('revisions', self.db.get(self.monitoring_id))
+
+        from0to1(self.app.app.registry)
+        self.assertNotIn('revisions', self.db.get(self.monitoring_id))
+        self.assertEqual(len(self.revision_docs(self.monitoring_id)), 2)
+
+    def test_revision_docs_apart_from_monitorings(self):
+        self.create_monitoring()
+        ids = [row.id for row in self.db.view('_all_docs') if not row.id.startswith('_design/')]
+        revision_ids = [i for i in ids if i.startswith('revision-')]
+        self.assertEqual(revision_ids, [revision_doc_prefix(self.monitoring_id) + '000000'])
+        self.assertEqual(ids[-len(revision_ids):], revision_ids)
+
+    def test_from0to1_native_index_backend(self):
+        registry = mock.Mock()
+        registry.db.iterview.return_value = []
+        with mock.patch.dict(ACTIVE_VIEWS, {'all': native_view(monitorings_all_view)}):
+            from0to1(registry)
+        self.assertEqual(registry.db.iterview.call_args[0][0], '{}/all'.format(NATIVE_DESIGN))
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(MigrateTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -3,10 +3,11 @@ from openprocurement.api.constants import TZ, SANDBOX_MODE
 from openprocurement.audit.api.constants import MONITORING_TIME, MONITORING_END_PERIOD
 from openprocurement.audit.api.tests.base import BaseWebTest
 import unittest
+import mock
 from datetime import datetime, timedelta
 
 from openprocurement.audit.api.tests.utils import get_errors_field_names
-from openprocurement.audit.api.utils import calculate_business_date, get_monitoring_accelerator
+from openprocurement.audit.api.utils import calculate_business_date, get_monitoring_accelerator, MonitoringCache
 
 
 @freeze_time('2018-01-01T09:00:00+02:00')
@@ -57,6 +58,26 @@ class MonitoringResourceTest(BaseWebTest):
         self.assertNotEqual(response.json['data']["dateModified"], now_date.isoformat())
         self.assertEqual(response.json['data']["dateModified"], "2018-01-01T09:00:00+02:00")
 
+    def test_patch_nothing_keeps_document(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        doc = self.db.get(self.monitoring_id)
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {"data": {"procuringStages": ["planning"]}}
+        )
+        self.assertEqual(self.db.get(self.monitoring_id), doc)
+
+    def test_patch_stores_exported_document(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        response = self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {"data": {"reasons": ["public"]}}
+        )
+        doc = self.db.get(self.monitoring_id)
+        self.assertEqual(doc['reasons'], ["public"])
+        self.assertEqual(doc['dateModified'], response.json['data']['dateModified'])
+        self.assertEqual(doc['_rev'][:2], '2-')
+
     @freeze_time('2018-01-01T12:00:00.000000+02:00')
     def test_patch_to_active(self):
         self.app.authorization = ('Basic', (self.sas_token, ''))
@@ -186,6 +207,89 @@ class MonitoringResourceTest(BaseWebTest):
         )
 
 
+class MonitoringETagTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringETagTest, self).setUp()
+        self.create_monitoring()
+        self.url = '/monitorings/{}'.format(self.monitoring_id)
+
+    def test_not_modified(self):
+        etag = self.app.get(self.url).headers['ETag']
+        with mock.patch('openprocurement.audit.api.utils.get_monitoring_doc') as get_monitoring_doc:
+            response = self.app.get(self.url, headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(response.headers['ETag'], etag)
+        get_monitoring_doc.assert_not_called()
+
+    def test_nested_resources(self):
+        etag = self.app.get(self.url).headers['ETag']
+        self.assertEqual(self.app.get(self.url + '/posts').headers['ETag'], etag)
+        self.app.get(self.url + '/parties', headers={'If-None-Match': etag}, status=304)
+
+    def test_modified(self):
+        etag = self.app.get(self.url).headers['ETag']
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(self.url, {"data": {"reasons": ["public"]}})
+        self.app.authorization = None
+        response = self.app.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_role(self):
+        etag = self.app.get(self.url).headers['ETag']
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        response = self.app.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_not_found(self):
+        self.app.get('/monitorings/{}'.format('f' * 32), headers={'If-None-Match': '"1-abc/Everyone"'}, status=404)
+
+
+class MonitoringCacheResourceTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringCacheResourceTest, self).setUp()
+        self.app.app.registry.monitoring_cache = MonitoringCache(size=10)
+        self.create_monitoring()
+        self.url = '/monitorings/{}'.format(self.monitoring_id)
+
+    def test_hit(self):
+        self.app.get(self.url)
+        with mock.patch.object(self.db, 'get') as db_get:
+            response = self.app.get(self.url)
+        db_get.assert_not_called()
+        self.assertEqual(response.json['data']['id'], self.monitoring_id)
+        self.assertEqual(self.app.app.registry.monitoring_cache.stats()['hits'], 1)
+
+    def test_invalidated_on_save(self):
+        self.app.get(self.url)
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(self.url, {"data": {"reasons": ["public"]}})
+        self.assertEqual(self.app.get(self.url).json['data']['reasons'], ["public"])
+
+    def test_outdated(self):
+        self.app.get(self.url)
+        doc = self.db.get(self.monitoring_id)
+        doc['reasons'] = ["public"]
+        self.db.save(doc)
+        self.assertEqual(self.app.get(self.url).json['data']['reasons'], ["public"])
+
+    def test_write_after_write_of_another_worker(self):
+        self.app.app.registry.monitoring_cache.ttl = 60
+        self.app.get(self.url)
+        # another worker saves the monitoring within the ttl of the cached document
+        doc = self.db.get(self.monitoring_id)
+        doc['reasons'] = ["public"]
+        self.db.save(doc)
+        self.assertEqual(self.app.get(self.url).json['data']['reasons'], ["indicator"])
+
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        response = self.app.patch_json(self.url, {"data": {"procuringStages": ["awarding"]}})
+        self.assertEqual(response.json['data']['reasons'], ["public"])
+        self.assertEqual(response.json['data']['procuringStages'], ["awarding"])
+
+
 class ActiveMonitoringResourceTest(BaseWebTest):
     def setUp(self):
         super(ActiveMonitoringResourceTest, self).setUp()
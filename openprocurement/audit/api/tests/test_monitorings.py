@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import mock
+from pyramid.interfaces import IRoutesMapper
+from webob import Request
+
 from openprocurement.audit.api.tests.base import BaseWebTest, DSWebTestMixin
 from math import ceil
 from openprocurement.audit.api.constants import CANCELLED_STATUS, ACTIVE_STATUS
 from openprocurement.audit.api.tests.utils import get_errors_field_names
+from openprocurement.audit.api.utils import monitoring_serialize, MonitoringIdUnavailable
 
 
 class MonitoringsEmptyListingResourceTest(BaseWebTest, DSWebTestMixin):
@@ -13,6 +18,12 @@ class MonitoringsEmptyListingResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.content_type, 'application/json')
         self.assertEqual(response.json['data'], [])
 
+    def test_named_routes_before_monitoring(self):
+        routes = [i.name for i in self.app.app.registry.getUtility(IRoutesMapper).get_routes()]
+        for name in ('Monitorings Batch', 'Monitorings Changes', 'Monitorings Export',
+                     'Monitorings Ranking', 'Monitorings Stats'):
+            self.assertLess(routes.index(name), routes.index('Monitoring'), name)
+
     def test_post_monitoring_without_authorisation(self):
         self.app.post_json('/monitorings', {}, status=403)
 
@@ -20,6 +31,15 @@ class MonitoringsEmptyListingResourceTest(BaseWebTest, DSWebTestMixin):
         self.app.authorization = ('Basic', (self.broker_token, ''))
         self.app.post_json('/monitorings', {}, status=403)
 
+    def test_post_monitoring_id_unavailable(self):
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        with mock.patch('openprocurement.audit.api.views.monitoring.generate_monitoring_id',
+                        side_effect=MonitoringIdUnavailable()):
+            response = self.app.post_json('/monitorings', {'data': self.initial_data}, status=503)
+        self.assertEqual(
+            ('body', 'data'),
+            next(get_errors_field_names(response, 'Monitoring ID counter is unavailable.')))
+
     def test_post_monitoring_sas_empty_body(self):
         self.app.authorization = ('Basic', (self.sas_token, ''))
         response = self.app.post_json('/monitorings', {}, status=422)
@@ -130,6 +150,139 @@ class MonitoringsEmptyListingResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertNotIn("eliminationReport", response.json["data"])
 
 
+class MonitoringsBatchResourceTest(BaseWebTest, DSWebTestMixin):
+
+    def setUp(self):
+        super(MonitoringsBatchResourceTest, self).setUp()
+        self.app.authorization = ('Basic', (self.risk_indicator_token, ''))
+
+    def test_post(self):
+        response = self.app.post_json('/monitorings/batch', {"data": [
+            self.initial_data,
+            dict(self.initial_data, reasons=None),
+            dict(self.initial_data, status=ACTIVE_STATUS),
+            dict(self.initial_data, decision={
+                "description": "text",
+                "documents": [{
+                    'title': 'lorem.doc',
+                    'url': self.generate_docservice_url(),
+                    'hash': 'md5:' + '0' * 32,
+                    'format': 'application/msword',
+                }],
+            }),
+        ]}, status=201)
+
+        data = response.json['data']
+        self.assertEqual(len(data), 4)
+        self.assertIsNone(data[1])
+        self.assertIsNone(data[2])
+        self.assertEqual(
+            [(i['index'], i['name']) for i in response.json['errors']],
+            [(1, 'reasons'), (2, 'status')]
+        )
+        self.assertEqual(int(data[3]['monitoring_id'][-6:]), int(data[0]['monitoring_id'][-6:]) + 1)
+        self.assertIn('Signature=', data[3]['decision']['documents'][0]['url'])
+
+        for item in (data[0], data[3]):
+            response = self.app.get('/monitorings/{}'.format(item['id']))
+            self.assertEqual(response.json['data'], item)
+            self.assertIsNotNone(self.db.get('revision-{}-000000'.format(item['id'])))
+
+    def test_post_all_invalid(self):
+        response = self.app.post_json('/monitorings/batch', {"data": [
+            dict(self.initial_data, reasons=None),
+            "monitoring",
+        ]}, status=422)
+        self.assertEqual(
+            [(i['index'], i['name']) for i in response.json['errors']],
+            [(0, 'reasons'), (1, 'data')]
+        )
+
+    def test_post_not_list(self):
+        self.app.post_json('/monitorings/batch', {"data": self.initial_data}, status=422)
+        self.app.post_json('/monitorings/batch', {"data": []}, status=422)
+
+    def test_post_broker(self):
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+        self.app.post_json('/monitorings/batch', {"data": [self.initial_data]}, status=403)
+
+
+class MonitoringRankingResourceTest(BaseWebTest):
+
+    def setUp(self):
+        super(MonitoringRankingResourceTest, self).setUp()
+        self.ids = {}
+        for name, impact, kwargs in (
+            ('low', 0.5, {}),
+            ('high', 2.0, {}),
+            ('middle', 1.0, {}),
+            ('high_later', 2.0, {}),
+            ('none', None, {}),
+            ('other_region', 3.0, {'riskIndicatorsRegion': 'Lviv'}),
+            ('test', 5.0, {'mode': 'test'}),
+        ):
+            data = dict({'riskIndicatorsRegion': 'Kyiv'}, **kwargs)
+            if impact is not None:
+                data['riskIndicatorsTotalImpact'] = impact
+            self.ids[name] = self.create_monitoring(**data)['id']
+        self.ids['active'] = self.create_active_monitoring(riskIndicatorsTotalImpact=4.0,
+                                                           riskIndicatorsRegion='Kyiv')['id']
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+
+    def get_ids(self, url):
+        return [i['id'] for i in self.app.get(url).json['data']]
+
+    def test_ranking(self):
+        response = self.app.get('/monitorings/ranking?region=Kyiv')
+        self.assertEqual([i['id'] for i in response.json['data']],
+                         [self.ids[i] for i in ('high', 'high_later', 'middle', 'low', 'none')])
+        self.assertEqual(
+            set(response.json['data'][0]),
+            {'id', 'monitoring_id', 'tender_id', 'status', 'riskIndicators', 'riskIndicatorsTotalImpact',
+             'riskIndicatorsRegion', 'dateCreated'}
+        )
+        self.assertNotIn('riskIndicatorsTotalImpact', response.json['data'][-1])
+        self.assertEqual(self.get_ids('/monitorings/ranking?region=Lviv'), [self.ids['other_region']])
+        self.assertEqual(self.get_ids('/monitorings/ranking?region=Kyiv&status=active'), [self.ids['active']])
+        self.assertEqual(self.get_ids('/monitorings/ranking?region=Kyiv&mode=test'), [self.ids['test']])
+
+    def test_pages(self):
+        pages = []
+        url = '/monitorings/ranking?region=Kyiv&limit=2'
+        while True:
+            response = self.app.get(url)
+            pages.append([i['id'] for i in response.json['data']])
+            if not pages[-1]:
+                break
+            url = response.json['next_page']['path']
+        self.assertEqual(pages, [
+            [self.ids['high'], self.ids['high_later']],
+            [self.ids['middle'], self.ids['low']],
+            [self.ids['none']],
+            [],
+        ])
+
+    def test_opt_fields(self):
+        response = self.app.get('/monitorings/ranking?region=Kyiv&limit=1&opt_fields=reasons,status')
+        self.assertEqual(response.json['data'], [{
+            'id': self.ids['high'], 'riskIndicatorsTotalImpact': 2.0, 'reasons': ['indicator'], 'status': 'draft',
+        }])
+        self.assertIn('opt_fields=reasons%2Cstatus', response.json['next_page']['path'])
+
+    def test_forbidden(self):
+        self.app.authorization = None
+        self.app.get('/monitorings/ranking?region=Kyiv', status=403)
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+        self.app.get('/monitorings/ranking?region=Kyiv', status=403)
+        self.app.authorization = ('Basic', (self.risk_indicator_token, ''))
+        self.app.get('/monitorings/ranking?region=Kyiv', status=200)
+
+    def test_invalid(self):
+        response = self.app.get('/monitorings/ranking?status=unknown&mode=_all_', status=422)
+        self.assertEqual(sorted(i['name'] for i in response.json['errors']), ['mode', 'region', 'status'])
+        self.app.get('/monitorings/ranking?region=Kyiv&offset=invalid', status=404)
+
+
 class BaseFeedResourceTest(BaseWebTest):
     feed = ""
     limit = 3
@@ -432,3 +585,91 @@ class FeedVisibilityTestCase(BaseWebTest):
             {self.active_id, self.draft_id, self.cancelled_id,
              self.test_active_id, self.test_draft_id, self.test_cancelled_id}
         )
+
+
+class FeedOptFieldsTestCase(BaseWebTest, DSWebTestMixin):
+    fields = ['status', 'reasons', 'riskIndicators', 'monitoringPeriod', 'documents',
+              'decision', 'conclusion', 'tender_owner_token', 'revisions']
+
+    def setUp(self):
+        super(FeedOptFieldsTestCase, self).setUp()
+        self.create_active_monitoring(riskIndicators=['some_risk_indicator_id'])
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.post_json(
+            '/monitorings/{}/documents'.format(self.monitoring_id),
+            {'data': {
+                'title': 'lorem.doc',
+                'url': self.generate_docservice_url(),
+                'hash': 'md5:' + '0' * 32,
+                'format': 'application/msword',
+            }})
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {'data': {'conclusion': {'violationOccurred': False}}})
+
+    def assert_listing_matches_view(self):
+        response = self.app.get('/monitorings?opt_fields={}'.format(','.join(self.fields)))
+        expected = self.app.get('/monitorings/{}'.format(self.monitoring_id)).json['data']
+        expected_fields = set(self.fields) | {'id', 'dateModified'}
+        self.assertEqual(
+            response.json['data'],
+            [{i: j for i, j in expected.items() if i in expected_fields}]
+        )
+
+    def test_anonymous(self):
+        self.app.authorization = None
+        self.assert_listing_matches_view()
+
+    def test_sas(self):
+        self.assert_listing_matches_view()
+
+
+class ListingRendererTestCase(BaseWebTest):
+
+    def setUp(self):
+        super(ListingRendererTestCase, self).setUp()
+        self.ids = []
+        for _ in range(5):
+            self.create_active_monitoring()
+            self.ids.append(self.monitoring_id)
+
+    def pages(self, url):
+        pages = []
+        while True:
+            response = self.app.get(url)
+            pages.append([i['id'] for i in response.json['data']])
+            if not pages[-1]:
+                return pages
+            url = response.json['next_page']['path']
+
+    def test_pages(self):
+        self.assertEqual(self.pages('/monitorings?limit=2'), [self.ids[0:2], self.ids[2:4], self.ids[4:], []])
+        self.assertEqual(self.pages('/monitorings?limit=2&feed=changes'),
+                         [self.ids[0:2], self.ids[2:4], self.ids[4:], []])
+
+    def test_pretty(self):
+        for url in ('/monitorings', '/monitorings?opt_fields=status', '/monitorings?descending=1'):
+            response = self.app.get(url)
+            self.assertEqual(response.content_type, 'application/json')
+            self.assertEqual(response.json, self.app.get(url + ('&' if '?' in url else '?') + 'opt_pretty=1').json)
+
+    def test_failure_is_not_a_cut_page(self):
+        serialize = monitoring_serialize
+
+        def failing_serialize(request, data, fields):
+            if data['_id'] == self.ids[3]:
+                return {'id': data['_id'], 'status': object()}
+            return serialize(request, data, fields)
+
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(status)
+
+        request = Request.blank('/monitorings?opt_fields=status')
+        with mock.patch('openprocurement.audit.api.views.monitoring.monitoring_serialize', failing_serialize):
+            try:
+                ''.join(self.app.app(request.environ, start_response))
+            except TypeError:
+                pass
+        self.assertFalse([i for i in statuses if i.startswith('200')])
@@ -5,6 +5,8 @@ import json
 
 from hashlib import sha512
 from freezegun import freeze_time
+from schematics.exceptions import ModelValidationError
+from openprocurement.audit.api.models import Monitoring, DialogueIndex
 from openprocurement.audit.api.tests.base import BaseWebTest, DSWebTestMixin
 from openprocurement.audit.api.tests.utils import get_errors_field_names
 
@@ -98,7 +100,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.content_type, 'application/json')
         self.assertEqual(response.json['data']['dateModified'], '2018-01-02T12:30:00+02:00')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_post_create_by_tender_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -177,7 +179,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
             status=403
         )
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_monitoring_owner_answer_post_by_tender_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -223,7 +225,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.json['data']['description'], 'Gotcha')
         self.assertEqual(response.json['data']['relatedPost'], post_id)
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_monitoring_owner_answer_post_by_tender_owner_multiple(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -271,7 +273,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
             ('body', 'posts', 'relatedPost'),
             next(get_errors_field_names(response, 'relatedPost must be unique.')))
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_monitoring_owner_answer_post_for_not_unique_id(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -322,7 +324,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
             ('body', 'relatedPost'),
             next(get_errors_field_names(response, 'relatedPost can\'t be a link to more than one post.')))
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_tender_owner_answer_post_by_monitoring_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -361,7 +363,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.json['data']['description'], 'The Force will be with you. Always.')
         self.assertEqual(response.json['data']['relatedPost'], post_id)
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_tender_owner_answer_post_by_tender_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -406,7 +408,7 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
             ('body', 'relatedPost'),
             next(get_errors_field_names(response, 'relatedPost should be one of posts of current monitoring.')))
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_two_answers_in_a_row(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -527,6 +529,37 @@ class MonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
             ('body', 'relatedParty'),
             next(get_errors_field_names(response, 'relatedParty should be one of parties.')))
 
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
+    def test_dialogue_index_built_once_per_validation(self, mock_api_client):
+        mock_api_client.return_value.extract_credentials.return_value = {
+            'data': {'tender_token': sha512('tender_token').hexdigest()}
+        }
+        questions = [self.app.post_json(
+            '/monitorings/{}/posts'.format(self.monitoring_id),
+            {'data': {'title': 'Lorem ipsum', 'description': 'Lorem ipsum dolor sit amet'}}
+        ).json['data']['id'] for _ in range(3)]
+
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+        response = self.app.patch_json(
+            '/monitorings/{}/credentials?acc_token={}'.format(self.monitoring_id, 'tender_token'))
+        tender_owner_token = response.json['access']['token']
+        for question in questions:
+            self.app.post_json(
+                '/monitorings/{}/posts?acc_token={}'.format(self.monitoring_id, tender_owner_token),
+                {'data': {'title': 'Lorem ipsum', 'description': 'Gotcha', 'relatedPost': question}})
+
+        monitoring = Monitoring(self.db.get(self.monitoring_id))
+        with mock.patch('openprocurement.audit.api.models.DialogueIndex', wraps=DialogueIndex) as index:
+            monitoring.validate()
+        self.assertEqual(index.call_count, 1)
+        self.assertNotIn('_dialogue_index', vars(monitoring))
+
+        # a post validated on its own indexes the monitoring it belongs to
+        answer = monitoring.posts[-1]
+        answer.relatedPost = 'f' * 32
+        with self.assertRaises(ModelValidationError):
+            answer.validate()
+
 
 @freeze_time('2018-01-01T12:00:00.000000+03:00')
 class DeclinedMonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
@@ -553,7 +586,7 @@ class DeclinedMonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
                 "status": "declined",
             }})
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_post_create_by_tender_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -574,7 +607,7 @@ class DeclinedMonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.content_type, 'application/json')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_post_answer_by_monitoring_owner(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
@@ -609,7 +642,7 @@ class DeclinedMonitoringPostResourceTest(BaseWebTest, DSWebTestMixin):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(response.content_type, 'application/json')
 
-    @mock.patch('openprocurement.audit.api.validation.TendersClient')
+    @mock.patch('openprocurement.audit.api.utils.TendersClient')
     def test_post_create_by_tender_owner_multiple(self, mock_api_client):
         mock_api_client.return_value.extract_credentials.return_value = {
             'data': {'tender_token': sha512('tender_token').hexdigest()}
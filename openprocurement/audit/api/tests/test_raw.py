@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import datetime
+
+import mock
+
+from openprocurement.audit.api.models import Monitoring
+from openprocurement.audit.api.raw import RAW_SERIALIZABLES, RawItem, get_plan, get_role, render_model
+from openprocurement.audit.api.tests.base import BaseWebTest, DSWebTestMixin
+from schematics.models import Model
+from schematics.transforms import Role, blacklist
+from schematics.types import StringType
+from schematics.types.compound import ModelType, ListType
+
+
+def model_classes(model_class, found=None):
+    found = found if found is not None else set()
+    found.add(model_class)
+    for field in model_class.fields.values():
+        while isinstance(field, ListType):
+            field = field.field
+        if isinstance(field, ModelType) and field.model_class not in found:
+            model_classes(field.model_class, found)
+    return found
+
+
+class RawSerializablesTest(unittest.TestCase):
+
+    def test_all_serializables_rendered(self):
+        for model_class in model_classes(Monitoring):
+            for name in model_class._serializables:
+                self.assertIn(name, RAW_SERIALIZABLES, '{}.{}'.format(model_class.__name__, name))
+
+
+class Note(Model):
+    title = StringType()
+    secret = StringType()
+
+    class Options:
+        roles = {
+            'view': Role(lambda name, value, seq: name == 'secret' and value == 'hidden', []),
+            'plain': blacklist('secret'),
+        }
+
+
+class RenderPlanTest(unittest.TestCase):
+
+    def test_cached(self):
+        self.assertIs(get_plan(Monitoring, 'view'), get_plan(Monitoring, 'view'))
+        self.assertIsNot(get_plan(Monitoring, 'edit_draft'), get_plan(Monitoring, 'edit_active'))
+
+    def test_static_roles(self):
+        for model_class in model_classes(Monitoring):
+            for role in list(model_class._options.roles) + [None]:
+                plan = get_plan(model_class, role)
+                gottago = get_role(model_class, role)
+                self.assertIsNone(plan.gottago, '{} {}'.format(model_class.__name__, role))
+                self.assertEqual(
+                    sorted(i[0] for i in plan.fields),
+                    sorted(i for i in model_class.fields if not gottago(i, None)),
+                    '{} {}'.format(model_class.__name__, role)
+                )
+
+    def test_value_dependent_role(self):
+        request = mock.Mock(authenticated_role='sas')
+        self.assertIsNotNone(get_plan(Note, 'view').gottago)
+        self.assertIsNone(get_plan(Note, 'plain').gottago)
+        for data in ({'title': 'a', 'secret': 'hidden'}, {'title': 'a', 'secret': 'shown'}):
+            for role in ('view', 'plain'):
+                self.assertEqual(render_model(Note, data, role, request), Note(data).serialize(role))
+
+
+class RawReadConformanceTest(BaseWebTest, DSWebTestMixin):
+    """
+    Every read endpoint under /monitorings/{monitoring_id} renders the raw document
+    byte for byte as the schematics models do
+    """
+
+    def setUp(self):
+        super(RawReadConformanceTest, self).setUp()
+        self.create_monitoring(parties=[self.initial_party])
+        self.tender_owner_token = '1234qwerty'
+        monitoring = self.db.get(self.monitoring_id)
+        monitoring.update(tender_owner='broker', tender_owner_token=self.tender_owner_token)
+        self.db.save(monitoring)
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {
+            "status": "active",
+            "decision": {
+                "description": "text",
+                "date": datetime.now().isoformat(),
+                "documents": [self.document_data()],
+            }
+        }})
+        # the conclusion isn't published until the monitoring is addressed
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {
+            "conclusion": {
+                "description": "text",
+                "violationOccurred": True,
+                "violationType": ["corruptionProcurementMethodType"],
+                "documents": [self.document_data()],
+            }
+        }})
+        response = self.app.post_json('/monitorings/{}/documents'.format(self.monitoring_id),
+                                      {"data": self.document_data()})
+        self.document_id = response.json['data']['id']
+        self.app.put_json('/monitorings/{}/documents/{}'.format(self.monitoring_id, self.document_id),
+                          {"data": self.document_data()})
+        response = self.app.post_json('/monitorings/{}/posts'.format(self.monitoring_id), {"data": {
+            "title": "Lorem ipsum",
+            "description": "Lorem ipsum dolor sit amet",
+            "documents": [self.document_data()],
+        }})
+        self.post = response.json['data']
+        self.party_id = self.app.get('/monitorings/{}/parties'.format(self.monitoring_id)).json['data'][0]['id']
+        self.decision_document_id = self.app.get(
+            '/monitorings/{}/decision/documents'.format(self.monitoring_id)).json['data'][0]['id']
+
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {"status": "addressed"}})
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+        response = self.app.put_json(
+            '/monitorings/{}/eliminationReport?acc_token={}'.format(self.monitoring_id, self.tender_owner_token),
+            {"data": {"description": "text", "documents": [self.document_data()]}})
+        self.elimination_document_id = response.json['data']['documents'][0]['id']
+        response = self.app.put_json(
+            '/monitorings/{}/appeal?acc_token={}'.format(self.monitoring_id, self.tender_owner_token),
+            {"data": {"description": "text", "documents": [self.document_data()]}})
+        self.appeal_document_id = response.json['data']['documents'][0]['id']
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {
+            "eliminationResolution": {
+                "result": "completely",
+                "resultByType": {"corruptionProcurementMethodType": "eliminated"},
+                "description": "text",
+                "documents": [self.document_data()],
+            },
+        }})
+        self.app.patch_json('/monitorings/{}'.format(self.monitoring_id), {"data": {
+            "status": "stopped",
+            "cancellation": {
+                "description": "text",
+                "documents": [self.document_data()],
+            },
+        }})
+        monitoring = self.app.get('/monitorings/{}'.format(self.monitoring_id)).json['data']
+        self.resolution_document_id = monitoring['eliminationResolution']['documents'][0]['id']
+        self.cancellation_document_id = monitoring['cancellation']['documents'][0]['id']
+
+    def document_data(self):
+        return {
+            'title': 'lorem.doc',
+            'url': self.generate_docservice_url(),
+            'hash': 'md5:' + '0' * 32,
+            'format': 'application/msword',
+        }
+
+    def read_urls(self):
+        prefix = '/monitorings/{}'.format(self.monitoring_id)
+        return [
+            prefix,
+            prefix + '/documents',
+            prefix + '/documents?all=1',
+            prefix + '/documents/{}'.format(self.document_id),
+            prefix + '/decision/documents',
+            prefix + '/decision/documents/{}'.format(self.decision_document_id),
+            prefix + '/conclusion/documents',
+            prefix + '/parties',
+            prefix + '/parties/{}'.format(self.party_id),
+            prefix + '/posts',
+            prefix + '/posts/{}'.format(self.post['id']),
+            prefix + '/posts/{}/documents'.format(self.post['id']),
+            prefix + '/posts/{}/documents/{}'.format(self.post['id'], self.post['documents'][0]['id']),
+            prefix + '/eliminationReport',
+            prefix + '/eliminationReport/documents',
+            prefix + '/eliminationReport/documents/{}'.format(self.elimination_document_id),
+            prefix + '/appeal',
+            prefix + '/appeal/documents',
+            prefix + '/appeal/documents/{}'.format(self.appeal_document_id),
+            prefix + '/eliminationResolution',
+            prefix + '/eliminationResolution/documents',
+            prefix + '/eliminationResolution/documents/{}'.format(self.resolution_document_id),
+            prefix + '/cancellation',
+            prefix + '/cancellation/documents',
+            prefix + '/cancellation/documents/{}'.format(self.cancellation_document_id),
+        ]
+
+    def assert_conformance(self, authorization):
+        self.app.authorization = authorization
+        for url in self.read_urls():
+            raw = self.app.get(url, expect_errors=True)
+            with mock.patch('openprocurement.audit.api.traversal.read_only', return_value=False):
+                model = self.app.get(url, expect_errors=True)
+            self.assertEqual(raw.status, model.status, url)
+            self.assertEqual(raw.content_type, model.content_type, url)
+            self.assertEqual(raw.body, model.body, url)
+
+    def test_anonymous(self):
+        self.assert_conformance(None)
+
+    def test_sas(self):
+        self.assert_conformance(('Basic', (self.sas_token, '')))
+
+    def test_broker(self):
+        self.assert_conformance(('Basic', (self.broker_token, '')))
+
+    def test_rewritten_document_url(self):
+        self.app.authorization = None
+        url = '/monitorings/{}/eliminationReport/documents/{}'.format(self.monitoring_id, self.elimination_document_id)
+        stored = self.db.get(self.monitoring_id)['eliminationReport']['documents'][0]['url']
+        self.assertIn('?download=', stored)
+        raw = self.app.get(url)
+        with mock.patch('openprocurement.audit.api.traversal.read_only', return_value=False):
+            model = self.app.get(url)
+        self.assertNotEqual(raw.json['data']['url'], stored)
+        self.assertEqual(raw.body, model.body)
+
+    def test_not_found(self):
+        self.app.authorization = None
+        self.app.get('/monitorings/{}'.format('f' * 32), status=404)
+        self.app.get('/monitorings/{}/posts/{}'.format(self.monitoring_id, 'f' * 32), status=404)
+        self.app.get('/monitorings/{}/documents/{}'.format(self.monitoring_id, 'f' * 32), status=404)
+
+    def test_attributes(self):
+        request = mock.Mock(authenticated_role='sas')
+        doc = self.db.get(self.monitoring_id)
+        monitoring = RawItem(Monitoring, doc, request)
+        model = Monitoring(doc)
+        self.assertEqual(monitoring.id, model.id)
+        self.assertEqual(monitoring.rev, model.rev)
+        self.assertEqual(monitoring.dateModified, model.dateModified)
+        self.assertEqual(monitoring.posts[0].id, model.posts[0].id)
+        self.assertIs(monitoring.posts[0].__parent__, monitoring)
+        self.assertEqual(monitoring.eliminationReport.description, model.eliminationReport.description)
+        del doc['appeal']
+        self.assertEqual(RawItem(Monitoring, doc, request).appeal, None)
+        with self.assertRaises(AttributeError):
+            monitoring.__acl__
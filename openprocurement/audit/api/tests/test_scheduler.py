@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import unittest
+from datetime import datetime
+
+import mock
+from couchdb import ResourceConflict
+from freezegun import freeze_time
+from openprocurement.api.constants import TZ
+from pytz import utc
+
+from openprocurement.audit.api.scheduler import DeadlineScheduler, MonitoringDeadline, SCHEDULER_DOC, SCHEDULER_USERID
+from openprocurement.audit.api.tests.test_elimination import MonitoringEliminationBaseTest
+from openprocurement.audit.api.utils import revision_doc_prefix
+
+
+def at(*args):
+    return TZ.localize(datetime(*args))
+
+
+@freeze_time('2018-01-01T11:00:00+02:00')
+class DeadlineSchedulerTest(MonitoringEliminationBaseTest):
+
+    def setUp(self):
+        super(DeadlineSchedulerTest, self).setUp()
+        self.scheduler = DeadlineScheduler(self.app.app.registry, batch_size=2)
+        self.events = []
+        self.app.app.registry.registerHandler(self.events.append, (MonitoringDeadline,))
+        # events are notified for deadlines that come after the first tick
+        self.scheduler.tick(at(2017, 12, 31))
+
+    def create_post(self):
+        self.create_active_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.post_json('/monitorings/{}/posts'.format(self.monitoring_id), {'data': {
+            'title': 'Lorem ipsum',
+            'description': 'Lorem ipsum dolor sit amet',
+        }})
+
+    def wait_lease(self, worker, now):
+        for _ in range(worker.lease_ticks):
+            self.assertIsNone(worker.tick(now))
+
+    def create_declined_monitoring(self):
+        self.create_active_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        self.app.patch_json(
+            '/monitorings/{}'.format(self.monitoring_id),
+            {"data": {
+                "conclusion": {
+                    "description": "Some text",
+                    "violationOccurred": False,
+                },
+                "status": "declined",
+            }}
+        )
+
+    def test_declined_closed(self):
+        self.create_declined_monitoring()
+        end_date = self.app.get('/monitorings/{}'.format(self.monitoring_id)).json['data']['eliminationPeriod']['endDate']
+
+        self.assertEqual(self.scheduler.tick(at(2018, 1, 1, 11)), (0, 0))
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (1, 0))
+
+        response = self.app.get('/monitorings/{}'.format(self.monitoring_id))
+        self.assertEqual(response.json['data']['status'], 'closed')
+        self.assertEqual(response.json['data']['dateModified'], at(2018, 6, 1).isoformat())
+        prefix = revision_doc_prefix(self.monitoring_id)
+        revision = list(self.db.view('_all_docs', startkey=prefix, endkey=prefix + u'\ufff0', include_docs=True))[-1].doc
+        self.assertEqual(revision['author'], SCHEDULER_USERID)
+        self.assertIn('/status', [i['path'] for i in revision['changes']])
+
+        self.assertEqual([(i.type, i.deadline, i.status, i.transition) for i in self.events],
+                         [('eliminationPeriod', end_date, 'declined', 'closed')])
+        # the monitoring has left the view
+        self.assertEqual(self.scheduler.tick(at(2018, 7, 1)), (0, 0))
+
+    def test_addressed_without_resolution(self):
+        self.create_addressed_monitoring()
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (0, 1))
+        self.assertEqual(self.app.get('/monitorings/{}'.format(self.monitoring_id)).json['data']['status'],
+                         'addressed')
+        self.assertEqual([(i.type, i.transition) for i in self.events], [('eliminationPeriod', None)])
+
+    def test_addressed_completed(self):
+        self.create_monitoring_with_resolution()
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (1, 0))
+        self.assertEqual(self.app.get('/monitorings/{}'.format(self.monitoring_id)).json['data']['status'],
+                         'completed')
+
+    def test_events_notified_once(self):
+        self.create_active_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        post_id = self.app.post_json('/monitorings/{}/posts'.format(self.monitoring_id), {'data': {
+            'title': 'Lorem ipsum',
+            'description': 'Lorem ipsum dolor sit amet',
+        }}).json['data']['id']
+
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (0, 2))
+        self.assertEqual(sorted((i.type, i.post_id) for i in self.events),
+                         [('monitoringPeriod', None), ('post', post_id)])
+        self.assertEqual(self.scheduler.tick(at(2018, 7, 1)), (0, 0))
+
+    def test_answered_post(self):
+        self.create_active_monitoring()
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        post_id = self.app.post_json('/monitorings/{}/posts'.format(self.monitoring_id), {'data': {
+            'title': 'Lorem ipsum',
+            'description': 'Lorem ipsum dolor sit amet',
+        }}).json['data']['id']
+        self.app.authorization = ('Basic', (self.broker_token, ''))
+        self.app.post_json(
+            '/monitorings/{}/posts?acc_token={}'.format(self.monitoring_id, self.tender_owner_token),
+            {'data': {'title': 'Lorem ipsum', 'description': 'Gotcha', 'relatedPost': post_id}})
+
+        self.scheduler.tick(at(2018, 6, 1))
+        self.assertEqual([i.type for i in self.events], ['monitoringPeriod'])
+
+    def test_single_worker(self):
+        self.create_post()
+        worker = DeadlineScheduler(self.app.app.registry, batch_size=2)
+        self.assertIsNone(worker.tick(at(2018, 6, 1)))
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (0, 2))
+        self.assertIsNone(worker.tick(at(2018, 7, 1)))
+        self.assertEqual(len(self.events), 2)
+
+    def test_lease_taken_over(self):
+        self.create_post()
+        worker = DeadlineScheduler(self.app.app.registry, batch_size=2)
+        self.wait_lease(worker, at(2018, 6, 1))
+        # deadlines that have come since the last tick of the stopped worker
+        self.assertEqual(worker.tick(at(2018, 6, 1)), (0, 2))
+        self.assertEqual(self.db.get(SCHEDULER_DOC)['owner'], worker.owner)
+        self.assertIsNone(self.scheduler.tick(at(2018, 7, 1)))
+        self.assertEqual(len(self.events), 2)
+
+    def test_renewed_lease_kept(self):
+        self.create_post()
+        worker = DeadlineScheduler(self.app.app.registry, batch_size=2)
+        # the clock of the worker is ahead, the lease is still renewed by the holder
+        for _ in range(worker.lease_ticks + 1):
+            self.assertIsNone(worker.tick(at(2019, 1, 1)))
+            self.assertIsNotNone(self.scheduler.tick(at(2018, 6, 1)))
+        self.assertEqual(self.db.get(SCHEDULER_DOC)['owner'], self.scheduler.owner)
+        self.assertEqual(len(self.events), 2)
+
+    def test_cursor_saved_in_utc(self):
+        self.scheduler.tick(at(2018, 6, 1))
+        self.assertEqual(self.db.get(SCHEDULER_DOC)['cursor'], at(2018, 6, 1).astimezone(utc).isoformat())
+
+    def test_rows_compared_in_utc(self):
+        # clocks go back from 04:00+03:00 to 03:00+02:00 on 2018-10-28 in Kyiv
+        keys = ['2018-10-28T02:40:00+03:00', '2018-10-28T03:30:00+03:00',
+                '2018-10-28T03:10:00+02:00', '2018-10-28T03:40:00+02:00']
+        rows = [mock.Mock(key=['event', key]) for key in keys]
+        with mock.patch.object(self.db, 'iterview', return_value=rows):
+            result = self.scheduler.rows('event', datetime(2018, 10, 28, 0, 10, tzinfo=utc),
+                                         datetime(2018, 10, 28, 1, 20, tzinfo=utc))
+            self.assertEqual([row.key[1] for row in result], keys[1:3])
+
+    def test_events_notified_again_if_cursor_not_saved(self):
+        self.create_post()
+        save = self.db.save
+
+        def save_lease(doc):
+            if doc['_id'] == SCHEDULER_DOC and doc['cursor'] == at(2018, 6, 1).astimezone(utc).isoformat():
+                raise ResourceConflict()
+            return save(doc)
+
+        with mock.patch.object(self.db, 'save', side_effect=save_lease):
+            self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (0, 2))
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (0, 2))
+        self.assertEqual(len(self.events), 4)
+        self.assertEqual(self.scheduler.tick(at(2018, 7, 1)), (0, 0))
+
+    def test_batches(self):
+        for _ in range(3):
+            self.create_declined_monitoring()
+        self.assertEqual(self.scheduler.tick(at(2018, 6, 1)), (3, 0))
+
+
+def suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(DeadlineSchedulerTest))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -144,6 +144,41 @@ class TenderMonitoringsResourceTest(BaseWebTest):
         self.assertEqual(response.content_type, 'application/json')
         self.assertEqual(response.json['data'], [])
 
+    def test_pagination(self):
+        tender_id = "f" * 32
+        ids = []
+        for i in range(5):
+            self.create_monitoring(tender_id=tender_id)
+            ids.append(self.monitoring_id)
+
+        self.app.authorization = ('Basic', (self.sas_token, ''))
+        url = '/tenders/{}/monitorings?mode=draft&limit=2'.format(tender_id)
+        pages = []
+        for i in range(4):
+            response = self.app.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([e["id"] for e in response.json['data']])
+            url = response.json['next_page']['path']
+        self.assertEqual(pages, [ids[0:2], ids[2:4], ids[4:], []])
+
+        self.assertIn('limit=2', url)
+
+        response = self.app.get('/tenders/{}/monitorings?mode=draft'.format(tender_id))
+        self.assertEqual(len(response.json['data']), 5)
+        self.assertNotIn('prev_page', response.json)
+        self.assertNotIn('limit', response.json['next_page']['path'])
+
+        response = self.app.get('/tenders/{}/monitorings?mode=draft&limit=2&descending=1'.format(tender_id))
+        self.assertEqual([e["id"] for e in response.json['data']], [ids[4], ids[3]])
+        response = self.app.get(response.json['next_page']['path'])
+        self.assertEqual([e["id"] for e in response.json['data']], [ids[2], ids[1]])
+        response = self.app.get(response.json['prev_page']['path'])
+        self.assertEqual([e["id"] for e in response.json['data']], [ids[3], ids[4]])
+
+    def test_pagination_invalid_offset(self):
+        response = self.app.get('/tenders/{}/monitorings?offset=invalid'.format("f" * 32), status=404)
+        self.assertEqual(response.json['errors'][0]['name'], 'offset')
+
 
 def suite():
     s = unittest.TestSuite()
@@ -1,8 +1,12 @@
 import unittest
+from random import Random
 
 import mock
+from couchdb import ResourceConflict
 from datetime import datetime, timedelta
-from openprocurement.api.constants import TZ
+from gevent import sleep, spawn, joinall
+from openprocurement.api.constants import TZ, WORKING_DAYS
+from openprocurement.tender.core.utils import calculate_business_date as calculate_business_date_base
 
 from openprocurement.audit.api.utils import (
     calculate_business_date,
@@ -10,7 +14,18 @@ from openprocurement.audit.api.utils import (
     get_monitoring_accelerator,
     calculate_normalized_business_date,
     calculate_normalized_date,
+    is_non_working_date,
+    generate_monitoring_id,
+    lease_monitoring_indexes,
+    MonitoringIdAllocator,
+    MonitoringIdUnavailable,
+    MonitoringCache,
+    CircuitBreaker,
+    TenderCredentials,
+    TendersAPIUnavailable,
 )
+from openprocurement.audit.api.business_calendar import BusinessCalendar, is_non_working_day
+from openprocurement.audit.api.tests.utils import TendersServer
 
 
 class CalculateBusinessDateTests(unittest.TestCase):
@@ -133,6 +148,46 @@ class CalculateNormalizedBusinessDateTests(unittest.TestCase):
         self.assertEqual(result, datetime(2018, 1, 10, 0, 0, 0, tzinfo=TZ))
 
 
+class BusinessCalendarTests(unittest.TestCase):
+    """
+    The compiled calendar against stepping through the days of the actual WORKING_DAYS
+    """
+
+    def dates(self, seed, first=datetime(2016, 1, 1), years=5):
+        random = Random(seed)
+        for day in range(365 * years):
+            date = first + timedelta(days=day, seconds=random.choice([0, random.randint(0, 86399)]))
+            yield TZ.localize(date), timedelta(days=random.randint(-20, 20), seconds=random.randint(-1, 1) * 3600)
+
+    def test_add_working_days(self):
+        for date, delta in self.dates(0):
+            self.assertEqual(
+                calculate_business_date(date, delta, working_days=True),
+                calculate_business_date_base(date, delta, working_days=True),
+                (date, delta))
+
+    def test_is_non_working_date(self):
+        for date, _ in self.dates(1):
+            self.assertEqual(is_non_working_date(date), bool(is_non_working_day(date.date(), WORKING_DAYS)), date)
+
+    def test_normalized_business_date(self):
+        for date, delta in self.dates(2, years=2):
+            result = calculate_normalized_business_date(date, abs(delta), working_days=True)
+            with mock.patch('openprocurement.audit.api.utils.get_business_calendar') as calendar:
+                calendar.return_value.add_working_days.return_value = None
+                calendar.return_value.is_non_working.return_value = None
+                expected = calculate_normalized_business_date(date, abs(delta), working_days=True)
+            self.assertEqual(result, expected, (date, delta))
+
+    def test_out_of_calendar(self):
+        calendar = BusinessCalendar({}, today=datetime(2018, 1, 1))
+        self.assertIsNone(calendar.add_working_days(datetime(2016, 12, 31), timedelta(days=1)))
+        self.assertIsNone(calendar.add_working_days(datetime(2017, 1, 2), timedelta(days=-1)))
+        self.assertIsNone(calendar.add_working_days(datetime(2028, 12, 29), timedelta(days=1)))
+        self.assertIsNone(calendar.is_non_working(datetime(2029, 1, 1).date()))
+        self.assertEqual(calendar.add_working_days(datetime(2028, 12, 28), timedelta(days=1)), datetime(2028, 12, 29))
+
+
 class TestGetMonitoringAccelerator(unittest.TestCase):
 
     def test_acceleration_value(self):
@@ -194,3 +249,321 @@ class CalculateNormalizedDateTest(unittest.TestCase):
             calculate_normalized_date(datetime(2018, 1, 1, 12, 0, 0, tzinfo=TZ), ceil=False),
             datetime(2018, 1, 1, 0, 0, 0, tzinfo=TZ)
         )
+
+
+class CounterDatabase(object):
+    """
+    In-memory stand-in of a couchdb database with revision conflicts and i/o latency
+    """
+    name = 'counters'
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.docs = {}
+        self.gets = self.saves = 0
+
+    def get(self, doc_id, default=None):
+        sleep(self.latency)
+        self.gets += 1
+        doc = self.docs.get(doc_id)
+        return dict(doc) if doc else default
+
+    def save(self, doc):
+        sleep(self.latency)
+        current = self.docs.get(doc['_id'], {})
+        if current.get('_rev') != doc.get('_rev'):
+            raise ResourceConflict()
+        self.saves += 1
+        self.docs[doc['_id']] = dict(doc, _rev=self.saves)
+
+
+class MonitoringIdAllocatorTest(unittest.TestCase):
+    ctime = datetime(2018, 1, 1, 12, 0, 0, tzinfo=TZ)
+
+    def generate(self, db, allocator, workers, count):
+        def worker():
+            return [generate_monitoring_id(self.ctime, db, '', allocator) for _ in range(count)]
+        jobs = [spawn(worker) for _ in range(workers)]
+        joinall(jobs)
+        return [i for job in jobs for i in job.value]
+
+    def test_sequential(self):
+        db = CounterDatabase()
+        allocator = MonitoringIdAllocator(block_size=3)
+        ids = [generate_monitoring_id(self.ctime, db, '1', allocator) for _ in range(4)]
+        self.assertEqual(ids, ['UA-M-2018-01-01-00000{}-1'.format(i) for i in range(1, 5)])
+        self.assertEqual(db.saves, 2)
+        self.assertEqual(db.docs['monitoringID_1']['2018-01-01'], 7)
+
+    def test_without_allocator(self):
+        db = CounterDatabase()
+        generate_monitoring_id(self.ctime, db)
+        self.assertEqual(generate_monitoring_id(self.ctime, db), 'UA-M-2018-01-01-000002')
+
+    def test_next_day(self):
+        db = CounterDatabase()
+        allocator = MonitoringIdAllocator(block_size=10)
+        generate_monitoring_id(self.ctime, db, '', allocator)
+        self.assertEqual(
+            generate_monitoring_id(self.ctime + timedelta(days=1), db, '', allocator),
+            'UA-M-2018-01-02-000001'
+        )
+
+    def test_concurrent_workers(self):
+        db = CounterDatabase(latency=0.001)
+        allocators = [MonitoringIdAllocator(block_size=10) for _ in range(2)]  # two worker processes
+        jobs = [spawn(self.generate, db, allocator, 8, 25) for allocator in allocators]
+        joinall(jobs)
+        ids = jobs[0].value + jobs[1].value
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 400)
+        self.assertEqual(db.saves, 40)
+
+    def test_lease_gives_up(self):
+        db = mock.Mock(name='counters')
+        db.get.return_value = {'_id': 'monitoringID'}
+        db.save.side_effect = ResourceConflict()
+        with mock.patch('openprocurement.audit.api.utils.sleep') as sleep_mock:
+            with self.assertRaises(MonitoringIdUnavailable):
+                lease_monitoring_indexes(db, 'monitoringID', '2018-01-01', attempts=5, backoff=0.1)
+        self.assertEqual(db.save.call_count, 5)
+        self.assertEqual(sleep_mock.call_count, 4)
+        self.assertTrue(all(0 <= i[0][0] <= min(0.1 * 2 ** n, 1) for n, i in enumerate(sleep_mock.call_args_list)))
+
+    def test_lease_retries(self):
+        db = CounterDatabase()
+        save = db.save
+        errors = [IOError('unavailable'), ResourceConflict()]
+
+        def flaky_save(doc):
+            if errors:
+                raise errors.pop(0)
+            save(doc)
+
+        db.save = flaky_save
+        self.assertEqual(lease_monitoring_indexes(db, 'monitoringID', '2018-01-01', backoff=0), 1)
+        self.assertEqual(db.docs['monitoringID']['2018-01-01'], 2)
+
+    def test_counter_round_trips_do_not_grow_with_workers(self):
+        for workers in (1, 8):
+            db = CounterDatabase(latency=0.001)
+            self.generate(db, MonitoringIdAllocator(block_size=100), workers, 200 // workers)
+            self.assertEqual((db.gets, db.saves), (2, 2))
+
+
+class MonitoringCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = MonitoringCache(size=2)
+        self.current_rev = mock.Mock(return_value='1-a')
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.get('a', self.current_rev))
+        self.current_rev.assert_not_called()
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_hit(self):
+        doc = {'_id': 'a', '_rev': '1-a'}
+        self.cache.put(doc)
+        self.assertIs(self.cache.get('a', self.current_rev), doc)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_outdated(self):
+        self.cache.put({'_id': 'a', '_rev': '1-a'})
+        self.current_rev.return_value = '2-b'
+        self.assertIsNone(self.cache.get('a', self.current_rev))
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_ttl(self):
+        self.cache.ttl = 60
+        self.cache.put({'_id': 'a', '_rev': '1-a'})
+        self.current_rev.return_value = '2-b'
+        self.assertIsNotNone(self.cache.get('a', self.current_rev))
+        self.current_rev.assert_not_called()
+
+    def test_ttl_checked(self):
+        self.cache.ttl = 60
+        self.cache.put({'_id': 'a', '_rev': '1-a'})
+        self.current_rev.return_value = '2-b'
+        self.assertIsNone(self.cache.get('a', self.current_rev, check=True))
+        self.current_rev.assert_called_once_with()
+
+    def test_least_recently_used_evicted(self):
+        for doc_id in ('a', 'b'):
+            self.cache.put({'_id': doc_id, '_rev': '1-a'})
+        self.cache.get('a', self.current_rev)
+        self.cache.put({'_id': 'c', '_rev': '1-a'})
+        self.assertEqual(list(self.cache.docs), ['a', 'c'])
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_invalidate(self):
+        self.cache.put({'_id': 'a', '_rev': '1-a'})
+        self.cache.invalidate('a')
+        self.assertIsNone(self.cache.get('a', self.current_rev))
+
+    def test_disabled(self):
+        cache = MonitoringCache()
+        cache.put({'_id': 'a', '_rev': '1-a'})
+        self.assertEqual(cache.stats()['size'], 0)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.failure()
+        self.breaker.success()
+        self.breaker.failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.failure()
+        self.assertFalse(self.breaker.closed)
+        self.assertFalse(self.breaker.allow())
+
+    def test_single_trial_after_reset_timeout(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        self.breaker.opened -= 60
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.success()
+        self.assertTrue(self.breaker.closed)
+
+    def test_failed_trial_reopens(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        self.breaker.opened -= 60
+        self.breaker.allow()
+        self.breaker.failure()
+        self.assertFalse(self.breaker.allow())
+
+    def test_released_trial(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        self.breaker.opened -= 60
+        self.breaker.allow()
+        self.breaker.release()
+        self.assertFalse(self.breaker.closed)
+        self.assertTrue(self.breaker.allow())
+
+    def test_disabled(self):
+        breaker = CircuitBreaker()
+        for _ in range(100):
+            breaker.failure()
+        self.assertTrue(breaker.allow())
+
+
+class TenderCredentialsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = TendersServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.server.add_tender('a' * 32, 'tender_token')
+        self.credentials = TenderCredentials(
+            '111111', self.server.url, '2.0', timeout=0.5, size=2, ttl=60, negative_ttl=60,
+            breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+
+    def test_token_hash(self):
+        self.assertEqual(self.credentials.get('a' * 32), self.server.tenders['a' * 32])
+        self.assertEqual(self.server.upstream_requests(), [('GET', '/api/2.0/tenders/{}/extract_credentials'.format('a' * 32))])
+
+    def test_cached(self):
+        self.credentials.get('a' * 32)
+        self.credentials.get('a' * 32)
+        self.assertEqual(len(self.server.upstream_requests()), 1)
+        stats = self.credentials.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 1, 0.5))
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['latency_max'], 0)
+
+    def test_expired(self):
+        self.credentials.get('a' * 32)
+        self.credentials.entries['a' * 32] = (self.server.tenders['a' * 32], 0)
+        self.credentials.get('a' * 32)
+        self.assertEqual(len(self.server.upstream_requests()), 2)
+
+    def test_not_found_cached(self):
+        self.assertIsNone(self.credentials.get('b' * 32))
+        self.assertIsNone(self.credentials.get('b' * 32))
+        self.assertEqual(len(self.server.upstream_requests()), 1)
+        self.assertTrue(self.credentials.breaker.closed)
+
+    def test_not_found_not_cached(self):
+        self.credentials.negative_ttl = 0
+        self.credentials.get('b' * 32)
+        self.server.add_tender('b' * 32, 'tender_token')
+        self.assertIsNotNone(self.credentials.get('b' * 32))
+
+    def test_least_recently_used_evicted(self):
+        for tender_id in ('a' * 32, 'b' * 32, 'a' * 32, 'c' * 32):
+            self.credentials.get(tender_id)
+        self.assertEqual(list(self.credentials.entries), ['a' * 32, 'c' * 32])
+        self.assertEqual(self.credentials.stats()['evictions'], 1)
+
+    def test_upstream_error(self):
+        self.server.status = '502 Bad Gateway'
+        with self.assertRaises(TendersAPIUnavailable):
+            self.credentials.get('a' * 32)
+        self.assertEqual(self.credentials.stats()['size'], 0)
+        self.assertEqual(self.credentials.stats()['failures'], 1)
+
+    def test_malformed_response(self):
+        self.server.status = '200 OK'
+        with self.assertRaises(TendersAPIUnavailable):
+            self.credentials.get('a' * 32)
+        self.assertEqual(self.credentials.stats()['failures'], 1)
+        self.assertEqual(self.credentials.breaker.failures, 1)
+
+    def test_not_found_trial_keeps_circuit_open(self):
+        self.server.status = '500 Internal Server Error'
+        for _ in range(2):
+            with self.assertRaises(TendersAPIUnavailable):
+                self.credentials.get('a' * 32)
+        self.server.status = None
+        self.credentials.breaker.opened -= 60
+        self.assertIsNone(self.credentials.get('b' * 32))
+        self.assertEqual(self.credentials.stats()['circuit'], 'open')
+        self.assertIsNotNone(self.credentials.get('a' * 32))
+        self.assertEqual(self.credentials.stats()['circuit'], 'closed')
+
+    def test_timeout(self):
+        self.server.delay = 1
+        with self.assertRaises(TendersAPIUnavailable):
+            self.credentials.get('a' * 32)
+
+    def test_circuit_open(self):
+        self.server.status = '500 Internal Server Error'
+        for _ in range(2):
+            with self.assertRaises(TendersAPIUnavailable):
+                self.credentials.get('a' * 32)
+        self.server.status = None
+        with self.assertRaises(TendersAPIUnavailable):
+            self.credentials.get('a' * 32)
+        self.assertEqual(len(self.server.upstream_requests()), 2)
+        self.assertEqual(self.credentials.stats()['rejections'], 1)
+        self.assertEqual(self.credentials.stats()['circuit'], 'open')
+
+        self.credentials.breaker.opened -= 60
+        self.assertIsNotNone(self.credentials.get('a' * 32))
+        self.assertEqual(self.credentials.stats()['circuit'], 'closed')
+
+    def test_concurrent_lookups_share_call(self):
+        with mock.patch.object(TenderCredentials, 'fetch', autospec=True) as fetch:
+            fetch.side_effect = lambda credentials, tender_id: sleep(0.1) or 'hash'
+            greenlets = [spawn(self.credentials.get, 'a' * 32) for _ in range(5)]
+            joinall(greenlets)
+        self.assertEqual([i.value for i in greenlets], ['hash'] * 5)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_concurrent_lookups_share_failure(self):
+        with mock.patch.object(TenderCredentials, 'fetch', autospec=True) as fetch:
+            fetch.side_effect = lambda credentials, tender_id: sleep(0.1) or {}['data']
+            greenlets = [spawn(self.credentials.get, 'a' * 32) for _ in range(2)]
+            joinall(greenlets, timeout=1)
+        self.assertTrue(all(i.ready() for i in greenlets))
+        self.assertEqual([type(i.exception) for i in greenlets], [KeyError] * 2)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(self.credentials.pending, {})
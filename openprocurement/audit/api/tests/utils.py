@@ -1,3 +1,11 @@
+import json
+import re
+from hashlib import sha512
+from threading import Thread
+from time import sleep
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+
 def get_errors_field_names(response, text=None):
     for error in response.json.get('errors', []):
         if text:
@@ -14,3 +22,57 @@ def get_errors_field_names(response, text=None):
 
         else:
             yield (error['location'], error['name'])
+
+
+class TendersServer(object):
+    """
+    Local stand-in for the tenders API serving extract_credentials of the tenders it knows
+    on a random port in a background thread; status and delay of its responses can be set
+    """
+
+    def __init__(self, api_version='2.0'):
+        self.prefix = '/api/{}'.format(api_version)
+        self.tenders = {}
+        self.status = None
+        self.delay = 0
+        self.requests = []
+        self.server = make_server('127.0.0.1', 0, self.app, handler_class=QuietHandler)
+        self.url = 'http://127.0.0.1:{}'.format(self.server.server_port)
+        self.thread = Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_tender(self, tender_id, tender_token):
+        self.tenders[tender_id] = sha512(tender_token).hexdigest()
+
+    def app(self, environ, start_response):
+        path = environ['PATH_INFO']
+        self.requests.append((environ['REQUEST_METHOD'], path))
+        sleep(self.delay)
+        match = re.match(r'^{}/tenders/(\w+)/extract_credentials$'.format(re.escape(self.prefix)), path)
+        if self.status:
+            status, body = self.status, {'status': 'error'}
+        elif path == '{}/spore'.format(self.prefix):
+            status, body = '200 OK', {}
+        elif match and match.group(1) in self.tenders:
+            status, body = '200 OK', {'data': {'id': match.group(1), 'tender_token': self.tenders[match.group(1)]}}
+        else:
+            status, body = '404 Not Found', {'status': 'error', 'errors': [{'description': 'Not Found'}]}
+        start_response(status, [('Content-Type', 'application/json')])
+        return [json.dumps(body)]
+
+    def upstream_requests(self):
+        return [i for i in self.requests if i[1].endswith('/extract_credentials')]
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
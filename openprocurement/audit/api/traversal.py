@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+from pyramid.httpexceptions import HTTPNotModified
 from pyramid.security import (
     Allow,
     Everyone,
 )
 
+from openprocurement.audit.api.models import Monitoring, plain_data
+from openprocurement.audit.api.raw import RawItem
+
 
 class Root(object):
     __name__ = None
@@ -29,10 +33,29 @@ class Root(object):
         self.db = request.registry.db
 
 
+def versions_index(parent, plural):
+    """
+    Items of a plural field of a monitoring or its part (a model or a RawItem) by id,
+    with all versions of an id in the order they were added.
+    Built once for the parent and shared by traversal and views,
+    appending an item or replacing the list rebuilds it: the index keeps the list it was built from,
+    so another list can't be taken for it.
+    """
+    source = parent.data.get(plural) if isinstance(parent, RawItem) else getattr(parent, plural, None)
+    indexes = vars(parent).setdefault('_versions_index', {})
+    built_from, size, index = indexes.get(plural, (None, None, None))
+    if index is None or built_from is not source or size != len(source or ()):
+        index = {}
+        for item in getattr(parent, plural, None) or []:
+            index.setdefault(item.id, []).append(item)
+        indexes[plural] = (source, len(source or ()), index)
+    return index
+
+
 def get_item(parent, key, request):
     request.validated['{}_id'.format(key)] = request.matchdict['{}_id'.format(key)]
     plural = '{}ies'.format(key[0:-1]) if key[-1] == 'y' else '{}s'.format(key)
-    items = [i for i in getattr(parent, plural, []) if i.id == request.matchdict['{}_id'.format(key)]]
+    items = versions_index(parent, plural).get(request.matchdict['{}_id'.format(key)])
     if not items:
         from openprocurement.api.utils import error_handler
         request.errors.add('url', '{}_id'.format(key), 'Not Found')
@@ -48,16 +71,42 @@ def get_item(parent, key, request):
         return item
 
 
+def read_only(request):
+    """
+    Read requests are served from the raw document without a model, see openprocurement.audit.api.raw
+    """
+    return request.method == 'GET' and not request.params.get('download')
+
+
+def monitoring_etag(request, rev):
+    """
+    Entity tag of the representations of a monitoring revision,
+    the role is a part of it as it changes what is visible
+    """
+    return '{}/{}'.format(rev, request.authenticated_role)
+
+
 def factory(request):
     request.validated['monitoring_src'] = {}
     root = Root(request)
     if not request.matchdict or not request.matchdict.get('monitoring_id'):
         return root
     request.validated['monitoring_id'] = request.matchdict['monitoring_id']
-    request.monitoring.__parent__ = root
-    request.validated['monitoring'] = request.validated['db_doc'] = request.monitoring
+    if read_only(request):
+        if request.headers.get('If-None-Match') and request.monitoring_rev:
+            not_modified = HTTPNotModified()
+            not_modified.etag = monitoring_etag(request, request.monitoring_rev)
+            if not_modified.etag in request.if_none_match:
+                raise not_modified
+        monitoring = RawItem(Monitoring, request.monitoring_doc, request, root)
+        request.response.etag = monitoring_etag(request, monitoring.rev)
+    else:
+        monitoring = request.monitoring
+        monitoring.__parent__ = root
+    request.validated['monitoring'] = request.validated['db_doc'] = monitoring
     if request.method != 'GET':
-        request.validated['monitoring_src'] = request.monitoring.serialize('plain')
+        # a shallow copy of the raw document is enough, as neither the model nor patches modify it
+        request.validated['monitoring_src'] = plain_data(request.validated['monitoring_doc'])
     if 'decision' in request.path.split('/'):
         return decision_factory(request)
     if 'cancellation' in request.path.split('/'):
@@ -73,52 +122,58 @@ def factory(request):
     elif request.matchdict.get('post_id'):
         return post_factory(request)
     elif request.matchdict.get('party_id'):
-        return get_item(request.monitoring, 'party', request)
+        return get_item(monitoring, 'party', request)
     elif request.matchdict.get('document_id'):
-        return get_item(request.monitoring, 'document', request)
-    return request.monitoring
+        return get_item(monitoring, 'document', request)
+    return monitoring
 
 
 def appeal_factory(request):
-    if request.monitoring.appeal:
+    monitoring = request.validated['monitoring']
+    if monitoring.appeal:
         if request.matchdict.get('document_id'):
-            return get_item(request.monitoring.appeal, 'document', request)
-        return request.monitoring.appeal
-    return request.monitoring
+            return get_item(monitoring.appeal, 'document', request)
+        return monitoring.appeal
+    return monitoring
 
 
 def elimination_factory(request):
+    monitoring = request.validated['monitoring']
     if request.matchdict.get('document_id'):
-        return get_item(request.monitoring.eliminationReport, 'document', request)
+        return get_item(monitoring.eliminationReport, 'document', request)
     if request.method == "PUT":
-        return request.monitoring
+        return monitoring
     else:
-        return request.monitoring.eliminationReport
+        return monitoring.eliminationReport
 
 def elimination_resolution_factory(request):
+    monitoring = request.validated['monitoring']
     if request.matchdict.get('document_id'):
-        return get_item(request.monitoring.eliminationResolution, 'document', request)
-    return request.monitoring.eliminationResolution
+        return get_item(monitoring.eliminationResolution, 'document', request)
+    return monitoring.eliminationResolution
 
 def post_factory(request):
-    post = get_item(request.monitoring, 'post', request)
+    post = get_item(request.validated['monitoring'], 'post', request)
     if request.matchdict.get('document_id'):
         return get_item(post, 'document', request)
     return post
 
 
 def decision_factory(request):
+    monitoring = request.validated['monitoring']
     if request.matchdict.get('document_id'):
-        return get_item(request.monitoring.decision, 'document', request)
-    return request.monitoring.decision
+        return get_item(monitoring.decision, 'document', request)
+    return monitoring.decision
 
 def cancellation_factory(request):
+    monitoring = request.validated['monitoring']
     if request.matchdict.get('document_id'):
-        return get_item(request.monitoring.cancellation, 'document', request)
-    return request.monitoring.cancellation
+        return get_item(monitoring.cancellation, 'document', request)
+    return monitoring.cancellation
 
 
 def conclusion_factory(request):
+    monitoring = request.validated['monitoring']
     if request.matchdict.get('document_id'):
-        return get_item(request.monitoring.conclusion, 'document', request)
-    return request.monitoring.conclusion
+        return get_item(monitoring.conclusion, 'document', request)
+    return monitoring.conclusion
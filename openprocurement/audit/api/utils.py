@@ -1,31 +1,67 @@
-from couchdb import ResourceConflict
+from base64 import b64decode
+from collections import OrderedDict
+from copy import copy
+from couchdb import ResourceConflict, ResourceNotFound
 from datetime import timedelta
+from random import random
+from time import time
 from gevent import sleep
+from gevent.event import AsyncResult
+from gevent.lock import Semaphore
+from gevent.pool import Pool
+from gevent.threadpool import ThreadPool
+from socket import error as SocketError
 from openprocurement.api.constants import TZ, WORKING_DAYS
 
-from openprocurement.audit.api.traversal import factory
+from openprocurement.audit.api.traversal import factory, read_only
 from functools import partial
-from cornice.resource import resource
+from cornice.resource import resource, view
+from openprocurement.tender.core import utils as tender_core_utils
 from openprocurement.tender.core.utils import calculate_business_date as calculate_business_date_base
 from schematics.exceptions import ModelValidationError
-from openprocurement.api.models import Revision, Period
+from schematics.types import StringType, FloatType, BooleanType
+from openprocurement.api.models import Revision, Period, IsoDateTimeType, ListType
 from openprocurement.api.utils import (
     update_logging_context, context_unpack, get_revision_changes,
     apply_data_patch, error_handler, generate_id, get_now,
-    check_document, update_document_url
+    check_document, update_document_url, upload_file
 )
-from openprocurement.audit.api.models import Monitoring
+from openprocurement.audit.api.codec import JSON_RENDERER
+from openprocurement.audit.api.constants import (
+    DOCUMENT_UPLOAD_CONCURRENCY,
+    MONITORING_ID_LEASE_ATTEMPTS,
+    MONITORING_ID_LEASE_BACKOFF,
+)
+from openprocurement.audit.api.business_calendar import get_business_calendar, is_non_working_day
+from openprocurement.audit.api.models import Monitoring, plain_data
+from openprocurement_client.client import TendersClient
+from pyramid.httpexceptions import HTTPError
+from restkit.conn import Connection
+from restkit.errors import ResourceError, RequestError, RequestTimeout
+from socketpool import ConnectionPool
 from pkg_resources import get_distribution
 from logging import getLogger
 from re import compile
+from urllib import unquote
+from urlparse import urlparse, parse_qsl
 
 PKG = get_distribution(__package__)
 LOGGER = getLogger(PKG.project_name)
 
 op_resource = partial(resource, error_handler=error_handler, factory=factory)
+json_view = partial(view, renderer=JSON_RENDERER)
 
 ACCELERATOR_RE = compile(r'accelerator=(?P<accelerator>\d+)')
 
+# monitoring fields stored in couchdb exactly as they are exported
+RAW_FIELD_TYPES = (StringType, FloatType, BooleanType, IsoDateTimeType)
+RAW_FIELDS = frozenset(
+    name for name, field in Monitoring.fields.items()
+    if isinstance(field, RAW_FIELD_TYPES) or isinstance(field, ListType) and isinstance(field.field, RAW_FIELD_TYPES)
+)
+# serializables that are visible only to sas until published
+PUBLISHED_FIELDS = ('decision', 'conclusion', 'cancellation')
+
 
 class APIResource(object):
 
@@ -40,28 +76,75 @@ class APIResource(object):
 
 
 def monitoring_serialize(request, monitoring_data, fields):
-    monitoring = request.monitoring_from_data(monitoring_data)
-    monitoring.__parent__ = request.context
-    return {i: j for i, j in monitoring.serialize('view').items() if i in fields}
+    """
+    Project a raw monitoring document onto its 'view' representation limited to fields.
+    Plain values are copied from the document as they are stored in their exported form,
+    a Monitoring model is built only from the requested nested fields, if any.
+    """
+    view_role = Monitoring._options.roles['view']
+    data = {}
+    model_fields = set()
+    for name in fields:
+        value = monitoring_data.get(name)
+        if name == 'id':
+            data[name] = monitoring_data['_id']
+        elif name in PUBLISHED_FIELDS:
+            if value and (value.get('datePublished') or request.authenticated_role == 'sas'):
+                model_fields.add(name)
+        elif name not in Monitoring.fields or view_role(name, value):
+            continue
+        elif name in RAW_FIELDS and value not in (None, [], {}):
+            data[name] = value
+        else:
+            model_fields.add(name)
+
+    if model_fields:
+        # status defines document urls, so it's kept for nested documents
+        model_data = {i: j for i, j in monitoring_data.items() if i in model_fields or i in ('_id', 'status')}
+        monitoring = request.monitoring_from_data(model_data)
+        monitoring.__parent__ = request.context
+        data.update((i, j) for i, j in monitoring.serialize('view').items() if i in model_fields)
+    return data
+
+
+def prepare_monitoring(request, monitoring, src, date_modified=None):
+    """
+    Validate and export a monitoring to be stored.
+    The export is both diffed against the raw document the request has started from
+    (see traversal.factory) and stored as is, so the monitoring is exported once.
+    :return: the export, or None if nothing has changed, and the revisions to store along
+    """
+    # revisions are kept in documents of their own, the ones already in the monitoring are moved out too
+    revisions, monitoring.revisions = monitoring.revisions, []
+    monitoring.validate()
+    data = monitoring.to_primitive()
+    patch = get_revision_changes(src, plain_data(data))
+    if not patch:
+        return None, revisions
+    revisions.append(create_revision(request, monitoring, patch))
+    monitoring.dateModified = date_modified or get_now()
+    data['dateModified'] = Monitoring.fields['dateModified'].to_primitive(monitoring.dateModified)
+    return data, revisions
 
 
 def save_monitoring(request, date_modified=None):
     monitoring = request.validated['monitoring']
-    patch = get_revision_changes(request.validated['monitoring_src'], monitoring.serialize('plain'))
-    if patch:
-        add_revision(request, monitoring, patch)
-
-        old_date_modified = monitoring.dateModified
-        monitoring.dateModified = date_modified or get_now()
+    old_date_modified = monitoring.dateModified
+    try:
+        data, revisions = prepare_monitoring(request, monitoring, request.validated['monitoring_src'], date_modified)
+    except ModelValidationError, e:  # pragma: no cover
+        for i in e.message:
+            request.errors.add('body', i, e.message[i])
+        request.errors.status = 422
+        return
+    if data is not None:
         try:
-            monitoring.store(request.registry.db)
-        except ModelValidationError, e:  # pragma: no cover
-            for i in e.message:
-                request.errors.add('body', i, e.message[i])
-            request.errors.status = 422
+            monitoring._id, monitoring._rev = request.registry.db.save(data)
         except Exception, e:  # pragma: no cover
             request.errors.add('body', 'data', str(e))
         else:
+            request.registry.monitoring_cache.invalidate(monitoring.id)
+            store_revisions(request.registry.db, monitoring.id, revisions)
             LOGGER.info(
                 'Saved monitoring {}: dateModified {} -> {}'.format(
                     monitoring.id,
@@ -73,6 +156,39 @@ def save_monitoring(request, date_modified=None):
             return True
 
 
+def save_monitorings(request, monitorings):
+    """
+    Store new monitorings with a single bulk request and their revisions with another one
+    :return: errors of the monitorings in their order, None for the stored ones
+    """
+    db = request.registry.db
+    errors = [None] * len(monitorings)
+    prepared = []
+    for index, monitoring in enumerate(monitorings):
+        try:
+            data, revisions = prepare_monitoring(request, monitoring, {}, monitoring.dateCreated)
+        except ModelValidationError, e:  # pragma: no cover
+            errors[index] = [{'location': 'body', 'name': i, 'description': j} for i, j in e.message.items()]
+        else:
+            prepared.append((index, data, revisions))
+
+    docs = []
+    results = db.update([data for _, data, _ in prepared])
+    for (index, data, revisions), (success, doc_id, rev) in zip(prepared, results):
+        if success:
+            monitorings[index]._rev = rev
+            docs.extend(revision_docs(doc_id, revisions))
+        else:
+            errors[index] = [{'location': 'body', 'name': 'data', 'description': str(rev)}]
+    if docs:
+        store_revision_docs(db, docs)
+    LOGGER.info(
+        'Saved {} of {} monitorings'.format(errors.count(None), len(monitorings)),
+        extra=context_unpack(request, {'MESSAGE_ID': 'save_monitorings'})
+    )
+    return errors
+
+
 def apply_patch(request, data=None, save=True, src=None, date_modified=None):
     data = request.validated['data'] if data is None else data
     patch = data and apply_data_patch(src or request.context.serialize(), data)
@@ -82,13 +198,72 @@ def apply_patch(request, data=None, save=True, src=None, date_modified=None):
             return save_monitoring(request, date_modified=date_modified)
 
 
-def add_revision(request, item, changes):
+def create_revision(request, item, changes):
     revision_data = {
         'author': request.authenticated_userid,
         'changes': changes,
         'rev': item.rev
     }
-    item.revisions.append(Revision(revision_data))
+    return Revision(revision_data)
+
+
+def revision_doc_id(monitoring_id, rev):
+    """
+    Revision documents are keyed by a revision- prefix, the monitoring id and the number of the monitoring rev
+    they were applied to, so they are listed in order by an _all_docs key range and sort apart from monitorings
+    """
+    return '{}{:06}'.format(revision_doc_prefix(monitoring_id), int(rev.split('-')[0]) if rev else 0)
+
+
+def revision_doc_prefix(monitoring_id):
+    return 'revision-{}-'.format(monitoring_id)
+
+
+def revision_docs(monitoring_id, revisions):
+    return [
+        dict(
+            revision.serialize(),
+            _id=revision_doc_id(monitoring_id, revision.rev),
+            doc_type='MonitoringRevision',
+            monitoring_id=monitoring_id,
+        )
+        for revision in revisions
+    ]
+
+
+def store_revisions(db, monitoring_id, revisions):
+    """
+    Append revisions to the revision log of the monitoring,
+    the ones that are already there are reported as conflicts and left as they are
+    :return: True if every revision is in the log
+    """
+    return store_revision_docs(db, revision_docs(monitoring_id, revisions))
+
+
+def store_revision_docs(db, docs):
+    """
+    Store revision documents of monitorings that are already saved,
+    so failures are logged rather than raised
+    :return: True if every revision is stored or was stored before
+    """
+    try:
+        results = db.update(docs)
+    except Exception as e:
+        LOGGER.error('Failed to store {} revisions: {!r}'.format(len(docs), e),
+                     extra={'MESSAGE_ID': 'store_revisions_failed'})
+        return False
+    stored = True
+    for success, doc_id, error in results:
+        if success:
+            continue
+        if isinstance(error, ResourceConflict):
+            LOGGER.warning('Revision {} is already stored'.format(doc_id),
+                           extra={'MESSAGE_ID': 'store_revisions_conflict'})
+        else:
+            stored = False
+            LOGGER.error('Failed to store revision {}: {!r}'.format(doc_id, error),
+                         extra={'MESSAGE_ID': 'store_revisions_failed'})
+    return stored
 
 
 def set_logging_context(event):
@@ -104,14 +279,29 @@ def monitoring_from_data(request, data):
     return Monitoring(data)
 
 
-def extract_monitoring_adapter(request, monitoring_id):
-    db = request.registry.db
-    doc = db.get(monitoring_id)
+def get_monitoring_doc(request, monitoring_id):
+    cache = request.registry.monitoring_cache
+    doc = None
+    if cache.size:
+        # a write is applied to the current revision, or the save conflicts with the writes of other workers
+        doc = cache.get(monitoring_id, partial(current_monitoring_rev, request, monitoring_id),
+                        check=not read_only(request))
+        update_logging_context(request, {'MONITOR_CACHE': 'hit' if doc else 'miss'})
+    if doc is None:
+        doc = request.registry.db.get(monitoring_id)
+        if doc is not None and doc.get('doc_type') == 'Monitoring':
+            cache.put(doc)
     if doc is None or doc.get('doc_type') != 'Monitoring':
         request.errors.add('url', 'monitoring_id', 'Not Found')
         request.errors.status = 404
         raise error_handler(request.errors)
+    return doc
+
 
+def extract_monitoring_adapter(request, monitoring_id):
+    doc = get_monitoring_doc(request, monitoring_id)
+    # write requests diff the monitoring against the document it was read from
+    request.validated['monitoring_doc'] = doc
     return request.monitoring_from_data(doc)
 
 
@@ -120,7 +310,34 @@ def extract_monitoring(request):
     return extract_monitoring_adapter(request, monitoring_id) if monitoring_id else None
 
 
-def generate_monitoring_id(ctime, db, server_id=''):
+def extract_monitoring_doc(request):
+    monitoring_id = request.matchdict.get('monitoring_id')
+    return get_monitoring_doc(request, monitoring_id) if monitoring_id else None
+
+
+def get_monitoring_rev(request, monitoring_id):
+    """
+    Current revision of a monitoring document, looked up with a HEAD request without loading the body
+    """
+    try:
+        _, headers, _ = request.registry.db.resource.head(monitoring_id)
+    except ResourceNotFound:
+        return None
+    return headers.get('etag', '').strip('"') or None
+
+
+def current_monitoring_rev(request, monitoring_id):
+    if monitoring_id == request.matchdict.get('monitoring_id'):
+        return request.monitoring_rev
+    return get_monitoring_rev(request, monitoring_id)
+
+
+def extract_monitoring_rev(request):
+    monitoring_id = request.matchdict.get('monitoring_id')
+    return get_monitoring_rev(request, monitoring_id) if monitoring_id else None
+
+
+def generate_monitoring_id(ctime, db, server_id='', allocator=None):
     """ Generate ID for new monitoring in format "UA-M-YYYY-MM-DD-NNNNNN" + ["-server_id"]
         YYYY - year, MM - month (start with 1), DD - day, NNNNNN - sequence number per 1 day
         and save monitorings count per day in database document with _id = "monitoringID" 
@@ -128,24 +345,384 @@ def generate_monitoring_id(ctime, db, server_id=''):
     :param ctime: system date-time
     :param db: couchdb database object
     :param server_id: server mark (for claster mode)
+    :param allocator: MonitoringIdAllocator to take the sequence number from, if not set it's leased directly
     :return: planID in "UA-M-2015-05-08-000005"
     """
+    return generate_monitoring_ids(ctime, db, 1, server_id, allocator)[0]
+
+
+def generate_monitoring_ids(ctime, db, count, server_id='', allocator=None):
+    """ Generate count IDs for new monitorings as generate_monitoring_id does,
+        their sequence numbers are reserved at once
+    """
     key = ctime.date().isoformat()
     monitoring_id_doc = 'monitoringID_' + server_id if server_id else 'monitoringID'
-    while True:
+    if allocator is None:
+        index = lease_monitoring_indexes(db, monitoring_id_doc, key, count)
+    else:
+        index = allocator.allocate(db, monitoring_id_doc, key, count)
+    return [
+        'UA-M-{:04}-{:02}-{:02}-{:06}{}'.format(
+            ctime.year, ctime.month, ctime.day, i, server_id and '-' + server_id)
+        for i in range(index, index + count)
+    ]
+
+
+class MonitoringIdUnavailable(Exception):
+    pass
+
+
+def lease_monitoring_indexes(db, monitoring_id_doc, key, count=1,
+                             attempts=MONITORING_ID_LEASE_ATTEMPTS, backoff=MONITORING_ID_LEASE_BACKOFF):
+    """ Reserve count sequence numbers of the day key in the counter document,
+        a conflicting or failed attempt is retried after a random delay of up to backoff seconds,
+        doubled after every attempt up to a second
+    :return: the first reserved sequence number
+    :raises MonitoringIdUnavailable: if none of the attempts succeeded
+    """
+    error = None
+    for attempt in range(attempts):
+        if attempt:
+            sleep(random() * min(backoff * 2 ** (attempt - 1), 1))
         try:
             monitoring_id = db.get(monitoring_id_doc, {'_id': monitoring_id_doc})
             index = monitoring_id.get(key, 1)
-            monitoring_id[key] = index + 1
+            monitoring_id[key] = index + count
             db.save(monitoring_id)
-        except ResourceConflict:  # pragma: no cover
-            pass
-        except Exception:  # pragma: no cover
-            sleep(1)
+        except Exception as e:
+            error = e
+        else:
+            return index
+    LOGGER.error('Failed to lease monitoring sequence numbers from {}: {!r}'.format(monitoring_id_doc, error),
+                 extra={'MESSAGE_ID': 'monitoring_id_lease_failed'})
+    raise MonitoringIdUnavailable(error)
+
+
+class MonitoringIdAllocator(object):
+    """
+    Hands out monitoring sequence numbers from blocks leased from the counter document,
+    so concurrent monitoring creation doesn't write (and conflict on) the counter every time.
+    Numbers of a block that is not used up before restart, the day end
+    or a request for more numbers than there are left in it are skipped.
+    """
+
+    def __init__(self, block_size=1):
+        self.block_size = block_size
+        self.blocks = {}
+        self.lock = Semaphore()
+
+    def allocate(self, db, monitoring_id_doc, key, count=1):
+        with self.lock:
+            block_key, index, end = self.blocks.get((db.name, monitoring_id_doc), (None, 0, 0))
+            if block_key != key or index + count > end:
+                block_size = max(count, self.block_size)
+                index = lease_monitoring_indexes(db, monitoring_id_doc, key, block_size)
+                end = index + block_size
+            self.blocks[(db.name, monitoring_id_doc)] = (key, index + count, end)
+            return index
+
+
+class MonitoringCache(object):
+    """
+    Bounded LRU of raw monitoring documents of a worker.
+    A document is served while its _rev is the current one in couchdb,
+    the check is skipped for ttl seconds after the previous one, unless check is set.
+    Documents are shared by requests, so they are never modified.
+    """
+
+    def __init__(self, size=0, ttl=0):
+        self.size = size
+        self.ttl = ttl
+        self.docs = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, doc_id, current_rev, check=False):
+        entry = self.docs.pop(doc_id, None)
+        if entry is not None:
+            doc, checked = entry
+            if not check and time() - checked < self.ttl:
+                self.docs[doc_id] = entry
+                self.hits += 1
+                return doc
+            if doc['_rev'] == current_rev():
+                self.docs[doc_id] = (doc, time())
+                self.hits += 1
+                return doc
+        self.misses += 1
+
+    def put(self, doc):
+        if self.size:
+            self.docs.pop(doc['_id'], None)
+            self.docs[doc['_id']] = (doc, time())
+            while len(self.docs) > self.size:
+                self.docs.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, doc_id):
+        self.docs.pop(doc_id, None)
+
+    def stats(self):
+        return {
+            'size': len(self.docs),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class CircuitBreaker(object):
+    """
+    Fails calls to an upstream service fast for reset_timeout seconds
+    after failure_threshold consecutive failures, then lets a single trial call through.
+    A zero failure_threshold never opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=0, reset_timeout=0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = None
+        self.trial = False
+
+    @property
+    def closed(self):
+        return self.opened is None
+
+    def allow(self):
+        if self.opened is None:
+            return True
+        if not self.trial and time() - self.opened >= self.reset_timeout:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self.failures = 0
+        self.opened = None
+        self.trial = False
+
+    def release(self):
+        # a call that tells nothing about the upstream health lets another trial through
+        self.trial = False
+
+    def failure(self):
+        self.failures += 1
+        self.trial = False
+        if self.failure_threshold and self.failures >= self.failure_threshold:
+            self.opened = time()
+
+
+class TendersAPIUnavailable(Exception):
+    pass
+
+
+class TenderCredentials(object):
+    """
+    sha512 hashes of tender_token of tenders, extracted from the tenders API
+    with a connection-pooled client shared by the requests of a worker.
+    Hashes are cached for ttl seconds and unknown tenders for negative_ttl seconds
+    in a bounded LRU, concurrent lookups of a tender share a single API call.
+    """
+
+    def __init__(self, api_token, api_server, api_version, timeout=None, pool_size=10,
+                 size=0, ttl=0, negative_ttl=0, breaker=None):
+        self.api_token = api_token
+        self.api_server = api_server
+        self.api_version = api_version
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.size = size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.breaker = breaker or CircuitBreaker()
+        self._client = None
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.hits = self.misses = self.evictions = 0
+        self.requests = self.failures = self.rejections = 0
+        self.latency = self.max_latency = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = TendersClient(
+                self.api_token,
+                host_url=self.api_server,
+                api_version=self.api_version,
+                pool=ConnectionPool(factory=Connection, max_size=self.pool_size),
+                timeout=self.timeout,
+                max_tries=1,
+            )
+        return self._client
+
+    def get(self, tender_id):
+        """
+        tender_token hash of a tender, None if there is no such tender
+        """
+        entry = self.entries.pop(tender_id, None)
+        if entry is not None and time() < entry[1]:
+            self.entries[tender_id] = entry
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        if tender_id in self.pending:
+            return self.pending[tender_id].get()
+        pending = self.pending[tender_id] = AsyncResult()
+        try:
+            token_hash = self.fetch(tender_id)
+        except Exception as e:
+            # the lookups waiting for the call fail with it as well
+            pending.set_exception(e)
+            raise
+        finally:
+            del self.pending[tender_id]
+        pending.set(token_hash)
+        self.put(tender_id, token_hash)
+        return token_hash
+
+    def fetch(self, tender_id):
+        if not self.breaker.allow():
+            self.rejections += 1
+            raise TendersAPIUnavailable('Circuit to the tenders API is open')
+        self.requests += 1
+        started = time()
+        try:
+            response = self.client.extract_credentials(tender_id)
+            token_hash = response['data']['tender_token']
+        except ResourceError as e:
+            if e.status_int != 404:
+                self.failed(e)
+            self.breaker.release()
+            return None
+        except (RequestError, RequestTimeout, SocketError, ValueError, KeyError, TypeError) as e:
+            # a response without the credentials is as much of a failure as no response
+            self.failed(e)
+        finally:
+            latency = time() - started
+            self.latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        self.breaker.success()
+        return token_hash
+
+    def failed(self, error):
+        self.failures += 1
+        self.breaker.failure()
+        LOGGER.warning('Tenders API call failed: {!r}'.format(error),
+                       extra={'MESSAGE_ID': 'tenders_api_failure'})
+        raise TendersAPIUnavailable(error)
+
+    def put(self, tender_id, token_hash):
+        ttl = self.ttl if token_hash is not None else self.negative_ttl
+        if self.size and ttl:
+            self.entries[tender_id] = (token_hash, time() + ttl)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': float(self.hits) / lookups if lookups else 0.0,
+            'requests': self.requests,
+            'failures': self.failures,
+            'rejections': self.rejections,
+            'latency_avg': self.latency / self.requests if self.requests else 0.0,
+            'latency_max': self.max_latency,
+            'circuit': 'closed' if self.breaker.closed else 'open',
+        }
+
+
+def verify_document_signature(url, document_hash, docservice_url, keyring):
+    """
+    Whether a document url is signed by the docservice for the hash, as check_document verifies it,
+    but without the request, so it is safe to run on another thread
+    """
+    parsed_url = urlparse(url)
+    query = dict(parse_qsl(parsed_url.query))
+    if not docservice_url or not url.startswith(docservice_url) or len(parsed_url.path.split('/')) != 3:
+        return False
+    if set(query) != {'Signature', 'KeyID'} or not document_hash or query['KeyID'] not in keyring:
+        return False
+    try:
+        signature = b64decode(unquote(query['Signature']))
+    except TypeError:
+        return False
+    message = '{}\0{}'.format(parsed_url.path.split('/')[-1], document_hash.split(':', 1)[-1])
+    try:
+        return keyring[query['KeyID']].verify(signature + message.encode('utf-8')) == message
+    except ValueError:
+        return False
+
+
+class DocumentSignatures(object):
+    """
+    Docservice signatures of documents checked by a worker.
+    Documents of a request are verified with verify_document_signature on a bounded pool of pool_size threads,
+    the ed25519 verification releases the GIL, so they are verified in parallel.
+    Documents that fail are checked with check_document in the calling greenlet,
+    so the request gets the errors of the first of them as from a serial check.
+    (url, hash) of the verified documents are kept in a bounded LRU of size entries,
+    so a document sent again, as by a retried request, isn't verified twice.
+    The pool is started on the first use, as worker processes are forked after the application is loaded.
+    """
+
+    def __init__(self, size=0, pool_size=1):
+        self.size = size
+        self.pool_size = pool_size
+        self.verified = OrderedDict()
+        self._pool = None
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPool(self.pool_size)
+        return self._pool
+
+    def check(self, request, documents, key='body'):
+        pending = []
+        for document in documents:
+            entry = (document.url, document.hash)
+            if self.verified.pop(entry, None):
+                self.verified[entry] = True
+                self.hits += 1
+            else:
+                self.misses += 1
+                pending.append(document)
+
+        if self.pool_size > 1 and len(pending) > 1:
+            verify = partial(self.verify, request.registry.docservice_url, request.registry.keyring)
+            verified = self.pool.map(verify, [(i.url, i.hash) for i in pending])
         else:
-            break
-    return 'UA-M-{:04}-{:02}-{:02}-{:06}{}'.format(
-        ctime.year, ctime.month, ctime.day, index, server_id and '-' + server_id)
+            verified = [False] * len(pending)
+        for document, valid in zip(pending, verified):
+            if not valid:
+                check_document(request, document, key)
+
+        if self.size:
+            for document in pending:
+                self.verified[(document.url, document.hash)] = True
+            while len(self.verified) > self.size:
+                self.verified.popitem(last=False)
+                self.evictions += 1
+
+    @staticmethod
+    def verify(docservice_url, keyring, document):
+        url, document_hash = document
+        return verify_document_signature(url, document_hash, docservice_url, keyring)
+
+    def stats(self):
+        return {
+            'size': len(self.verified),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
 
 def generate_period(date, delta, accelerator=None):
     period = Period()
@@ -180,6 +757,12 @@ def get_monitoring_accelerator(context):
 def calculate_business_date(date_obj, timedelta_obj, accelerator=None, working_days=False):
     if accelerator:
         return date_obj + (timedelta_obj / accelerator)
+    if working_days:
+        # the calendar of the working days calculate_business_date_base steps through
+        calendar = get_business_calendar(tender_core_utils.WORKING_DAYS)
+        business_date = calendar.add_working_days(date_obj, timedelta_obj)
+        if business_date is not None:
+            return business_date
     return calculate_business_date_base(date_obj, timedelta_obj, working_days=working_days)
 
 
@@ -203,10 +786,10 @@ def calculate_normalized_business_date(date_obj, timedelta_obj, accelerator=None
 
 
 def is_non_working_date(date_obj):
-    return any([
-        date_obj.weekday() in [5, 6] and WORKING_DAYS.get(date_obj.date().isoformat(), True),
-        WORKING_DAYS.get(date_obj.date().isoformat(), False)
-    ])
+    non_working = get_business_calendar(WORKING_DAYS).is_non_working(date_obj.date())
+    if non_working is None:
+        return bool(is_non_working_day(date_obj.date(), WORKING_DAYS))
+    return non_working
 
 
 def get_access_token(request):
@@ -229,8 +812,60 @@ def get_access_token(request):
     raise ValueError('No access token was provided in request.')
 
 
-def upload_objects_documents(request, obj, key='body'):
-    for document in getattr(obj, 'documents', []):
-        check_document(request, document, key)
-        document_route = request.matched_route.name
+def upload_objects_documents(request, obj, key='body', route_name=None):
+    documents = getattr(obj, 'documents', [])
+    request.registry.document_signatures.check(request, documents, key)
+    document_route = route_name or request.matched_route.name
+    for document in documents:
         update_document_url(request, document, document_route, {})
+
+
+class BatchItemRequest(object):
+    """
+    A request of a batch upload as upload_file sees it for one of the files:
+    validated, errors and the logging context are its own, the rest is read from the request
+    """
+
+    def __init__(self, request, item):
+        self._request = request
+        self.validated = dict(request.validated, file=item)
+        self.errors = copy(request.errors)
+        del self.errors[:]
+        self.logging_context = dict(getattr(request, 'logging_context', {}))
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+def upload_batch(request):
+    """
+    Documents of a batch validated by validate_file_batch_upload as upload_file makes them:
+    docservice documents are checked and get their API urls, multipart files are uploaded
+    to the docservice concurrently or attached to the monitoring one by one, as all of them are attached
+    to the same document, and the errors of the files that fail are reported with their index
+    """
+    if request.content_type == 'application/json':
+        document_route = request.matched_route.name.replace('collection_', '')
+        request.registry.document_signatures.check(request, request.validated['batch'])
+        for document in request.validated['batch']:
+            update_document_url(request, document, document_route, {})
+        return request.validated['batch']
+
+    def upload(item_request):
+        try:
+            return upload_file(item_request)
+        except HTTPError:
+            return None
+
+    item_requests = [BatchItemRequest(request, item) for item in request.validated['batch']]
+    if request.registry.docservice_url:
+        documents = Pool(DOCUMENT_UPLOAD_CONCURRENCY).map(upload, item_requests)
+    else:
+        documents = map(upload, item_requests)
+    if None in documents:
+        for index, item_request in enumerate(item_requests):
+            if item_request.errors:
+                request.errors.extend(dict(error, index=index) for error in item_request.errors)
+                request.errors.status = item_request.errors.status
+        raise error_handler(request.errors)
+    return documents
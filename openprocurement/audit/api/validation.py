@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from hashlib import sha512
-from restkit import ResourceNotFound
+from pyramid.httpexceptions import HTTPError
 
 from openprocurement.api.utils import (
     update_logging_context,
@@ -9,8 +9,7 @@ from openprocurement.api.utils import (
     forbidden,
     get_now,
 )
-from openprocurement.api.validation import validate_data
-from openprocurement_client.client import TendersClient
+from openprocurement.api.validation import validate_data, validate_file_upload
 
 from openprocurement.audit.api.constants import (
     CONCLUSION_OBJECT_TYPE,
@@ -19,8 +18,10 @@ from openprocurement.audit.api.constants import (
     ACTIVE_STATUS,
     ADDRESSED_STATUS,
     DECLINED_STATUS,
+    MONITORING_BATCH_SIZE,
+    DOCUMENT_BATCH_SIZE,
 )
-from openprocurement.audit.api.utils import get_access_token, get_monitoring_role
+from openprocurement.audit.api.utils import get_access_token, get_monitoring_role, TendersAPIUnavailable
 from openprocurement.audit.api.models import Monitoring, EliminationReport, Party, Appeal, Post
 
 
@@ -30,7 +31,107 @@ def validate_monitoring_data(request):
     """
     update_logging_context(request, {'MONITOR_ID': '__new__'})
     data = validate_data(request, Monitoring)
+    _validate_monitoring_status(request)
+    return data
+
+
+def validate_monitoring_batch_data(request):
+    """
+    Validate monitoring data list POST,
+    every item is validated as validate_monitoring_data does and the failed ones are reported by index
+    """
+    update_logging_context(request, {'MONITOR_ID': '__new__'})
+    try:
+        json = request.json_body
+    except ValueError, e:
+        request.errors.add('body', 'data', e.message)
+        request.errors.status = 422
+        raise error_handler(request.errors)
+    items = json.get('data') if isinstance(json, dict) else None
+    if not isinstance(items, list) or not 0 < len(items) <= MONITORING_BATCH_SIZE:
+        request.errors.add('body', 'data', 'Expected a list of 1 to {} monitorings.'.format(MONITORING_BATCH_SIZE))
+        request.errors.status = 422
+        raise error_handler(request.errors)
+
+    monitorings, errors = [], []
+    for index, data in enumerate(items):
+        try:
+            if not isinstance(data, dict):
+                request.errors.add('body', 'data', 'Data not available')
+                request.errors.status = 422
+                raise error_handler(request.errors)
+            validate_data(request, Monitoring, data=data)
+            _validate_monitoring_status(request)
+        except HTTPError:
+            errors.extend(dict(error, index=index) for error in request.errors)
+            del request.errors[:]
+        else:
+            monitorings.append((index, request.validated['monitoring']))
+
+    if not monitorings:
+        request.errors.extend(errors)
+        request.errors.status = 422
+        raise error_handler(request.errors)
+    request.validated['monitorings'] = monitorings
+    request.validated['monitorings_errors'] = errors
+
 
+def validate_file_batch_upload(request):
+    """
+    Validate document upload POST, that is either a single document, as validate_file_upload does,
+    or a batch: a data list of docservice documents or several multipart files.
+    Batch documents are validated all together and none of them is added if any fails.
+    """
+    if request.content_type == 'multipart/form-data':
+        items = request.POST.getall('file')
+        if len(items) < 2:
+            return validate_file_upload(request)
+        update_logging_context(request, {'document_id': '__new__'})
+        if not all(hasattr(i, 'filename') for i in items):
+            request.errors.add('body', 'file', 'Not Found')
+            request.errors.status = 404
+            raise error_handler(request.errors)
+    elif request.registry.docservice_url and request.content_type == 'application/json':
+        try:
+            json = request.json_body
+        except ValueError:
+            json = None
+        items = json.get('data') if isinstance(json, dict) else None
+        if not isinstance(items, list):
+            return validate_file_upload(request)
+        update_logging_context(request, {'document_id': '__new__'})
+    else:
+        return validate_file_upload(request)
+
+    if not 0 < len(items) <= DOCUMENT_BATCH_SIZE:
+        request.errors.add('body', 'data', 'Expected a list of 1 to {} documents.'.format(DOCUMENT_BATCH_SIZE))
+        request.errors.status = 422
+        raise error_handler(request.errors)
+
+    if request.content_type == 'application/json':
+        model = type(request.context).documents.model_class
+        documents, errors = [], []
+        for index, data in enumerate(items):
+            try:
+                if not isinstance(data, dict):
+                    request.errors.add('body', 'data', 'Data not available')
+                    request.errors.status = 422
+                    raise error_handler(request.errors)
+                validate_data(request, model, data=data)
+            except HTTPError:
+                errors.extend(dict(error, index=index) for error in request.errors)
+                del request.errors[:]
+            else:
+                documents.append(request.validated['document'])
+        if errors:
+            request.errors.extend(errors)
+            request.errors.status = 422
+            raise error_handler(request.errors)
+        items = documents
+    request.validated['batch'] = items
+
+
+def _validate_monitoring_status(request):
     monitoring = request.validated['monitoring']
     if monitoring.status != DRAFT_STATUS:
         request.errors.add(
@@ -38,7 +139,6 @@ def validate_monitoring_data(request):
         )
         request.errors.status = 422
         raise error_handler(request.errors)
-    return data
 
 
 def validate_patch_monitoring_data(request):
@@ -128,17 +228,17 @@ def validate_credentials_generate(request):
     except ValueError:
         raise_operation_error(request, 'No access token was provided.')
 
+    tender_id = request.validated['monitoring'].tender_id
     try:
-        response = TendersClient(
-            request.registry.api_token,
-            host_url=request.registry.api_server,
-            api_version=request.registry.api_version,
-        ).extract_credentials(request.validated['monitoring'].tender_id)
-    except ResourceNotFound:
-        raise_operation_error(request, 'Tender {} not found'.format(request.validated['monitoring'].tender_id))
-    else:
-        if sha512(token).hexdigest() != response['data']['tender_token']:
-            raise forbidden(request)
+        token_hash = request.registry.tender_credentials.get(tender_id)
+    except TendersAPIUnavailable:
+        request.errors.add('body', 'data', 'Tenders API is unavailable.')
+        request.errors.status = 503
+        raise error_handler(request.errors)
+    if token_hash is None:
+        raise_operation_error(request, 'Tender {} not found'.format(tender_id))
+    if sha512(token).hexdigest() != token_hash:
+        raise forbidden(request)
 
 
 def _validate_patch_monitoring_fields(request):
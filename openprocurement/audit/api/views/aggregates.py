@@ -0,0 +1,48 @@
+from openprocurement.api.utils import error_handler
+from openprocurement.audit.api.design import STATS_DIMENSIONS, monitorings_stats_view, view_path
+from openprocurement.audit.api.utils import op_resource, json_view, APIResource
+from openprocurement.audit.api.views.monitoring import get_mode_listing
+
+# parts of the dateCreated of monitorings the stats are grouped by
+STATS_PERIODS = ('', 'year', 'month', 'day')
+
+
+@op_resource(name='Monitorings Stats', path='/monitorings/stats')
+class MonitoringsStatsResource(APIResource):
+    """
+    Numbers of monitorings of a /monitorings listing by the values of a dimension,
+    overall or by period of their dateCreated, with the sum of their riskIndicatorsTotalImpact,
+    as the reduce of monitorings_stats_view grouped by the value and the period
+    """
+
+    @json_view(permission='view_listing')
+    def get(self):
+        listing = get_mode_listing(self.request)
+
+        dimension = self.request.params.get('dimension')
+        if dimension not in STATS_DIMENSIONS:
+            self.request.errors.add('params', 'dimension', 'Expected one of: {}'.format(', '.join(STATS_DIMENSIONS)))
+            self.request.errors.status = 422
+            raise error_handler(self.request.errors)
+        period = self.request.params.get('period', '')
+        if period not in STATS_PERIODS:
+            self.request.errors.add('params', 'period', 'Expected one of: {}'.format(', '.join(STATS_PERIODS[1:])))
+            self.request.errors.status = 422
+            raise error_handler(self.request.errors)
+
+        depth = STATS_PERIODS.index(period)
+        rows = self.db.view(
+            view_path(monitorings_stats_view),
+            startkey=[listing, dimension], endkey=[listing, dimension, {}], group_level=3 + depth,
+        )
+        data = []
+        for row in rows:
+            item = {
+                'value': row.key[2],
+                'count': row.value['count'],
+                'riskIndicatorsTotalImpact': row.value['sum'],
+            }
+            if depth:
+                item['period'] = '-'.join(row.key[3:])
+            data.append(item)
+        return {'data': data}
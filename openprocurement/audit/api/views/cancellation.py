@@ -1,11 +1,9 @@
 # -*- coding: utf-8 -*-
 from openprocurement.audit.api.utils import (
+    json_view,
     op_resource,
     APIResource,
 )
-from openprocurement.api.utils import (
-    json_view,
-)
 
 
 @op_resource(name='Monitoring Cancellation',
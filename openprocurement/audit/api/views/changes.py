@@ -0,0 +1,71 @@
+from time import time
+
+from couchdb.http import ServerError
+from openprocurement.api.utils import error_handler
+from openprocurement.audit.api.utils import op_resource, json_view, APIResource
+from openprocurement.audit.api.views.monitoring import get_mode_listing
+
+EVENT_STREAM = 'text/event-stream'
+
+
+@op_resource(name='Monitorings Changes', path='/monitorings/changes')
+class MonitoringsChangesResource(APIResource):
+    """
+    Changes of /monitorings?feed=changes pushed to clients:
+    a long-poll request waits for the changes after offset and returns them as soon as they come,
+    an event stream (feed=eventsource or Accept: text/event-stream) sends them until timeout,
+    with the seq of a change as its event id, so clients resume with Last-Event-ID
+    """
+
+    @json_view(permission='view_listing')
+    def get(self):
+        mode = self.request.params.get('mode', '')
+        listing = get_mode_listing(self.request)
+
+        hub = self.request.registry.changes_hub
+        timeout = self.request.params.get('timeout', '')
+        timeout = min(int(timeout), hub.timeout) if timeout.isdigit() else hub.timeout
+        offset = self.request.params.get('offset') or self.request.headers.get('Last-Event-ID') or None
+        stream = self.request.params.get('feed') == 'eventsource' \
+            or EVENT_STREAM in self.request.headers.get('Accept', '')
+        try:
+            # an event stream sends what there already is right away, and the offset is checked before it starts
+            items, offset = hub.wait(offset, listing, 0 if stream else timeout)
+        except ServerError:
+            self.request.errors.add('params', 'offset', 'Offset invalid')
+            self.request.errors.status = 404
+            raise error_handler(self.request.errors)
+
+        if stream:
+            response = self.request.response
+            response.content_type = EVENT_STREAM
+            response.headers['Cache-Control'] = 'no-cache'
+            response.headers['X-Accel-Buffering'] = 'no'
+            response.app_iter = self.event_stream(hub, items, offset, listing, timeout)
+            return response
+
+        params = {'offset': offset}
+        if mode:
+            params['mode'] = mode
+        return {
+            'data': [data for _, data in items],
+            'next_page': {
+                'offset': offset,
+                'path': self.request.route_path('Monitorings Changes', _query=params),
+                'uri': self.request.route_url('Monitorings Changes', _query=params),
+            }
+        }
+
+    def event_stream(self, hub, items, offset, listing, timeout):
+        end = time() + timeout
+        heartbeat = self.request.registry.changes_heartbeat
+        dumps = self.request.registry.json_codec.dumps
+        while True:
+            for seq, data in items:
+                yield 'id: {}\ndata: {}\n\n'.format(seq, dumps(data))
+            if not items:
+                # keeps proxies from closing an idle connection
+                yield ':\n\n'
+            if time() >= end:
+                break
+            items, offset = hub.wait(offset, listing, min(heartbeat, end - time()))
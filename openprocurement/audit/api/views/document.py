@@ -9,12 +9,15 @@ from openprocurement.audit.api.constants import (
     ELIMINATION_RESOLUTION_OBJECT_TYPE,
     POST_OBJECT_TYPE,
 )
+from openprocurement.audit.api.traversal import versions_index
 from openprocurement.audit.api.utils import (
+    json_view,
     save_monitoring,
     op_resource,
     apply_patch,
     APIResource,
     set_author,
+    upload_batch,
 )
 from openprocurement.api.utils import (
     get_file,
@@ -22,14 +25,13 @@ from openprocurement.api.utils import (
     update_file_content_type,
     upload_file,
     context_unpack,
-    json_view,
 )
 from openprocurement.api.validation import (
     validate_file_update,
-    validate_file_upload,
     validate_patch_document_data,
 )
 from openprocurement.audit.api.validation import (
+    validate_file_batch_upload,
     validate_document_decision_status,
     validate_document_conclusion_status,
     validate_document_post_status,
@@ -44,18 +46,22 @@ class MonitoringsDocumentBaseResource(APIResource):
         """
         Monitoring Documents List
         """
-        documents = self.context.documents
-        if not self.request.params.get('all', ''):
-            documents_top = dict([(document.id, document) for document in documents]).values()
+        if self.request.params.get('all', ''):
+            documents = self.context.documents
+        else:
+            documents_top = [versions[-1] for versions in versions_index(self.context, 'documents').values()]
             documents = sorted(documents_top, key=lambda i: i['dateModified'])
         return {'data': [document.serialize('view') for document in documents]}
 
     @json_view(permission='edit_monitoring',
-               validators=(validate_file_upload,))
+               validators=(validate_file_batch_upload,))
     def collection_post(self):
         """
-        Monitoring Document Upload
+        Monitoring Document Upload,
+        a batch of documents is added with a single save and data lists them in their order
         """
+        if 'batch' in self.request.validated:
+            return self.collection_post_batch()
         document = upload_file(self.request)
         set_author(document, self.request, 'author')
         documents = self.context.documents
@@ -71,6 +77,18 @@ class MonitoringsDocumentBaseResource(APIResource):
             self.request.response.headers['Location'] = location
             return {'data': document.serialize('view')}
 
+    def collection_post_batch(self):
+        documents = upload_batch(self.request)
+        set_author(documents, self.request, 'author')
+        self.context.documents.extend(documents)
+        if save_monitoring(self.request):
+            self.LOGGER.info('Created {} {} monitoring documents {}'.format(
+                                len(documents), self.document_type, ', '.join(i.id for i in documents)),
+                             extra=context_unpack(self.request,
+                                                  {'MESSAGE_ID': 'monitoring_document_batch_create'}))
+            self.request.response.status = 201
+            return {'data': [document.serialize('view') for document in documents]}
+
     @json_view(permission='view_monitoring')
     def get(self):
         """
@@ -140,7 +158,7 @@ class MonitoringsDocumentDecisionResource(MonitoringsDocumentBaseResource):
     document_type = DECISION_OBJECT_TYPE
 
     @json_view(permission='edit_monitoring',
-               validators=(validate_document_decision_status, validate_file_upload,))
+               validators=(validate_document_decision_status, validate_file_batch_upload,))
     def collection_post(self):
         return super(MonitoringsDocumentDecisionResource, self).collection_post()
 
@@ -163,7 +181,7 @@ class MonitoringsDocumentConclusionResource(MonitoringsDocumentBaseResource):
     document_type = CONCLUSION_OBJECT_TYPE
 
     @json_view(permission='edit_monitoring',
-               validators=(validate_document_conclusion_status, validate_file_upload,))
+               validators=(validate_document_conclusion_status, validate_file_batch_upload,))
     def collection_post(self):
         return super(MonitoringsDocumentConclusionResource, self).collection_post()
 
@@ -186,7 +204,7 @@ class MonitoringsDocumentPostResource(MonitoringsDocumentBaseResource):
     document_type = POST_OBJECT_TYPE
 
     @json_view(permission='create_post',
-               validators=(validate_document_post_status, validate_file_upload,))
+               validators=(validate_document_post_status, validate_file_batch_upload,))
     def collection_post(self):
         return super(MonitoringsDocumentPostResource, self).collection_post()
 
@@ -209,7 +227,7 @@ class MonitoringsDocumentEliminationResource(MonitoringsDocumentBaseResource):
     document_type = ELIMINATION_REPORT_OBJECT_TYPE
 
     @json_view(permission='edit_elimination_report',
-               validators=(validate_file_upload,))
+               validators=(validate_file_batch_upload,))
     def collection_post(self):
         return super(MonitoringsDocumentEliminationResource, self).collection_post()
 
@@ -241,7 +259,7 @@ class AppealDocumentResource(MonitoringsDocumentBaseResource):
     document_type = APPEAL_OBJECT_TYPE
 
     @json_view(permission='create_appeal',
-               validators=(validate_file_upload,))
+               validators=(validate_file_batch_upload,))
     def collection_post(self):
         return super(AppealDocumentResource, self).collection_post()
 
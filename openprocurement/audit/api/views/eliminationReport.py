@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from openprocurement.audit.api.utils import (
+    json_view,
     op_resource,
     APIResource,
     apply_patch,
@@ -7,7 +8,6 @@ from openprocurement.audit.api.utils import (
     set_author,
 )
 from openprocurement.api.utils import (
-    json_view,
     get_now,
     context_unpack,
 )
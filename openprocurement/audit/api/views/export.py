@@ -0,0 +1,25 @@
+from openprocurement.audit.api.export import NDJSON, iter_export, iter_chunks, iter_gzip
+from openprocurement.audit.api.utils import op_resource, json_view, APIResource
+from openprocurement.audit.api.views.monitoring import get_mode_listing
+
+
+@op_resource(name='Monitorings Export', path='/monitorings/export')
+class MonitoringsExportResource(APIResource):
+    """
+    All the monitorings of a /monitorings listing in their 'view' form, one JSON object a line,
+    ordered by monitoring_id and gzip-compressed as they are read.
+    An interrupted export is resumed with since, the monitoring_id of the last line received.
+    """
+
+    @json_view(permission='view_listing')
+    def get(self):
+        listing = get_mode_listing(self.request)
+        since = self.request.params.get('since') or None
+
+        lines = iter_export(self.request, self.db, since, listing, dumps=self.request.registry.json_codec.dumps)
+        response = self.request.response
+        response.content_type = NDJSON
+        response.content_encoding = 'gzip'
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.app_iter = iter_gzip(iter_chunks(lines))
+        return response
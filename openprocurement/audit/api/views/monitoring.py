@@ -1,11 +1,16 @@
+import json
+
 from openprocurement.api.utils import (
     context_unpack,
     get_now,
     generate_id,
-    json_view,
     APIResourceListing,
     forbidden,
+    error_handler,
+    encrypt,
+    decrypt,
 )
+from openprocurement.audit.api.codec import JSON_LISTING_RENDERER
 
 from openprocurement.audit.api.constants import (
     MONITORING_TIME,
@@ -21,54 +26,63 @@ from openprocurement.audit.api.constants import (
     CANCELLED_STATUS,
 )
 from openprocurement.audit.api.utils import (
+    json_view,
     save_monitoring,
+    save_monitorings,
     monitoring_serialize,
     apply_patch,
     op_resource,
     APIResource,
     generate_monitoring_id,
+    generate_monitoring_ids,
+    MonitoringIdUnavailable,
     generate_period,
     set_ownership,
     set_author,
     upload_objects_documents,
     calculate_normalized_business_date,
     get_monitoring_accelerator)
+from openprocurement.audit.api.choices import MONITORING_STATUS_CHOICES
 from openprocurement.audit.api.design import (
-    monitorings_real_by_dateModified_view,
-    monitorings_test_by_dateModified_view,
-    monitorings_by_dateModified_view,
-    monitorings_real_by_local_seq_view,
-    monitorings_test_by_local_seq_view,
-    monitorings_by_local_seq_view,
-    monitorings_real_draft_by_local_seq_view,
-    monitorings_all_draft_by_local_seq_view,
-    monitorings_real_draft_by_dateModified_view,
-    monitorings_all_draft_by_dateModified_view,
+    monitorings_feed_view,
+    monitorings_risk_ranking_view,
+    view_path,
+    FeedView,
+    REAL_LISTING,
+    TEST_LISTING,
+    ALL_LISTING,
+    REAL_DRAFT_LISTING,
+    ALL_DRAFT_LISTING,
 )
 from openprocurement.audit.api.validation import (
     validate_monitoring_data,
+    validate_monitoring_batch_data,
     validate_patch_monitoring_data,
     validate_credentials_generate
 )
 from openprocurement.audit.api.design import FIELDS
 from logging import getLogger
+from pyramid.httpexceptions import HTTPError
 from pyramid.security import ACLAllowed
 
 LOGGER = getLogger(__name__)
 
+MODE_LISTINGS = {
+    u'': REAL_LISTING,
+    u'test': TEST_LISTING,
+    u'real_draft': REAL_DRAFT_LISTING,
+    u'all_draft': ALL_DRAFT_LISTING,
+    u'_all_': ALL_LISTING,
+}
+# modes of the listings with draft monitorings
+DRAFT_MODES = (u'real_draft', u'all_draft')
 VIEW_MAP = {
-    u'': monitorings_real_by_dateModified_view,
-    u'test': monitorings_test_by_dateModified_view,
-    u'real_draft': monitorings_real_draft_by_dateModified_view,
-    u'all_draft': monitorings_all_draft_by_dateModified_view,
-    u'_all_': monitorings_by_dateModified_view,
+    mode: FeedView(monitorings_feed_view, u'dateModified', listing)
+    for mode, listing in MODE_LISTINGS.items()
 }
 CHANGES_VIEW_MAP = {
-    u'': monitorings_real_by_local_seq_view,
-    u'test': monitorings_test_by_local_seq_view,
-    u'real_draft': monitorings_real_draft_by_local_seq_view,
-    u'all_draft': monitorings_all_draft_by_local_seq_view,
-    u'_all_': monitorings_by_local_seq_view,
+    mode: FeedView(monitorings_feed_view, u'changes', listing)
+    for mode, listing in MODE_LISTINGS.items()
 }
 FEED = {
     u'dateModified': VIEW_MAP,
@@ -76,6 +90,23 @@ FEED = {
 }
 
 
+def monitoring_id_unavailable(request):
+    request.errors.add('body', 'data', 'Monitoring ID counter is unavailable.')
+    request.errors.status = 503
+    return error_handler(request.errors)
+
+
+def get_mode_listing(request):
+    """
+    The listing of the mode of a /monitorings request,
+    the draft ones need the view_draft_monitoring permission
+    """
+    mode = request.params.get('mode', '')
+    if mode in DRAFT_MODES and not isinstance(request.has_permission('view_draft_monitoring'), ACLAllowed):
+        raise forbidden(request)
+    return MODE_LISTINGS.get(mode, REAL_LISTING)
+
+
 @op_resource(name='Monitorings', path='/monitorings')
 class MonitoringsResource(APIResourceListing):
 
@@ -90,11 +121,9 @@ class MonitoringsResource(APIResourceListing):
         self.object_name_for_listing = 'Monitorings'
         self.log_message_id = 'monitoring_list_custom'
 
+    @json_view(permission='view_listing', renderer=JSON_LISTING_RENDERER)
     def get(self):
-        if self.request.params.get('mode') in ('real_draft', 'all_draft'):
-            perm = self.request.has_permission('view_draft_monitoring')
-            if not isinstance(perm, ACLAllowed):
-                return forbidden(self.request)
+        get_mode_listing(self.request)
         return super(MonitoringsResource, self).get()
 
     @json_view(content_type='application/json',
@@ -103,7 +132,11 @@ class MonitoringsResource(APIResourceListing):
     def post(self):
         monitoring = self.request.validated['monitoring']
         monitoring.id = generate_id()
-        monitoring.monitoring_id = generate_monitoring_id(get_now(), self.db, self.server_id)
+        try:
+            monitoring.monitoring_id = generate_monitoring_id(
+                get_now(), self.db, self.server_id, self.request.registry.monitoring_id_allocator)
+        except MonitoringIdUnavailable:
+            raise monitoring_id_unavailable(self.request)
         if monitoring.decision:
             upload_objects_documents(self.request, monitoring.decision, key="decision")
             set_author(monitoring.decision.documents, self.request, 'author')
@@ -117,6 +150,130 @@ class MonitoringsResource(APIResourceListing):
         return {'data': monitoring.serialize('view')}
 
 
+@op_resource(name='Monitorings Batch', path='/monitorings/batch')
+class BatchMonitoringsResource(APIResource):
+
+    @json_view(content_type='application/json',
+               permission='create_monitoring',
+               validators=(validate_monitoring_batch_data,))
+    def post(self):
+        """
+        Create a list of monitorings with a single bulk request,
+        data holds the created monitorings by the index of their data, null for the failed ones
+        """
+        errors = self.request.validated['monitorings_errors']
+        items = []
+        for index, monitoring in self.request.validated['monitorings']:
+            try:
+                if monitoring.decision:
+                    upload_objects_documents(self.request, monitoring.decision, key="decision",
+                                             route_name='Monitorings')
+                    set_author(monitoring.decision.documents, self.request, 'author')
+            except HTTPError:
+                errors.extend(dict(error, index=index) for error in self.request.errors)
+                del self.request.errors[:]
+            else:
+                items.append((index, monitoring))
+
+        monitorings = [monitoring for _, monitoring in items]
+        results = []
+        if monitorings:
+            try:
+                monitoring_ids = generate_monitoring_ids(
+                    get_now(), self.db, len(monitorings), self.server_id,
+                    self.request.registry.monitoring_id_allocator)
+            except MonitoringIdUnavailable:
+                raise monitoring_id_unavailable(self.request)
+            for monitoring, monitoring_id in zip(monitorings, monitoring_ids):
+                monitoring.id = generate_id()
+                monitoring.monitoring_id = monitoring_id
+            results = save_monitorings(self.request, monitorings)
+
+        data = [None] * len(self.request.json_body['data'])
+        for (index, monitoring), monitoring_errors in zip(items, results):
+            if monitoring_errors:
+                errors.extend(dict(error, index=index) for error in monitoring_errors)
+            else:
+                data[index] = monitoring.serialize('view')
+        LOGGER.info('Created {} monitorings'.format(len([i for i in data if i])),
+                    extra=context_unpack(self.request, {'MESSAGE_ID': 'monitoring_batch_create'}))
+        self.request.response.status = 201 if any(data) else 422
+        return {'data': data, 'errors': sorted(errors, key=lambda i: i['index'])}
+
+
+@op_resource(name='Monitorings Ranking', path='/monitorings/ranking')
+class MonitoringRankingResource(APIResource):
+    """
+    Monitorings of a status in a riskIndicatorsRegion from the highest riskIndicatorsTotalImpact down,
+    the earliest created first among equal ones, read as a single range of monitorings_risk_ranking_view.
+    next_page.offset is the cursor of the page that follows.
+    """
+
+    @json_view(permission='view_draft_monitoring')
+    def get(self):
+        region = self.request.params.get('region')
+        status = self.request.params.get('status', DRAFT_STATUS)
+        mode = self.request.params.get('mode', '')
+        if not region:
+            self.request.errors.add('params', 'region', 'This field is required.')
+        if status not in MONITORING_STATUS_CHOICES:
+            self.request.errors.add('params', 'status', 'Expected one of: {}'.format(
+                ', '.join(MONITORING_STATUS_CHOICES)))
+        if mode not in ('', 'test'):
+            self.request.errors.add('params', 'mode', 'Expected test or none')
+        if self.request.errors:
+            self.request.errors.status = 422
+            raise error_handler(self.request.errors)
+
+        params = {'region': region, 'status': status}
+        if mode:
+            params['mode'] = mode
+        fields = self.request.params.get('opt_fields', '')
+        if fields:
+            params['opt_fields'] = fields
+            fields = set(fields.split(',')) | {'id', 'riskIndicatorsTotalImpact'}
+        limit = self.request.params.get('limit', '')
+        if limit:
+            params['limit'] = limit
+        limit = int(limit) if limit.isdigit() and (100 if fields else 1000) >= int(limit) > 0 else 100
+
+        prefix = [MODE_LISTINGS[mode], status, region]
+        view_kwargs = dict(startkey=prefix, endkey=prefix + [{}], limit=limit)
+        offset = self.request.params.get('offset', '')
+        if offset:
+            try:
+                impact, date_created, doc_id = json.loads(decrypt(self.server.uuid, self.db.name, offset))
+            except (TypeError, ValueError):
+                self.request.errors.add('params', 'offset', 'Offset expired/invalid')
+                self.request.errors.status = 404
+                raise error_handler(self.request.errors)
+            # the page starts at the last monitoring of the previous one, unless it has moved since
+            view_kwargs.update(startkey=prefix + [impact, date_created], startkey_docid=doc_id, limit=limit + 1)
+        if self.update_after:
+            view_kwargs['stale'] = 'update_after'
+        if fields:
+            view_kwargs['include_docs'] = True
+        rows = list(self.db.view(view_path(monitorings_risk_ranking_view), **view_kwargs))
+        if offset and rows and rows[0].id == doc_id and rows[0].key[3:] == [impact, date_created]:
+            rows = rows[1:]
+        rows = rows[:limit]
+
+        if fields:
+            data = [monitoring_serialize(self.request, row.doc, fields) for row in rows]
+        else:
+            data = [dict(row.value, id=row.id) for row in rows]
+        params['offset'] = encrypt(self.server.uuid, self.db.name, json.dumps(rows[-1].key[3:] + [rows[-1].id])) \
+            if rows else offset
+        return {
+            'data': data,
+            'next_page': {
+                'offset': params['offset'],
+                'path': self.request.route_path('Monitorings Ranking', _query=params),
+                'uri': self.request.route_url('Monitorings Ranking', _query=params),
+            }
+        }
+
+
 @op_resource(name='Monitoring', path='/monitorings/{monitoring_id}')
 class MonitoringResource(APIResource):
 
@@ -1,12 +1,12 @@
 # -*- coding: utf-8 -*-
 from openprocurement.audit.api.utils import (
+    json_view,
     op_resource,
     APIResource,
     save_monitoring,
     apply_patch,
 )
 from openprocurement.api.utils import (
-    json_view,
     context_unpack
 )
 from openprocurement.audit.api.validation import (
@@ -2,6 +2,7 @@
 from openprocurement.audit.api.constants import CONCLUSION_OBJECT_TYPE, ADDRESSED_STATUS, DECLINED_STATUS, \
     POST_OVERDUE_TIME
 from openprocurement.audit.api.utils import (
+    json_view,
     op_resource,
     APIResource,
     save_monitoring,
@@ -9,7 +10,6 @@ from openprocurement.audit.api.utils import (
     upload_objects_documents,
     get_monitoring_role, calculate_normalized_business_date, get_monitoring_accelerator)
 from openprocurement.api.utils import (
-    json_view,
     context_unpack,
     get_now)
 from openprocurement.audit.api.validation import (
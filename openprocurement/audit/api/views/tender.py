@@ -1,5 +1,8 @@
-from openprocurement.api.utils import json_view, forbidden
+from openprocurement.api.utils import forbidden, error_handler
+from openprocurement.audit.api.codec import JSON_LISTING_RENDERER
+from openprocurement.audit.api.constants import LISTING_DOCS_BATCH_SIZE
 from openprocurement.audit.api.utils import (
+    json_view,
     op_resource,
     context_unpack,
     APIResource,
@@ -9,6 +12,8 @@ from openprocurement.audit.api.design import (
     monitorings_by_tender_id_view,
     test_monitorings_by_tender_id_view,
     draft_monitorings_by_tender_id_view,
+    view_batches,
+    active_view,
     MONITORINGS_BY_TENDER_FIELDS,
 )
 from logging import getLogger
@@ -29,7 +34,7 @@ class TenderMonitoringResource(APIResource):
         }
         self.default_fields = set(MONITORINGS_BY_TENDER_FIELDS) | {"id", "dateCreated"}
 
-    @json_view(permission='view_listing')
+    @json_view(permission='view_listing', renderer=JSON_LISTING_RENDERER)
     def get(self):
         if self.request.params.get('mode') == 'draft':
             perm = self.request.has_permission('view_draft_monitoring')
@@ -41,34 +46,74 @@ class TenderMonitoringResource(APIResource):
         opt_fields = set(e for e in opt_fields.split(',') if e)
 
         mode = self.request.params.get('mode', '')
-        list_view = self.views.get(mode, "")
+        list_view = active_view(self.views.get(mode, self.views[""]))
 
+        params = {}
+        if opt_fields:
+            params['opt_fields'] = ','.join(sorted(opt_fields))
+        if mode:
+            params['mode'] = mode
+
+        limit = self.request.params.get('limit', '')
+        if limit:
+            params['limit'] = limit
+        limit = int(limit) if limit.isdigit() and (500 if opt_fields else 1000) >= int(limit) > 0 else 500
+
+        descending = bool(self.request.params.get('descending'))
+        offset = self.request.params.get('offset', '')
+
+        # offset is an exclusive "dateCreated,id" cursor, id is a tiebreak for monitorings created at the same time
         view_kwargs = dict(
-            limit=500,  # TODO: pagination
-            startkey=[tender_id, None],
-            endkey=[tender_id, {}],
+            limit=limit + 1,
+            startkey=[tender_id, {}] if descending else [tender_id, None],
+            endkey=[tender_id, None] if descending else [tender_id, {}],
+            descending=descending,
         )
+        offset_id = None
+        if offset:
+            offset_date, _, offset_id = offset.rpartition(',')
+            if not offset_date or not offset_id:
+                self.request.errors.add('params', 'offset', 'Offset invalid')
+                self.request.errors.status = 404
+                raise error_handler(self.request.errors)
+            view_kwargs.update(startkey=[tender_id, offset_date], startkey_docid=offset_id)
 
         if opt_fields - self.default_fields:
             self.LOGGER.info(
                 'Used custom fields for monitoring list: {}'.format(','.join(sorted(opt_fields))),
                 extra=context_unpack(self.request, {'MESSAGE_ID': "CUSTOM_MONITORING_LIST"}))
 
-            results = [
-                monitoring_serialize(self.request, i[u'doc'], opt_fields | self.default_fields)
-                for i in list_view(self.db, include_docs=True, **view_kwargs)
+            rows = [
+                (monitoring_serialize(self.request, i[u'doc'], opt_fields | self.default_fields), i.key[1])
+                for i in view_batches(list_view, self.db, LISTING_DOCS_BATCH_SIZE, include_docs=True, **view_kwargs)
             ]
         else:
-            results = [
-                dict(
-                    id=e.id,
-                    dateCreated=e.key[1],
-                    **e.value
-                )
+            rows = [
+                (dict(id=e.id, dateCreated=e.key[1], **e.value), e.key[1])
                 for e in list_view(self.db, **view_kwargs)
             ]
+        if rows and offset_id and rows[0][0]['id'] == offset_id:
+            rows = rows[1:]
+        rows = rows[:limit]
 
+        if rows:
+            next_offset = '{},{}'.format(rows[-1][1], rows[-1][0]['id'])
+            prev_offset = '{},{}'.format(rows[0][1], rows[0][0]['id'])
+        else:
+            next_offset = prev_offset = offset
         data = {
-            'data': results,
+            'data': [row[0] for row in rows],
+            'next_page': self.page_link(tender_id, dict(params, offset=next_offset), descending),
         }
+        if descending or offset:
+            data['prev_page'] = self.page_link(tender_id, dict(params, offset=prev_offset), not descending)
         return data
+
+    def page_link(self, tender_id, params, descending):
+        if descending:
+            params['descending'] = 1
+        return {
+            'offset': params['offset'],
+            'path': self.request.route_path('Tender Monitorings', tender_id=tender_id, _query=params),
+            'uri': self.request.route_url('Tender Monitorings', tender_id=tender_id, _query=params),
+        }
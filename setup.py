@@ -20,6 +20,12 @@ docs_requires = requires + [
 entry_points = {
     'openprocurement.api.plugins': [
         'audit = openprocurement.audit.api:includeme'
+    ],
+    'openprocurement.api.migrations': [
+        'monitorings = openprocurement.audit.api.migration:migrate_data'
+    ],
+    'console_scripts': [
+        'audit_export = openprocurement.audit.api.export:main'
     ]
 }
 